@@ -8,14 +8,35 @@ Supports an explicit `DATABASE_URL` env var, otherwise will build a MySQL
 URL from `DB_USER`, `DB_PASSWORD`, `DB_HOST`, `DB_PORT`, `DB_NAME`.
 If `DB_ENGINE` is set to `sqlite` or `TESTING` is `1`, a local SQLite DB
 is used (useful for tests).
+
+Connection pooling is configured from the environment (checked by
+`scripts/validate_env.py`): `DB_POOL_SIZE`, `DB_MAX_OVERFLOW`,
+`DB_POOL_TIMEOUT` (seconds to wait for a connection), `DB_POOL_RECYCLE`
+(seconds before a connection is replaced, below MySQL's `wait_timeout`) and
+`DB_POOL_PRE_PING`. The time each checkout waits (including opening a new
+connection) and whether it timed out go to the listeners registered with
+`add_checkout_listener()`: on startup `services.metrics.instrument_db_pools()`
+adds the `db_pool_checkout_seconds{engine}` / `db_pool_timeouts_total`
+one. Pool occupancy is exported by `pool_stats()`.
+
+An async engine runs alongside the sync one: `get_async_engine()`,
+`get_async_sessionmaker()` and the `get_async_db()` dependency use
+`ASYNC_DATABASE_URL`, or `DATABASE_URL` with its driver swapped for
+aiomysql / aiosqlite / asyncpg. It is created on first use, so the async
+drivers are only needed when it is used; `DB_ASYNC=1` makes the read
+endpoints query through it instead of the I/O thread pool.
 """
 
+import logging
 import os
-from typing import Generator
+import time
+from typing import AsyncIterator, Callable, Dict, Generator, List, Optional
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, exc
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 
 # Load environment variables from .env (if present)
@@ -46,8 +67,75 @@ else:
     connect_args = {}
 
 
+def _env_int(name: str, default: int) -> int:
+    """Read a non-negative integer from the environment, falling back to `default`."""
+    raw = os.getenv(name)
+    if raw is None or raw.strip() == "":
+        return default
+    try:
+        return max(0, int(raw))
+    except ValueError:
+        logging.warning("Ignoring invalid %s=%r; using %d", name, raw, default)
+        return default
+
+
+# Called as `listener(engine_label, seconds_waited, timed_out)` after every checkout
+CheckoutListener = Callable[[str, float, bool], None]
+_CHECKOUT_LISTENERS: List[CheckoutListener] = []
+
+
+def add_checkout_listener(listener: CheckoutListener) -> None:
+    """Report connection checkouts from every engine's pool to `listener` (once)."""
+    if listener not in _CHECKOUT_LISTENERS:
+        _CHECKOUT_LISTENERS.append(listener)
+
+
+class _TimedCheckout:
+    """Pool mixin timing each connection checkout for the checkout listeners."""
+
+    engine_label = "sync"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            for listener in _CHECKOUT_LISTENERS:
+                listener(self.engine_label, waited, timed_out)
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    engine_label = "async"
+
+
+def pool_options(url: str, async_: bool = False) -> Dict[str, object]:
+    """`create_engine` pool arguments for `url` from the DB_POOL_* env vars."""
+    options: Dict[str, object] = {"pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "1").lower() not in {"0", "false", "no"}}
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        # In-memory SQLite lives in a single connection; keep SQLAlchemy's pool
+        return options
+    options.update(
+        poolclass=TimedAsyncQueuePool if async_ else TimedQueuePool,
+        pool_size=max(1, _env_int("DB_POOL_SIZE", 10)),
+        max_overflow=_env_int("DB_MAX_OVERFLOW", 10),
+        pool_timeout=_env_int("DB_POOL_TIMEOUT", 30),
+        pool_recycle=_env_int("DB_POOL_RECYCLE", 1800),
+    )
+    return options
+
+
 # Create SQLAlchemy engine
-engine = create_engine(DATABASE_URL, pool_pre_ping=True, connect_args=connect_args)
+engine = create_engine(DATABASE_URL, connect_args=connect_args, **pool_options(DATABASE_URL))
 
 # Create a configured "Session" class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -71,3 +159,79 @@ def get_db() -> Generator:
         yield db
     finally:
         db.close()
+
+
+# Async drivers used for each sync backend when ASYNC_DATABASE_URL is unset
+_ASYNC_DRIVERS = {"mysql": "aiomysql", "sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+
+def async_database_url(url: str = DATABASE_URL) -> str:
+    """`ASYNC_DATABASE_URL`, or `url` with its driver replaced by an async one."""
+    override = os.getenv("ASYNC_DATABASE_URL")
+    if override:
+        return override
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in _ASYNC_DRIVERS:
+        raise RuntimeError(f"No async driver known for {backend!r}; set ASYNC_DATABASE_URL")
+    return parsed.set(drivername=f"{backend}+{_ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+def async_enabled() -> bool:
+    """Whether read endpoints should use the async engine (`DB_ASYNC=1`)."""
+    return os.getenv("DB_ASYNC", "0").lower() in {"1", "true", "yes"}
+
+
+_ASYNC_ENGINE = None
+_ASYNC_SESSIONMAKER = None
+
+
+def get_async_engine():
+    """Lazily create the async engine (needs the async driver installed)."""
+    global _ASYNC_ENGINE
+    if _ASYNC_ENGINE is None:
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        url = async_database_url()
+        _ASYNC_ENGINE = create_async_engine(url, **pool_options(url, async_=True))
+    return _ASYNC_ENGINE
+
+
+def get_async_sessionmaker():
+    """`async_sessionmaker` bound to the async engine."""
+    global _ASYNC_SESSIONMAKER
+    if _ASYNC_SESSIONMAKER is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        _ASYNC_SESSIONMAKER = async_sessionmaker(get_async_engine(), autoflush=False, expire_on_commit=False)
+    return _ASYNC_SESSIONMAKER
+
+
+async def get_async_db() -> AsyncIterator:
+    """FastAPI dependency yielding an `AsyncSession` from the async engine."""
+    async with get_async_sessionmaker()() as session:
+        yield session
+
+
+async def dispose_async_engine() -> None:
+    """Close the async engine's pooled connections (on shutdown), if it was created."""
+    global _ASYNC_ENGINE, _ASYNC_SESSIONMAKER
+    if _ASYNC_ENGINE is not None:
+        await _ASYNC_ENGINE.dispose()
+        _ASYNC_ENGINE = _ASYNC_SESSIONMAKER = None
+
+
+def _pool_status(pool) -> Optional[Dict[str, int]]:
+    if not isinstance(pool, QueuePool):
+        return None
+    return {"size": pool.size(), "checked_out": pool.checkedout(), "overflow": max(0, pool.overflow())}
+
+
+def pool_stats() -> Dict[str, Dict[str, int]]:
+    """Occupancy of the connection pools, by engine (`sync`, and `async` once created)."""
+    stats = {}
+    for label, pooled in (("sync", engine), ("async", _ASYNC_ENGINE and _ASYNC_ENGINE.sync_engine)):
+        status = _pool_status(pooled.pool) if pooled is not None else None
+        if status is not None:
+            stats[label] = status
+    return stats
@@ -5,19 +5,33 @@ Run with:
 	uvicorn main:app --reload
 
 This file creates the FastAPI app, includes the `/documents` router,
-creates database tables on startup using SQLAlchemy, and registers
-basic exception handlers.
+creates database tables on startup using SQLAlchemy, warms up the
+summarization model in the background (GET /ready turns 200 once it is
+done; GET / is the liveness check), times every request (`Server-Timing`
+header, Prometheus metrics on GET /metrics, optional per-request sampling
+profiles via `X-Profile`), and registers basic exception handlers.
 """
 
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
+import asyncio
 import logging
+import time
+from typing import Optional
 
 # Import SQLAlchemy engine and Base (metadata) from database.py
-from database import engine, Base
+from database import engine, Base, SessionLocal, dispose_async_engine
+from models.migrations import pending_changes
+from services import executor, pdf_extraction
+from services.jobs import get_queue
+from services.metrics import HTTP_SECONDS, REGISTRY, instrument_db_pools, start_request
+from services.profiler import SamplingProfiler, profiling_requested
+from services.summary_cache import get_cache
+from services.uploads import max_upload_bytes
+from services.warmup import get_readiness
 
 # Import the documents router; expects `routers/documents.py` to expose `router`
-from routers.documents import router as documents_router
+from routers.documents import router as documents_router, process_job
 
 
 app = FastAPI(title="Intelli Summarize")
@@ -26,6 +40,54 @@ app = FastAPI(title="Intelli Summarize")
 app.include_router(documents_router, prefix="/documents")
 
 
+# Background model warm-up started on startup (see `services.warmup`)
+_warmup_task: Optional[asyncio.Task] = None
+
+
+# Allowance for multipart boundaries and form fields on top of the file itself
+_MULTIPART_OVERHEAD = 64 * 1024
+
+
+@app.middleware("http")
+async def reject_oversized_uploads(request: Request, call_next):
+	"""Return 413 before the body is read when Content-Length is over the limit.
+
+	Chunked requests without a Content-Length are still capped while the
+	file is streamed to disk (see `services.uploads.stream_to_disk`).
+	"""
+	if request.method == "POST" and request.url.path.startswith("/documents/upload"):
+		length = request.headers.get("content-length")
+		if length and length.isdigit() and int(length) > max_upload_bytes() + _MULTIPART_OVERHEAD:
+			return JSONResponse(status_code=413, content={"detail": "Uploaded file is too large"})
+	return await call_next(request)
+
+
+@app.middleware("http")
+async def instrument_requests(request: Request, call_next):
+	"""Record request latency and attach per-stage timings as `Server-Timing`.
+
+	A request whose `X-Profile` header matches `PROFILER_TOKEN` is also run
+	under the sampling profiler; the profile's path is returned in
+	`X-Profile-File` (see `services.profiler`).
+	"""
+	timings = start_request()
+	profiler = SamplingProfiler().start() if profiling_requested(request.headers.get("x-profile")) else None
+	status_code = 500
+	try:
+		response = await call_next(request)
+		status_code = response.status_code
+	finally:
+		# Label by endpoint name: bounded cardinality, unlike raw paths with ids
+		handler = getattr(request.scope.get("route"), "name", None) or "unmatched"
+		HTTP_SECONDS.observe(time.perf_counter() - timings.started, method=request.method, handler=handler, status=str(status_code))
+		if profiler is not None:
+			profiler.stop()
+	response.headers["Server-Timing"] = timings.server_timing()
+	if profiler is not None:
+		response.headers["X-Profile-File"] = await asyncio.to_thread(profiler.save, handler)
+	return response
+
+
 @app.on_event("startup")
 async def on_startup() -> None:
 	"""Create all database tables defined on SQLAlchemy models' metadata.
@@ -34,6 +96,9 @@ async def on_startup() -> None:
 	application startup. If the call fails, the exception is logged and
 	propagated so the app won't silently run in a broken state.
 	"""
+	# Export DB pool checkout waits and timeouts
+	instrument_db_pools()
+
 	try:
 		Base.metadata.create_all(bind=engine)
 		logging.info("Database tables created or already exist.")
@@ -41,17 +106,73 @@ async def on_startup() -> None:
 		logging.exception("Failed to create database tables on startup")
 		raise
 
+	# create_all() never alters existing tables; older databases need a migration
+	try:
+		with engine.connect() as conn:
+			pending = pending_changes(conn)
+		if pending:
+			logging.warning(
+				"Database schema is out of date (%d change(s), e.g. %s); run scripts/migrate_schema.py",
+				len(pending),
+				pending[0],
+			)
+	except Exception:
+		logging.exception("Failed to check the database schema")
+
+	# Drop cached summaries produced by a previously configured model
+	try:
+		with SessionLocal() as db:
+			purged = get_cache().purge_other_models(db)
+		if purged:
+			logging.info("Purged %d cached summaries from other models.", purged)
+	except Exception:
+		logging.exception("Failed to purge stale summary cache entries")
+
+	# Background workers for async uploads (JOB_WORKERS=0 disables them)
+	get_queue().start(process_job)
+
+	# Streamed summaries share queues with CPU workers through this manager
+	await executor.run_io(executor.start_manager)
+
+	# Load and warm the model in the background; /ready reports when it's done
+	global _warmup_task
+	_warmup_task = asyncio.ensure_future(get_readiness().warm())
+
+
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+	"""Stop warm-up, background job workers, the execution pools and DB connections."""
+	if _warmup_task is not None and not _warmup_task.done():
+		_warmup_task.cancel()
+	await get_queue().stop()
+	executor.shutdown(wait=False)
+	pdf_extraction.shutdown()
+	await dispose_async_engine()
+
 
 @app.get("/")
 async def root() -> dict:
-	"""Health-check/root endpoint."""
+	"""Health-check/root endpoint (liveness; doesn't wait for the model)."""
 	return {"status": "ok"}
 
 
+@app.get("/ready")
+async def ready():
+	"""Readiness probe: 200 once the model is loaded and warmed up, 503 before."""
+	readiness = get_readiness()
+	return JSONResponse(status_code=200 if readiness.ready else 503, content=readiness.report())
+
+
+@app.get("/metrics")
+async def metrics() -> PlainTextResponse:
+	"""Prometheus metrics: stage/request latency histograms and service counters."""
+	return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
 	"""Return JSON for FastAPI/Starlette HTTPExceptions."""
-	return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
+	return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail}, headers=getattr(exc, "headers", None))
 
 
 @app.exception_handler(Exception)
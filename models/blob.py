@@ -0,0 +1,22 @@
+"""SQLAlchemy `StoredBlob` model for Intelli Summarize.
+
+Defines the `blobs` table: one row per upload blob in `services.storage`,
+refreshed whenever the blob is leased. The row is what `release()` deletes,
+in a single statement that only matches while nothing references the blob,
+so two processes can't both decide a blob is unused while a third is taking
+a lease on it.
+Fields: key, touched_at.
+"""
+
+from sqlalchemy import Column, String, DateTime
+from database import Base
+
+
+class StoredBlob(Base):
+    __tablename__ = "blobs"
+
+    # sha256 key of the blob (its path in the store)
+    key = Column(String(64), primary_key=True)
+
+    # Last time the blob was leased (or first seen by garbage collection)
+    touched_at = Column(DateTime(timezone=True), nullable=False, index=True)
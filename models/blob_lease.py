@@ -0,0 +1,31 @@
+"""SQLAlchemy `BlobLease` model for Intelli Summarize.
+
+Defines the `blob_leases` table: short-lived references to upload blobs
+(`services.storage`) that are still being processed and aren't referenced by
+a document or job yet, e.g. during a sync or streamed upload. A lease keeps
+`release()` and garbage collection from deleting the blob; leases expire so
+a crashed process can't pin a blob forever. Leases without an expiry pin a
+blob permanently (files imported by `scripts/manage_uploads.py migrate`).
+Fields: id, blob_key, reason, expires_at, created_at.
+"""
+
+from sqlalchemy import Column, String, DateTime, func
+from database import Base
+
+
+class BlobLease(Base):
+    __tablename__ = "blob_leases"
+
+    # Random hex id returned to the holder
+    id = Column(String(32), primary_key=True)
+
+    # sha256 key of the leased blob
+    blob_key = Column(String(64), nullable=False, index=True)
+
+    # Why the blob is held (upload|stream|migrate), for diagnostics
+    reason = Column(String(32), nullable=False)
+
+    # Leases past this time no longer count; NULL never expires
+    expires_at = Column(DateTime(timezone=True), nullable=True, index=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -1,15 +1,39 @@
 """SQLAlchemy `Document` model for Intelli Summarize.
 
 Defines the `documents` table with an indexed `id` and `filename`.
-Fields: id, filename, content, summary, uploaded_at.
+Fields: id, filename, content_hash, content, summary, summary_length, summary_attempts,
+summary_error, summary_next_attempt_at, uploaded_at.
+
+`content` can be megabytes per row, so it is stored compressed
+(`models.types.CompressedText`) and deferred: loading a `Document`
+does not fetch it until the attribute is accessed (use `undefer` or
+`load_only` when a query needs it up front). Listings page through
+`(uploaded_at, id)`, backed by the `ix_documents_uploaded_at_id` index.
+Databases created before these columns existed are upgraded by
+`scripts/migrate_schema.py` (`models.migrations`), which also converts a
+pre-compression MySQL `TEXT` content column to `LONGBLOB`.
+
+Rows whose `summary` is NULL are picked up by the re-summarization sweeper
+(`services.sweeper`), which uses the `summary_*` bookkeeping columns for
+exponential backoff.
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, func, Index
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, func
+from sqlalchemy.orm import deferred
 from database import Base
+from models.types import CompressedText
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
 
 
 class Document(Base):
     __tablename__ = "documents"
+    # Keyset pagination of GET /documents/ orders by (uploaded_at, id)
+    __table_args__ = (Index("ix_documents_uploaded_at_id", "uploaded_at", "id"),)
 
     # Primary key (indexed for quick lookups)
     id = Column(Integer, primary_key=True, index=True)
@@ -17,16 +41,27 @@ class Document(Base):
     # Original filename of the uploaded document
     filename = Column(String(255), nullable=False, index=True)
 
-    # Full document content
-    content = Column(Text, nullable=False)
+    # sha256 of the uploaded file; key of its blob in `services.storage`
+    content_hash = Column(String(64), nullable=True, index=True)
+
+    # Full document content, stored compressed (deferred: only loaded when accessed)
+    content = deferred(Column(CompressedText, nullable=False))
 
     # Generated summary (nullable until created)
     summary = Column(Text, nullable=True)
 
-    # Timestamp when the document was uploaded; set to current time by DB
-    uploaded_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # Requested length preset(s), comma-separated with the primary one first
+    # (e.g. "long,short"); the sweeper retries any of them still missing
+    summary_length = Column(String(64), nullable=True)
+
+    # Failed summarization attempts so far and the last error message
+    summary_attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    summary_error = Column(Text, nullable=True)
 
+    # Earliest time the sweeper may retry a NULL summary (backoff schedule)
+    summary_next_attempt_at = Column(DateTime(timezone=True), nullable=True, index=True)
 
-# Explicit indexes (id and filename are already indexed above, this keeps intent clear)
-Index("ix_documents_id", Document.id)
-Index("ix_documents_filename", Document.filename)
+    # Timestamp when the document was uploaded. Set by the app so every row
+    # stores the same precision (SQLite's CURRENT_TIMESTAMP drops sub-seconds,
+    # which breaks keyset comparisons); the DB default covers raw inserts.
+    uploaded_at = Column(DateTime(timezone=True), default=_now, server_default=func.now(), nullable=False)
@@ -0,0 +1,49 @@
+"""SQLAlchemy `SummaryJob` model for Intelli Summarize.
+
+Defines the `summary_jobs` table, which doubles as a local work queue for
+asynchronous uploads: the upload endpoint inserts a `queued` row once the
+file is on disk, background workers claim rows and process them, and clients
+poll the job's status.
+Fields: id, filename, file_path, content_hash, length, retries, status, attempts,
+document_id, message, created_at, started_at, finished_at.
+"""
+
+from sqlalchemy import Column, Integer, String, Text, DateTime, func
+from database import Base
+
+
+# Job lifecycle states
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+class SummaryJob(Base):
+    __tablename__ = "summary_jobs"
+
+    # Random hex id handed to clients for polling
+    id = Column(String(32), primary_key=True)
+
+    # Original filename and where the upload was persisted
+    filename = Column(String(255), nullable=False)
+    file_path = Column(String(1024), nullable=False)
+
+    # Blob key of the upload; holds a storage reference until the job finishes
+    content_hash = Column(String(64), nullable=True, index=True)
+
+    # Requested summary length(s), comma-separated, and extra summarization attempts
+    length = Column(String(32), nullable=False, default="medium")
+    retries = Column(Integer, nullable=False, default=1)
+
+    # queued -> running -> done | failed (indexed: workers poll on it)
+    status = Column(String(16), nullable=False, default=JOB_QUEUED, index=True)
+    attempts = Column(Integer, nullable=False, default=0)
+
+    # Resulting document once processed, and any error/partial-success message
+    document_id = Column(Integer, nullable=True)
+    message = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
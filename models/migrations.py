@@ -0,0 +1,80 @@
+"""Bring an existing database up to date with the models.
+
+`Base.metadata.create_all()` (run on startup) creates missing tables but
+never changes existing ones, so a database created before a model gained
+columns or indexes keeps its old layout. `upgrade_schema()` closes the gap:
+
+  - creates missing tables
+  - adds columns missing from existing tables, e.g. `documents.content_hash`
+    and the `summary_*` bookkeeping columns (with their server defaults, so
+    NOT NULL columns such as `summary_attempts` are filled in)
+  - creates missing indexes, e.g. `ix_documents_uploaded_at_id`
+  - on MySQL, converts a `documents.content` column from before compression
+    (utf8mb4 `TEXT`) to `LONGBLOB`: strict mode rejects the compressed values
+    in a text column. Existing UTF-8 rows convert byte for byte and are
+    still read. SQLite columns accept any value, so nothing is needed there.
+
+It is idempotent; run it with `scripts/migrate_schema.py`.
+`pending_changes()` lists the statements it would run; startup logs a
+warning while that list isn't empty.
+"""
+
+import logging
+from typing import List
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateColumn, CreateIndex
+
+from database import Base
+# Register every model's table on `Base.metadata`
+from models import blob, blob_lease, document, job, near_duplicate, summary, summary_cache  # noqa: F401
+
+
+def _content_type(conn: Connection) -> List[str]:
+    if conn.dialect.name != "mysql":
+        return []
+    data_type = conn.execute(
+        text(
+            "SELECT DATA_TYPE FROM information_schema.COLUMNS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'documents' AND COLUMN_NAME = 'content'"
+        )
+    ).scalar()
+    if data_type and data_type.lower() != "longblob":
+        return ["ALTER TABLE documents MODIFY content LONGBLOB NOT NULL"]
+    return []
+
+
+def pending_changes(conn: Connection) -> List[str]:
+    """DDL that `upgrade_schema()` would run on tables that already exist."""
+    inspector = inspect(conn)
+    preparer = conn.dialect.identifier_preparer
+    existing = set(inspector.get_table_names())
+
+    statements: List[str] = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing:
+            continue
+        columns = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in columns:
+                ddl = CreateColumn(column).compile(dialect=conn.dialect)
+                statements.append(f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {ddl}")
+        indexes = {i["name"] for i in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in indexes:
+                statements.append(str(CreateIndex(index).compile(dialect=conn.dialect)))
+    if "documents" in existing:
+        statements.extend(_content_type(conn))
+    return statements
+
+
+def upgrade_schema(bind: Engine) -> List[str]:
+    """Create missing tables, then run `pending_changes()`; returns the statements run."""
+    Base.metadata.create_all(bind=bind)
+    with bind.begin() as conn:
+        statements = pending_changes(conn)
+        for statement in statements:
+            logging.info("Schema upgrade: %s", statement)
+            conn.execute(text(statement))
+    return statements
@@ -0,0 +1,48 @@
+"""SQLAlchemy models of the near-duplicate index for Intelli Summarize.
+
+`services.near_duplicates` keeps a MinHash signature of every document's
+extracted text and an LSH table of its band buckets, so an upload can find
+earlier documents with almost the same text without comparing against all
+of them.
+
+  - `document_signatures`: one row per document. Fields: document_id,
+    signature (packed uint32 MinHash values), shingle_count, text_hash
+    (its key in the summary cache), duplicate_of, similarity (the earlier
+    document it matched at upload time, if any).
+  - `document_lsh_buckets`: one row per (document, band). Fields:
+    document_id, band, bucket (hash of the band's rows, indexed).
+"""
+
+from sqlalchemy import Column, Float, ForeignKey, Integer, LargeBinary, String
+from database import Base
+
+
+class DocumentSignature(Base):
+    __tablename__ = "document_signatures"
+
+    document_id = Column(Integer, ForeignKey("documents.id", ondelete="CASCADE"), primary_key=True)
+
+    # MinHash signature, NUM_PERM little-endian uint32 values
+    signature = Column(LargeBinary, nullable=False)
+
+    # Distinct shingles the signature was computed from
+    shingle_count = Column(Integer, nullable=False)
+
+    # sha256 of the extracted text (`services.summary_cache.text_hash`), to reuse its cached summaries
+    text_hash = Column(String(64), nullable=False)
+
+    # Earlier document this one was a near-duplicate of, and their estimated Jaccard similarity
+    duplicate_of = Column(Integer, ForeignKey("documents.id", ondelete="SET NULL"), nullable=True, index=True)
+    similarity = Column(Float, nullable=True)
+
+
+class LshBucket(Base):
+    __tablename__ = "document_lsh_buckets"
+
+    document_id = Column(Integer, ForeignKey("documents.id", ondelete="CASCADE"), primary_key=True)
+
+    # Band number (0..BANDS-1)
+    band = Column(Integer, primary_key=True, autoincrement=False)
+
+    # Hex hash of (band, the band's signature rows); equal buckets are candidate pairs
+    bucket = Column(String(16), nullable=False, index=True)
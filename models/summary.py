@@ -0,0 +1,27 @@
+"""SQLAlchemy `Summary` model for Intelli Summarize.
+
+Defines the `summaries` table: one row per (document, length preset), so a
+document uploaded with `length=short,medium,long` keeps all three summaries.
+`Document.summary` still holds the first requested preset's summary.
+Fields: id, document_id, preset, summary, created_at.
+"""
+
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, UniqueConstraint, func
+from database import Base
+
+
+class Summary(Base):
+    __tablename__ = "summaries"
+    __table_args__ = (UniqueConstraint("document_id", "preset", name="uq_summaries_document_preset"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Summarized document
+    document_id = Column(Integer, ForeignKey("documents.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    # Length preset name (short|medium|long)
+    preset = Column(String(16), nullable=False)
+
+    summary = Column(Text, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
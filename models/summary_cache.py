@@ -0,0 +1,32 @@
+"""SQLAlchemy `SummaryCacheEntry` model for Intelli Summarize.
+
+Defines the `summary_cache` table: a content-addressed store of generated
+summaries keyed by a hash of (extracted text, model id, length preset), so
+re-uploads of the same document can skip summarization entirely.
+Fields: id, cache_key, text_hash, model_name, preset, summary, created_at.
+"""
+
+from sqlalchemy import Column, Integer, String, Text, DateTime, func
+from database import Base
+
+
+class SummaryCacheEntry(Base):
+    __tablename__ = "summary_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # sha256 over text hash + model id + preset parameters (unique lookup key)
+    cache_key = Column(String(64), nullable=False, unique=True, index=True)
+
+    # sha256 of the extracted text, kept for diagnostics and bulk invalidation
+    text_hash = Column(String(64), nullable=False, index=True)
+
+    # Model id the summary was produced with (`SUMMARIZER_MODEL`)
+    model_name = Column(String(255), nullable=False, index=True)
+
+    # Length preset name (short|medium|long)
+    preset = Column(String(16), nullable=False)
+
+    summary = Column(Text, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
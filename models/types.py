@@ -0,0 +1,31 @@
+"""Custom SQLAlchemy column types for Intelli Summarize.
+
+`CompressedText` stores a `str` compressed (see `services.compression`):
+a binary column (`LONGBLOB` on MySQL) that reads and writes plain strings,
+so models and queries don't change. Values written before compression was
+enabled are read back unchanged. The column can't be compared or searched
+in SQL.
+"""
+
+from sqlalchemy import LargeBinary
+from sqlalchemy.dialects import mysql
+from sqlalchemy.types import TypeDecorator
+
+from services import compression
+
+
+class CompressedText(TypeDecorator):
+    impl = LargeBinary
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        # MySQL's plain BLOB tops out at 64 KiB
+        if dialect.name == "mysql":
+            return dialect.type_descriptor(mysql.LONGBLOB())
+        return dialect.type_descriptor(LargeBinary())
+
+    def process_bind_param(self, value, dialect):
+        return compression.compress(value) if value is not None else None
+
+    def process_result_value(self, value, dialect):
+        return compression.decompress(value) if value is not None else None
@@ -1,170 +1,876 @@
 """Router for document upload, text extraction, summarization, and storage.
 
 Endpoints:
-  - POST /upload/ : accepts PDF, DOCX, TXT files; saves file to `uploads/`,
+  - POST /upload/ : accepts PDF, DOCX, TXT files; saves file to the blob store,
     extracts text, summarizes using `services.summarizer`, stores record in DB,
-    and returns JSON with `id`, `filename`, and `summary`.
+    and returns JSON with `id`, `filename`, and `summary`. With `mode=async`
+    returns 202 and a job id instead.
+  - POST /upload/stream : same pipeline for one preset, streamed as
+    Server-Sent Events (progress, summary tokens as decoded, done).
+  - GET /jobs/{job_id} : status of an async upload job.
+  - GET /summary-cache/stats : hit/miss counters of the summary cache.
+  - GET /capacity/stats : admission-control queue depth, waits and rejections.
+  - GET /search : ranked full-text search with highlighted snippets
+    (`services.search`: SQLite FTS5 / MySQL FULLTEXT).
+  - GET / : list documents, newest first, keyset-paginated on
+    `(uploaded_at, id)` (`limit`, `cursor`, `fields` projection).
+  - GET /{document_id} : one document; `content` only when requested.
 
-The implementation attempts to use `pdfplumber` for PDFs and falls back to
-`PyMuPDF` (`fitz`) if needed. DOCX extraction uses `python-docx`.
+The read endpoints never fetch `content` unless it is projected, and return
+an `ETag` so polling clients get 304 Not Modified for unchanged bodies. With
+`DB_ASYNC=1` they query through the async engine (see `database`).
+
+File types are sniffed from the stored bytes (magic numbers first, then the
+filename suffix) and extracted through the `services.extractors` registry:
+PDFs page by page with PyMuPDF (`fitz`), falling back to `pdfplumber` only
+for pages without text, large ones split into page ranges extracted in
+parallel on the CPU pool; DOCX paragraphs and table cells streamed from the
+zip archive; TXT decoded as utf-8 or latin-1.
 
 The router is defensive: it handles unsupported files, extraction failures,
 empty content, and includes an optional retry loop for summary generation.
+
+Uploads are streamed to disk in chunks (`services.uploads`) with the size
+limit enforced mid-stream (413) and a sha256 computed on the fly, then stored
+content-addressed in `services.storage` so identical files share one blob.
+A byte-identical re-upload reuses the stored text without re-extracting;
+otherwise extractors read the stored file by path.
+
+Blocking work never runs on the event loop: file writes and DB commits are
+dispatched to the I/O thread pool and extraction/summarization to the CPU
+pool (see `services.executor`), so health checks and other requests stay
+responsive while a document is being summarized. When
+`SUMMARY_MAX_BATCH_SIZE > 1`, concurrent summarizations are micro-batched
+through `services.batching` instead of running one forward pass per upload;
+documents longer than the model window bypass the batcher and go through the
+hierarchical map-reduce path in `summarize_text`.
+
+Admission control (`services.admission`) bounds concurrent summarizations;
+excess sync uploads queue fairly per client (`X-Client-Id` or peer address)
+and are shed with 503 + `Retry-After` when the wait would be too long.
+
+Each pipeline stage (read, save, extract, cache, queue, generate, persist)
+is timed via `services.metrics`; the durations feed the `/metrics`
+histograms and the response's `Server-Timing` header.
+
+Summaries are looked up in the content-addressed cache (`services.summary_cache`)
+before the model runs, so re-uploading an identical document is nearly free.
+Uploads whose text is almost identical to an earlier document (MinHash/LSH,
+`services.near_duplicates`) reuse its cached summaries with `NEAR_DUP_MODE=reuse`,
+or are only flagged with `flag`; either way the response's `near_duplicate`
+names the match and its estimated Jaccard similarity.
+
+Async mode (`mode=async`): the upload returns 202 with a job id as soon as
+the file is persisted; `services.jobs` workers run the same pipeline via
+`process_job` and GET /jobs/{job_id} reports progress.
 """
 
+import asyncio
 import os
-from io import BytesIO
-from typing import Optional
-from uuid import uuid4
+import time
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import anyio
+from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, load_only
 
-from database import get_db
+from database import SessionLocal, async_enabled, get_async_sessionmaker, get_db
 from models.document import Document
+from models.job import JOB_DONE, SummaryJob
+from models.summary import Summary
+from services import extractors, jobs, near_duplicates, pdf_extraction, search
+from services.admission import Overloaded, get_capacity
+from services.batching import get_batcher, max_batch_size
+from services.chunking import estimate_tokens
+from services.conditional import conditional_json
+from services.executor import run_cpu, run_io
+from services.metrics import SUMMARY_TOKENS, record_stage, stage
+from services.pagination import decode_cursor, encode_cursor
+from services.summary_cache import get_cache
+from services.storage import get_store
+from services.streaming import WorkerStream, sse_event, summary_events
+from services.uploads import UploadTooLarge, stream_to_disk
 
 # Import summarizer service (must expose `summarize_text(text: str, length: str) -> str`)
-from services.summarizer import summarize_text
+from services.summarizer import (
+    LENGTH_PRESETS,
+    is_long_text,
+    summarize_presets,
+    summarize_text,
+)
 
 
 router = APIRouter()
 
-# Directory to store uploaded files
-UPLOAD_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "uploads")
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+def extract_text_from_pdf(path: str) -> str:
+    """Extract text from a stored PDF via the extractor registry.
+
+    Pages come from `services.pdf_extraction` (fast engine first, careful
+    engine only for empty pages, large files split across a page pool).
+    Raises RuntimeError on failure.
+    """
+    return extractors.extract_text(path, extractors.PDF)
+
+
+def extract_text_from_docx(path: str) -> str:
+    """Extract paragraph and table text from a stored DOCX. Raises RuntimeError on failure."""
+    return extractors.extract_text(path, extractors.DOCX)
 
 
-def extract_text_from_pdf(data: bytes) -> str:
-    """Extract text from PDF bytes. Try pdfplumber first, fallback to PyMuPDF.
+def extract_text_from_txt(path: str) -> str:
+    """Decode a stored text file (utf-8, falling back to latin-1)."""
+    return extractors.extract_text(path, extractors.TEXT)
 
-    Returns extracted text or raises RuntimeError on failure.
+
+def _extract_text(mime: str, path: str) -> str:
+    """Extract a stored file whose type was sniffed as `mime`.
+
+    Takes the on-disk path rather than the file's bytes, so only a short
+    string crosses into the CPU worker process.
     """
-    # Try pdfplumber
-    try:
-        import pdfplumber
+    if mime == extractors.PDF:
+        return extract_text_from_pdf(path)
+    if mime == extractors.DOCX:
+        return extract_text_from_docx(path)
+    if mime == extractors.TEXT:
+        return extract_text_from_txt(path)
+    return extractors.extract_text(path, mime)
 
-        with pdfplumber.open(BytesIO(data)) as pdf:
-            pages = [p.extract_text() or "" for p in pdf.pages]
-        return "\n".join(pages).strip()
-    except Exception:
-        pass
 
-    # Fallback to PyMuPDF (fitz)
+def _pdf_range_text(path: str, start: int, stop: int, primary: str, fallback: Optional[str]) -> List[str]:
+    """Text of pages `[start, stop)` of a stored PDF. Raises RuntimeError on failure."""
     try:
-        import fitz  # PyMuPDF
-
-        doc = fitz.open(stream=data, filetype="pdf")
-        text_parts = []
-        for page in doc:
-            text_parts.append(page.get_text())
-        doc.close()
-        return "\n".join(text_parts).strip()
+        return [page.text for page in pdf_extraction.extract_page_range(path, start, stop, primary, fallback)]
     except Exception as exc:
         raise RuntimeError(f"PDF extraction failed: {exc}")
 
 
-def extract_text_from_docx(data: bytes) -> str:
-    """Extract text from DOCX bytes using python-docx. Raises RuntimeError on failure."""
+async def _extract_pdf(path: str) -> str:
+    """Extract a stored PDF, fanning large ones out over the CPU pool by page range.
+
+    CPU workers don't start page pools of their own, so the split happens
+    here: a PDF with `PDF_PARALLEL_MIN_PAGES`+ pages is cut into
+    `PDF_PAGE_WORKERS` ranges that run as separate CPU tasks. Smaller PDFs,
+    or ones the engines can't open, take the single-task path.
+    """
+    ranges: List[Tuple[int, int]] = []
+    parts = pdf_extraction.page_workers()
+    if parts > 1:
+        try:
+            primary, fallback, ranges = await run_cpu(pdf_extraction.page_ranges, path, parts)
+        except Exception:
+            # Reported with the usual message by the single-task path
+            ranges = []
+    if len(ranges) <= 1:
+        return await run_cpu(_extract_text, extractors.PDF, path)
+    pages = await asyncio.gather(*(run_cpu(_pdf_range_text, path, a, b, primary, fallback) for a, b in ranges))
+    return extractors.join_texts(extractors.PDF, (text for part in pages for text in part))
+
+
+def _find_existing_text(db: Session, content_hash: str) -> Optional[str]:
+    """Extracted text of an earlier upload with identical bytes, if any."""
+    row = (
+        db.query(Document.content)
+        .filter(Document.content_hash == content_hash)
+        .order_by(Document.id)
+        .first()
+    )
+    return row.content if row is not None else None
+
+
+def parse_presets(length: Optional[str]) -> List[str]:
+    """Presets from a `length` value: one preset, a comma-separated list, or `all`.
+
+    Raises ValueError for unknown presets.
+    """
+    value = (length or "medium").lower()
+    if value.strip() == "all":
+        return list(LENGTH_PRESETS)
+    presets = list(dict.fromkeys(p.strip() for p in value.split(",") if p.strip())) or ["medium"]
+    unknown = [p for p in presets if p not in LENGTH_PRESETS]
+    if unknown:
+        raise ValueError(f"Unknown length preset(s): {', '.join(unknown)}")
+    return presets
+
+
+def _persist_document(
+    db: Session,
+    filename: str,
+    content_hash: Optional[str],
+    text: str,
+    summaries: Optional[Dict[str, str]],
+    length: str,
+    attempts: int = 0,
+    error: Optional[str] = None,
+    signature: Optional[near_duplicates.Signature] = None,
+    match: Optional[near_duplicates.NearDuplicate] = None,
+) -> Document:
+    """Insert a `Document` row and return it refreshed (runs on the I/O pool).
+
+    `length` is the requested preset, or several comma-separated with the
+    primary one first. `summaries` maps presets to summaries; the primary
+    one is also stored on the document and each gets a `Summary` row. Rows
+    stored without all their summaries record the failed `attempts` and
+    `error` so the re-summarization sweeper can retry the missing presets
+    with backoff. The document is
+    added to the search and near-duplicate indexes in the same transaction
+    (`signature` and the upload-time `match` are reused when given).
+    """
+    doc = Document(
+        filename=filename,
+        content_hash=content_hash,
+        content=text,
+        summary=summaries.get(length.split(",")[0]) if summaries else None,
+        summary_length=length,
+        summary_attempts=attempts,
+        summary_error=error,
+    )
+    db.add(doc)
+    db.flush()
+    for preset, summary in (summaries or {}).items():
+        db.add(Summary(document_id=doc.id, preset=preset, summary=summary))
+    search.index_document(db, doc.id, filename, text, doc.summary)
+    near_duplicates.index_document(db, doc.id, text, signature, match)
+    db.commit()
+    db.refresh(doc)
+    return doc
+
+
+async def _summarize(text: str, length: str) -> str:
+    """Summarize `text`, via the micro-batcher when batching is enabled.
+
+    Long documents run map-reduce summarization (which batches its own
+    chunks) on the CPU pool rather than being truncated by a batched call.
+    """
+    SUMMARY_TOKENS.observe(estimate_tokens(text), direction="in")
+    with stage("generate"):
+        if max_batch_size() > 1 and not is_long_text(text):
+            summary = await get_batcher().submit(text, length)
+        else:
+            summary = await run_cpu(summarize_text, text, length=length)
+    SUMMARY_TOKENS.observe(estimate_tokens(summary), direction="out")
+    return summary
+
+
+async def _summarize_many(text: str, presets: List[str]) -> Dict[str, str]:
+    """Summarize `text` for each preset, sharing extraction, reduction and encoding."""
+    if len(presets) == 1:
+        return {presets[0]: await _summarize(text, presets[0])}
+    SUMMARY_TOKENS.observe(estimate_tokens(text), direction="in")
+    with stage("generate"):
+        summaries = await run_cpu(summarize_presets, text, presets)
+    for summary in summaries.values():
+        SUMMARY_TOKENS.observe(estimate_tokens(summary), direction="out")
+    return summaries
+
+
+# Admission-control client id used for async jobs
+BACKGROUND_CLIENT = "background"
+
+
+def client_id(request: Request) -> str:
+    """Identify the caller for fair scheduling: `X-Client-Id`, else the peer address."""
+    return request.headers.get("x-client-id") or (request.client.host if request.client else "unknown")
+
+
+async def _extract(db: Session, filename: str, path: str, content_hash: Optional[str]) -> str:
+    """Sniff and extract a stored upload; raises `HTTPException` (415/422) on failure."""
+    # Determine the file type from its content (then its name)
+    with stage("extract"):
+        mime = await run_io(extractors.sniff_mime, path, filename)
+        if mime is None:
+            raise HTTPException(status_code=415, detail="Unsupported file type")
+
+        # Byte-identical re-uploads reuse the stored text and skip extraction
+        text = await run_io(_find_existing_text, db, content_hash) if content_hash else None
+        if text is None:
+            try:
+                if mime == extractors.PDF:
+                    text = await _extract_pdf(path)
+                else:
+                    text = await run_cpu(_extract_text, mime, path)
+            except RuntimeError as exc:
+                # Extraction failure
+                raise HTTPException(status_code=422, detail=str(exc))
+
+    if not text:
+        raise HTTPException(status_code=422, detail="No extractable text found in the uploaded file")
+    return text
+
+
+async def _find_near_duplicate(
+    db: Session, text: str
+) -> Tuple[Optional[near_duplicates.Signature], Optional[near_duplicates.NearDuplicate]]:
+    """MinHash `text` and look up its closest earlier near-duplicate (none with `NEAR_DUP_MODE=off`)."""
+    if near_duplicates.mode() == near_duplicates.OFF:
+        return None, None
+    with stage("dedup"):
+        signature = await run_cpu(near_duplicates.minhash, text)
+        match = await run_io(near_duplicates.find, db, signature) if signature is not None else None
+    return signature, match
+
+
+async def _reuse_near_duplicate(
+    db: Session,
+    text: str,
+    signature: Optional[near_duplicates.Signature],
+    match: Optional[near_duplicates.NearDuplicate],
+    presets: List[str],
+) -> Dict[str, str]:
+    """Cached summaries of `match`'s text for `presets`, also cached for `text` (`NEAR_DUP_MODE=reuse`)."""
+    reused: Dict[str, str] = {}
+    # Identical text already missed the cache
+    if match is None or match.text_hash == signature.text_hash or near_duplicates.mode() != near_duplicates.REUSE:
+        return reused
+    cache = get_cache()
+    with stage("cache"):
+        for preset in presets:
+            summary: Optional[str] = await run_io(cache.get_by_hash, db, match.text_hash, preset)
+            if summary is not None:
+                reused[preset] = summary
+                await run_io(cache.put, db, text, preset, summary)
+    return reused
+
+
+def _near_duplicate_body(match: near_duplicates.NearDuplicate, reused: List[str]) -> dict:
+    return {"id": match.document_id, "similarity": round(match.similarity, 3), "reused": reused}
+
+
+async def _process_upload(
+    db: Session,
+    filename: str,
+    path: str,
+    length: str,
+    retries: int,
+    content_hash: Optional[str] = None,
+    client: Optional[str] = None,
+) -> dict:
+    """Extract, summarize and persist an upload; shared by sync and async modes.
+
+    `length` is one preset or several (see `parse_presets`); the file is
+    extracted once and summarized for each. Presets missing from the cache
+    reuse the cached summaries of a near-duplicate earlier document when one
+    is found (and `NEAR_DUP_MODE=reuse`). Returns the response body (`id`,
+    `filename`, `summary` of the first preset, `summaries` by preset when
+    several were requested, optional `near_duplicate` and `message`). Raises `HTTPException`
+    for unsupported or unreadable files, and 503 with `Retry-After` when
+    `client` (a sync request) is shed by admission control; background jobs
+    (`client=None`) wait their turn.
+    """
+    presets = parse_presets(length)
+    primary = presets[0]
+    text = await _extract(db, filename, path, content_hash)
+
+    # Reuse cached summaries for identical text, model and preset if available
+    cache = get_cache()
+    summaries: Dict[str, str] = {}
+    with stage("cache"):
+        for preset in presets:
+            cached_summary: Optional[str] = await run_io(cache.get, db, text, preset)
+            if cached_summary is not None:
+                summaries[preset] = cached_summary
+    missing = [p for p in presets if p not in summaries]
+
+    # Almost identical text (e.g. re-exported with another header) reuses an earlier document's summaries
+    signature, match = await _find_near_duplicate(db, text)
+    reused = await _reuse_near_duplicate(db, text, signature, match, missing)
+    summaries.update(reused)
+    missing = [p for p in missing if p not in reused]
+
+    # Attempt summarization with retries (retries is number of extra attempts)
+    attempt = 0
+    generated: Optional[Dict[str, str]] = None
+    last_error: Optional[Exception] = None
+    total_attempts = 1 + max(0, int(retries))
+    if missing:
+        queued_at = time.perf_counter()
+        try:
+            async with get_capacity().slot(client or BACKGROUND_CLIENT, shed=client is not None):
+                record_stage("queue", time.perf_counter() - queued_at)
+                while generated is None and attempt < total_attempts:
+                    try:
+                        generated = await _summarize_many(text, missing)
+                        break
+                    except Exception as exc:
+                        last_error = exc
+                        attempt += 1
+        except Overloaded as exc:
+            record_stage("queue", time.perf_counter() - queued_at)
+            raise HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": str(exc.retry_after)})
+
+    if generated:
+        summaries.update(generated)
+        with stage("cache"):
+            for preset, summary in generated.items():
+                await run_io(cache.put, db, text, preset, summary)
+
+    # If summarization failed after retries, store doc with null summary and return informative response
+    if missing and generated is None:
+        # Persist the text (and any cached presets); `services.sweeper` retries a missing summary later
+        with stage("persist"):
+            doc = await run_io(
+                _persist_document,
+                db,
+                filename,
+                content_hash,
+                text,
+                summaries,
+                ",".join(presets),
+                total_attempts,
+                str(last_error),
+                signature,
+                match,
+            )
+        body = {"id": doc.id, "filename": doc.filename, "summary": doc.summary}
+        if match is not None:
+            body["near_duplicate"] = _near_duplicate_body(match, list(reused))
+        body["message"] = f"Summarization failed after {total_attempts} attempts: {last_error}"
+        return body
+
+    # Save the document and its summaries to DB
+    summaries = {preset: summaries[preset] for preset in presets}
+    with stage("persist"):
+        doc = await run_io(_persist_document, db, filename, content_hash, text, summaries, ",".join(presets), 0, None, signature, match)
+
+    body = {"id": doc.id, "filename": doc.filename, "summary": summaries[primary]}
+    if len(presets) > 1:
+        body["summaries"] = summaries
+    if match is not None:
+        body["near_duplicate"] = _near_duplicate_body(match, list(reused))
+    return body
+
+
+async def process_job(db: Session, job: SummaryJob) -> dict:
+    """Job processor used by `services.jobs` workers for async uploads."""
+    if not await run_io(os.path.exists, job.file_path):
+        raise RuntimeError("Uploaded file is no longer available")
+    return await _process_upload(db, job.filename, job.file_path, job.length, job.retries, job.content_hash)
+
+
+async def _save_upload(db: Session, file: UploadFile, reason: str = "upload") -> Tuple[str, str, str]:
+    """Stream an upload into the blob store; returns its content hash, stored path and lease id.
+
+    The blob is leased before it is moved into place, so nothing deletes it
+    while it is processed; pass the lease to `store.release()` when done.
+    Raises `HTTPException` 413 (too large), 400 (empty) or 500.
+    """
+    # Stream the upload into the blob store's temp area, hashing as we go
+    store = get_store()
+    temp_path = store.temp_path()
     try:
-        import docx
+        stored = await stream_to_disk(file, temp_path)
+    except UploadTooLarge as exc:
+        raise HTTPException(status_code=413, detail=str(exc))
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Failed to save uploaded file: {exc}")
+    finally:
+        await file.close()
 
-        doc = docx.Document(BytesIO(data))
-        paragraphs = [p.text for p in doc.paragraphs]
-        return "\n".join(paragraphs).strip()
+    if stored.size == 0:
+        await run_io(os.remove, temp_path)
+        raise HTTPException(status_code=400, detail="Uploaded file is empty")
+
+    # Content-addressed: identical files share one blob on disk
+    key = stored.sha256
+    lease = await run_io(store.lease, db, key, reason)
+    try:
+        await run_io(store.ingest, temp_path, key)
     except Exception as exc:
-        raise RuntimeError(f"DOCX extraction failed: {exc}")
+        await run_io(store.release, db, key, lease)
+        raise HTTPException(status_code=500, detail=f"Failed to save uploaded file: {exc}")
+    return key, store.path(key), lease
 
 
 @router.post("/upload/", status_code=status.HTTP_201_CREATED)
 async def upload_document(
+    request: Request,
     file: UploadFile = File(...),
     length: str = Form("medium"),
     retries: int = Form(1),
+    mode: str = Form("sync"),
     db: Session = Depends(get_db),
 ):
     """Receive a file, extract text, summarize, store in DB, and return result.
 
-    - `length` chooses summary length: `short`, `medium`, or `long`.
+    - `length` chooses summary length: `short`, `medium`, or `long`; several
+      comma-separated presets (or `all`) return one summary per preset in
+      `summaries`, extracting and encoding the document only once.
     - `retries` controls how many additional attempts to make if summarization fails.
+    - a near-duplicate of an earlier upload is reported in `near_duplicate`
+      (`id`, `similarity`, `reused` presets) and, with `NEAR_DUP_MODE=reuse`,
+      skips the model for presets that document already has.
+    - `mode=async` returns 202 with a job id as soon as the file is saved;
+      poll GET /jobs/{job_id} for the result.
     """
-    # Validate length option
-    length = (length or "medium").lower()
-    if length not in {"short", "medium", "long"}:
-        raise HTTPException(status_code=400, detail="Invalid length; use short|medium|long")
+    # Validate length and mode options
+    try:
+        length = ",".join(parse_presets(length))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid length; use short|medium|long, a comma-separated list, or all")
+    mode = (mode or "sync").lower()
+    if mode not in {"sync", "async"}:
+        raise HTTPException(status_code=400, detail="Invalid mode; use sync|async")
+
+    store = get_store()
+    key, save_path, lease = await _save_upload(db, file)
 
-    # Read file bytes
+    # The stored document (or queued job) references the blob from here on;
+    # releasing the lease drops it only if the upload was rejected or failed
     try:
-        contents = await file.read()
+        if mode == "sync":
+            return await _process_upload(db, file.filename, save_path, length, retries, key, client_id(request))
+
+        # Async mode: reject unsupported files now, then queue for background workers
+        if await run_io(extractors.sniff_mime, save_path, file.filename) is None:
+            raise HTTPException(status_code=415, detail="Unsupported file type")
+        job = await run_io(jobs.enqueue, db, file.filename, save_path, length, max(0, int(retries)), key)
     finally:
-        await file.close()
+        await run_io(store.release, db, key, lease)
+    jobs.get_queue().notify()
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={"job_id": job.id, "status": job.status, "status_url": f"/documents/jobs/{job.id}"},
+    )
 
-    if not contents:
-        raise HTTPException(status_code=400, detail="Uploaded file is empty")
 
-    # Save original file to uploads/ with a unique name
-    unique_name = f"{uuid4().hex}_{os.path.basename(file.filename)}"
-    save_path = os.path.join(UPLOAD_DIR, unique_name)
-    try:
-        with open(save_path, "wb") as f:
-            f.write(contents)
-    except Exception as exc:
-        raise HTTPException(status_code=500, detail=f"Failed to save uploaded file: {exc}")
+async def _summary_events(filename: str, path: str, key: str, lease: str, length: str, client: str) -> AsyncIterator[str]:
+    """Server-Sent Events of the streaming upload pipeline (see `upload_document_stream`).
+
+    Holds the upload's blob `lease` until the stream ends; the blob is
+    deleted then unless the stored document references it.
+    """
+    # The request's session may be closed while the response streams; use our own
+    with SessionLocal() as db:
+        try:
+            async for event in _stream_upload(db, filename, path, key, length, client):
+                yield event
+        finally:
+            # Also runs when the client disconnects and the response is cancelled
+            with anyio.CancelScope(shield=True):
+                await run_io(get_store().release, db, key, lease)
+
 
-    # Determine file type and extract text
-    lower_name = file.filename.lower()
+async def _stream_upload(db: Session, filename: str, path: str, key: str, length: str, client: str) -> AsyncIterator[str]:
+    """Events of one streamed upload, from extraction to the stored document."""
+    yield sse_event("progress", {"stage": "saved"})
     try:
-        if lower_name.endswith(".pdf"):
-            text = extract_text_from_pdf(contents)
-        elif lower_name.endswith(".docx"):
-            text = extract_text_from_docx(contents)
-        elif lower_name.endswith(".txt"):
-            # Assume utf-8; fall back to latin-1 if utf-8 fails
-            try:
-                text = contents.decode("utf-8")
-            except UnicodeDecodeError:
-                text = contents.decode("latin-1")
-            text = text.strip()
+        text = await _extract(db, filename, path, key)
+    except HTTPException as exc:
+        yield sse_event("error", {"status": exc.status_code, "detail": exc.detail})
+        return
+    yield sse_event("progress", {"stage": "extracted", "characters": len(text)})
+
+    cache = get_cache()
+    with stage("cache"):
+        summary: Optional[str] = await run_io(cache.get, db, text, length)
+    signature, match = await _find_near_duplicate(db, text)
+    reused = await _reuse_near_duplicate(db, text, signature, match, [length] if summary is None else [])
+    summary = reused.get(length, summary)
+    if summary is not None:
+        if reused:
+            yield sse_event("progress", {"stage": "near_duplicate", **_near_duplicate_body(match, list(reused))})
         else:
-            # Unsupported file type
-            raise HTTPException(status_code=415, detail="Unsupported file type")
+            yield sse_event("progress", {"stage": "cached"})
+        yield sse_event("token", {"text": summary})
+    else:
+        pieces: List[str] = []
+        capacity = get_capacity()
+        queued_at = time.perf_counter()
+        try:
+            await capacity.acquire(client)
+        except Overloaded as exc:
+            record_stage("queue", time.perf_counter() - queued_at)
+            yield sse_event("error", {"status": 503, "detail": str(exc), "retry_after": exc.retry_after})
+            return
+        started = time.perf_counter()
+        record_stage("queue", started - queued_at)
+        SUMMARY_TOKENS.observe(estimate_tokens(text), direction="in")
+        # The slot is returned when generation ends, not when the client has read everything
+        stream = WorkerStream(
+            summary_events, text, length, on_done=lambda: capacity.release(time.perf_counter() - started)
+        )
+        try:
+            yield sse_event("progress", {"stage": "summarizing"})
+            with stage("generate"):
+                async for event, data in stream:
+                    if event == "token":
+                        pieces.append(data["text"])
+                    yield sse_event(event, data)
+        except Exception as exc:
+            # Keep the document; `services.sweeper` retries the summary later
+            with stage("persist"):
+                doc = await run_io(_persist_document, db, filename, key, text, None, length, 1, str(exc), signature, match)
+            yield sse_event("error", {"status": 500, "detail": f"Summarization failed: {exc}", "id": doc.id})
+            return
+        finally:
+            stream.cancel()
+        summary = "".join(pieces).strip()
+        SUMMARY_TOKENS.observe(estimate_tokens(summary), direction="out")
+        with stage("cache"):
+            await run_io(cache.put, db, text, length, summary)
+
+    with stage("persist"):
+        doc = await run_io(_persist_document, db, filename, key, text, {length: summary}, length, 0, None, signature, match)
+    done = {"id": doc.id, "filename": doc.filename, "summary": summary}
+    if match is not None:
+        done["near_duplicate"] = _near_duplicate_body(match, list(reused))
+    yield sse_event("done", done)
+
+
+@router.post("/upload/stream")
+async def upload_document_stream(
+    request: Request,
+    file: UploadFile = File(...),
+    length: str = Form("medium"),
+    db: Session = Depends(get_db),
+):
+    """Upload a file and stream progress and the summary as Server-Sent Events.
+
+    Events (`event:` name, JSON `data:`):
+      - `progress`: `{"stage": "saved" | "extracted" | "cached" | "summarizing"}`,
+        and `{"stage": "chunks", "level", "done", "total"}` while a long
+        document is map-reduced; `{"stage": "near_duplicate", "id",
+        "similarity", "reused"}` when an earlier document's summary is reused
+      - `token`: `{"text": ...}`, the next piece of the summary as decoded
+      - `done`: `{"id", "filename", "summary"}` once the document is stored
+        (plus `near_duplicate` when one was found)
+      - `error`: `{"status", "detail"}`; a failed summary still stores the
+        document (its `id` is included) for the sweeper to retry
+
+    Upload errors (413/400) are returned as regular HTTP errors before the
+    stream starts. Takes a single `length` preset.
+    """
+    length = (length or "medium").lower()
+    if length not in LENGTH_PRESETS:
+        raise HTTPException(status_code=400, detail="Invalid length; use short|medium|long")
+    key, save_path, lease = await _save_upload(db, file, "stream")
+    return StreamingResponse(
+        _summary_events(file.filename, save_path, key, lease, length, client_id(request)),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _document_summaries(db: Session, document_id: int) -> Dict[str, str]:
+    rows = db.query(Summary.preset, Summary.summary).filter(Summary.document_id == document_id).order_by(Summary.id)
+    return {row.preset: row.summary for row in rows}
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str, db: Session = Depends(get_db)) -> dict:
+    """Report the state of an async upload job (and its summary once done)."""
+    job = await run_io(db.get, SummaryJob, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    body = {
+        "job_id": job.id,
+        "status": job.status,
+        "filename": job.filename,
+        "length": job.length,
+        "attempts": job.attempts,
+        "document_id": job.document_id,
+        "message": job.message,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+    if job.status == JOB_DONE and job.document_id is not None:
+        doc = await run_io(db.get, Document, job.document_id)
+        body["summary"] = doc.summary if doc is not None else None
+        if "," in job.length:
+            body["summaries"] = await run_io(_document_summaries, db, job.document_id)
+    return body
+
+
+@router.get("/summary-cache/stats")
+async def summary_cache_stats() -> dict:
+    """Return hit/miss counters and size of the summary cache."""
+    return get_cache().stats()
+
+
+@router.get("/capacity/stats")
+async def capacity_stats() -> dict:
+    """Return queue depth, wait-time and shedding metrics of admission control."""
+    return get_capacity().stats()
+
+
+# Fields GET /documents/ and GET /documents/{id} can project (`fields=`)
+DOCUMENT_FIELDS = (
+    "id",
+    "filename",
+    "content_hash",
+    "summary",
+    "summary_length",
+    "summary_attempts",
+    "summary_error",
+    "uploaded_at",
+    "content",
+    "summaries",
+)
+# Listings skip the large text columns unless asked; `content` is never a default
+LIST_FIELDS = ("id", "filename", "summary_length", "uploaded_at")
+DETAIL_FIELDS = ("id", "filename", "content_hash", "summary", "summary_length", "summary_error", "uploaded_at")
+MAX_PAGE_SIZE = 100
+
+
+def parse_fields(fields: Optional[str], default: Tuple[str, ...]) -> List[str]:
+    """Requested fields from a comma-separated `fields` value (`id` is always included).
+
+    Raises ValueError for unknown fields.
+    """
+    if not fields:
+        return list(default)
+    names = list(dict.fromkeys(["id"] + [f.strip() for f in fields.lower().split(",") if f.strip()]))
+    unknown = [f for f in names if f not in DOCUMENT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+    return names
+
+
+def _columns(fields: List[str]) -> list:
+    # The sort key is always loaded so a page can produce its cursor
+    names = {"id", "uploaded_at"} | {f for f in fields if f != "summaries"}
+    return [getattr(Document, name) for name in DOCUMENT_FIELDS if name in names]
+
+
+def _document_bodies(db: Session, docs: List[Document], fields: List[str]) -> List[dict]:
+    """Serialize `docs` to the requested fields (one query for all their `summaries`)."""
+    summaries: Dict[int, Dict[str, str]] = {doc.id: {} for doc in docs}
+    if "summaries" in fields and docs:
+        rows = (
+            db.query(Summary.document_id, Summary.preset, Summary.summary)
+            .filter(Summary.document_id.in_(list(summaries)))
+            .order_by(Summary.id)
+        )
+        for row in rows:
+            summaries[row.document_id][row.preset] = row.summary
+
+    bodies = []
+    for doc in docs:
+        body = {}
+        for name in fields:
+            if name == "summaries":
+                body[name] = summaries[doc.id]
+            elif name == "uploaded_at":
+                body[name] = doc.uploaded_at.isoformat() if doc.uploaded_at else None
+            else:
+                body[name] = getattr(doc, name)
+        bodies.append(body)
+    return bodies
+
+
+def _list_documents(db: Session, cursor: Optional[Tuple], limit: int, fields: List[str]) -> dict:
+    """One page of documents, newest first, after the `(uploaded_at, id)` cursor (runs on the I/O pool)."""
+    query = db.query(Document).options(load_only(*_columns(fields)))
+    if cursor is not None:
+        uploaded_at, last_id = cursor
+        query = query.filter(
+            or_(Document.uploaded_at < uploaded_at, and_(Document.uploaded_at == uploaded_at, Document.id < last_id))
+        )
+    # One extra row tells whether another page follows
+    docs = query.order_by(Document.uploaded_at.desc(), Document.id.desc()).limit(limit + 1).all()
+    page = docs[:limit]
+    next_cursor = encode_cursor(page[-1].uploaded_at, page[-1].id) if len(docs) > limit else None
+    return {"items": _document_bodies(db, page, fields), "next_cursor": next_cursor}
+
+
+def _get_document(db: Session, document_id: int, fields: List[str]) -> Optional[dict]:
+    doc = db.query(Document).options(load_only(*_columns(fields))).filter(Document.id == document_id).first()
+    return _document_bodies(db, [doc], fields)[0] if doc is not None else None
+
+
+async def _run_read(db: Session, func: Callable, *args):
+    """Run the read query `func(session, *args)` off the event loop.
+
+    With `DB_ASYNC=1` it runs on an async-engine session (no thread is held
+    while waiting on the database); otherwise on the I/O pool with `db`.
+    """
+    if async_enabled():
+        async with get_async_sessionmaker()() as session:
+            return await session.run_sync(func, *args)
+    return await run_io(func, db, *args)
+
+
+def _search_documents(db: Session, terms: List[str], limit: int, offset: int) -> dict:
+    page = search.search(db, terms, limit, offset)
+    items = [
+        {"id": hit.id, "filename": hit.filename, "score": hit.score, "snippet": hit.snippet, "summary_snippet": hit.summary_snippet}
+        for hit in page.hits
+    ]
+    next_offset = offset + limit if offset + limit < page.total else None
+    return {"total": page.total, "items": items, "next_offset": next_offset}
+
+
+@router.get("/search")
+async def search_documents(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+) -> dict:
+    """Full-text search over filenames, extracted text and summaries.
+
+    Every word of `q` must match (`word*` matches a prefix). Results are
+    ranked by relevance and carry `snippet` / `summary_snippet` with the
+    matches wrapped in `<mark>`; page with `limit` and `offset` (the next
+    page's offset is `next_offset`, `null` on the last page).
+    """
+    terms = search.query_terms(q)
+    if not terms:
+        raise HTTPException(status_code=400, detail="Search query has no words")
+    try:
+        page = await _run_read(db, _search_documents, terms, limit, offset)
     except RuntimeError as exc:
-        # Extraction failure
-        raise HTTPException(status_code=422, detail=str(exc))
+        raise HTTPException(status_code=501, detail=str(exc))
+    return {"query": q, **page}
 
-    if not text:
-        raise HTTPException(status_code=422, detail="No extractable text found in the uploaded file")
 
-    # Attempt summarization with retries (retries is number of extra attempts)
-    attempt = 0
-    summary: Optional[str] = None
-    last_error: Optional[Exception] = None
-    total_attempts = 1 + max(0, int(retries))
-    while attempt < total_attempts:
-        try:
-            summary = summarize_text(text, length=length)
-            break
-        except Exception as exc:
-            last_error = exc
-            attempt += 1
+@router.get("/")
+async def list_documents(
+    request: Request,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db),
+) -> Response:
+    """List documents, newest first, with keyset pagination.
 
-    # If summarization failed after retries, store doc with null summary and return informative response
-    if summary is None:
-        # Persist original text with empty summary so it can be retried later
-        doc = Document(filename=file.filename, content=text, summary=None)
-        db.add(doc)
-        db.commit()
-        db.refresh(doc)
-        return {
-            "id": doc.id,
-            "filename": doc.filename,
-            "summary": None,
-            "message": f"Summarization failed after {total_attempts} attempts: {last_error}",
-        }
-
-    # Save the document and summary to DB
-    doc = Document(filename=file.filename, content=text, summary=summary)
-    db.add(doc)
-    db.commit()
-    db.refresh(doc)
+    - `limit` is the page size (1-100); pass the response's `next_cursor` as
+      `cursor` to fetch the next page (`null` on the last page).
+    - `fields` is a comma-separated projection (see `DOCUMENT_FIELDS`);
+      by default only id, filename, summary_length and uploaded_at are
+      returned and neither `summary` nor `content` is read from the DB.
+    - Responses carry an `ETag`; `If-None-Match` yields 304 when unchanged.
+    """
+    try:
+        projection = parse_fields(fields, LIST_FIELDS)
+        position = decode_cursor(cursor) if cursor else None
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    page = await _run_read(db, _list_documents, position, limit, projection)
+    return conditional_json(request, page)
 
-    return {"id": doc.id, "filename": doc.filename, "summary": summary}
+
+@router.get("/{document_id}")
+async def get_document(
+    request: Request,
+    document_id: int,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db),
+) -> Response:
+    """Return one document; `content` and `summaries` only when listed in `fields`.
+
+    Clients polling for a summary should send the last `ETag` back in
+    `If-None-Match` to get a bodiless 304 until the document changes.
+    """
+    try:
+        projection = parse_fields(fields, DETAIL_FIELDS)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    body = await _run_read(db, _get_document, document_id, projection)
+    if body is None:
+        raise HTTPException(status_code=404, detail="Document not found")
+    return conditional_json(request, body)
@@ -0,0 +1,162 @@
+"""Benchmark summarizer inference backends on a fixed corpus.
+
+Each backend (`SUMMARIZER_BACKEND` value) runs in a fresh process so memory
+numbers aren't polluted by the others. For every backend it reports:
+  - model load time
+  - median / p95 latency summarizing one document at a time
+  - throughput (documents per second) summarizing the corpus in batches
+  - peak RSS of the process
+and the summary quality relative to the first backend (the baseline, `torch`
+by default) as mean / minimum ROUGE-L F1. The script exits with status 1 if
+any backend's mean ROUGE-L falls below `--min-rouge-l`, so it can gate a
+switch to a quantized backend in CI.
+
+    python scripts/bench_backends.py
+    python scripts/bench_backends.py --backends torch torch-int8 onnx --corpus docs/ --preset short
+
+Without `--corpus` a small built-in corpus is used; with it, every `.txt`
+file in the directory is a document.
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import statistics
+import sys
+import time
+from typing import Dict, List
+
+# Allow running as `python scripts/bench_backends.py` from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.evaluation import rouge_l  # noqa: E402
+from services.inference_backends import ONNX, TORCH, TORCH_INT8  # noqa: E402
+
+
+BUILTIN_CORPUS = [
+    "The city council met on Tuesday to discuss the proposed expansion of the public library. "
+    "Supporters argued that the current building is too small for the growing number of visitors "
+    "and lacks space for study groups, children's programs and computer access. Opponents raised "
+    "concerns about the cost, estimated at twelve million dollars, and asked whether the money "
+    "could be better spent on road repairs. After three hours of debate, the council voted to "
+    "commission a detailed cost study and to hold two more public hearings before making a decision.",
+    "Researchers at the university have developed a new battery material that could double the range "
+    "of electric vehicles. The material, a silicon-carbon composite, stores more lithium ions than the "
+    "graphite used in most batteries today. Early tests show that cells made with the composite keep "
+    "ninety percent of their capacity after one thousand charging cycles. The team is now working with "
+    "an industrial partner to test whether the material can be produced at scale and at a competitive cost.",
+    "Photosynthesis is the process by which plants, algae and some bacteria convert light energy into "
+    "chemical energy. In the light-dependent reactions, chlorophyll absorbs sunlight and uses its energy "
+    "to split water molecules, releasing oxygen. The energy is stored in ATP and NADPH, which power the "
+    "Calvin cycle, where carbon dioxide from the air is fixed into sugars. These sugars provide energy "
+    "for the plant and, directly or indirectly, for almost every other living organism on Earth.",
+    "The company reported quarterly revenue of 4.2 billion dollars, up eight percent from a year earlier, "
+    "driven by strong demand for its cloud services. Operating margins narrowed slightly because of higher "
+    "spending on data centers and research. Executives said they expect growth to continue next quarter but "
+    "warned that currency fluctuations and slower hardware sales could weigh on results. Shares rose three "
+    "percent in after-hours trading following the announcement.",
+]
+
+
+def load_corpus(directory: str) -> List[str]:
+    texts = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".txt"):
+            with open(os.path.join(directory, name), encoding="utf-8", errors="replace") as f:
+                text = f.read().strip()
+            if text:
+                texts.append(text)
+    return texts
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run_backend(backend: str, texts: List[str], preset: str, repeat: int, batch_size: int) -> Dict[str, object]:
+    """Measure one backend (runs inside a fresh worker process)."""
+    os.environ["SUMMARIZER_BACKEND"] = backend
+    from services import summarizer
+
+    start = time.perf_counter()
+    summarizer._get_summarizer()
+    load_seconds = time.perf_counter() - start
+
+    # Warm-up so one-off kernel selection doesn't count as latency
+    summarizer.generate_summary(texts[0], preset)
+
+    latencies = []
+    summaries: List[str] = []
+    for _ in range(repeat):
+        summaries = []
+        for text in texts:
+            start = time.perf_counter()
+            summaries.append(summarizer.generate_summary(text, preset))
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for i in range(0, len(texts), batch_size):
+            summarizer.generate_summaries(texts[i : i + batch_size], preset)
+    throughput = repeat * len(texts) / (time.perf_counter() - start)
+
+    return {
+        "backend": backend,
+        "load_seconds": load_seconds,
+        "p50": statistics.median(latencies),
+        "p95": _percentile(latencies, 95),
+        "throughput": throughput,
+        # ru_maxrss is in KiB on Linux
+        "rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "summaries": summaries,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Summarizer backend benchmark")
+    parser.add_argument("--backends", nargs="+", default=[TORCH, TORCH_INT8, ONNX], help="first one is the quality baseline")
+    parser.add_argument("--corpus", help="directory of .txt documents (default: built-in corpus)")
+    parser.add_argument("--preset", default="medium", choices=["short", "medium", "long"])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=4)
+    parser.add_argument("--min-rouge-l", type=float, default=0.8, help="fail if a backend's mean ROUGE-L vs. the baseline is lower")
+    args = parser.parse_args(argv)
+
+    texts = load_corpus(args.corpus) if args.corpus else BUILTIN_CORPUS
+    if not texts:
+        print("corpus is empty", file=sys.stderr)
+        return 2
+
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for backend in args.backends:
+        with context.Pool(1) as pool:
+            try:
+                results.append(pool.apply(run_backend, (backend, texts, args.preset, args.repeat, args.batch_size)))
+            except Exception as exc:
+                print(f"{backend}: failed: {exc}", file=sys.stderr)
+    if not results:
+        return 2
+
+    baseline = results[0]
+    print(f"{len(texts)} documents, preset={args.preset}, baseline={baseline['backend']}")
+    print(f"{'backend':<12} {'load s':>8} {'p50 s':>8} {'p95 s':>8} {'docs/s':>8} {'RSS MiB':>9} {'ROUGE-L':>8} {'min':>6}")
+    failed = False
+    for result in results:
+        scores = [rouge_l(ref, cand) for ref, cand in zip(baseline["summaries"], result["summaries"])]
+        mean = statistics.mean(scores)
+        failed = failed or mean < args.min_rouge_l
+        print(
+            f"{result['backend']:<12} {result['load_seconds']:>8.2f} {result['p50']:>8.3f} {result['p95']:>8.3f}"
+            f" {result['throughput']:>8.2f} {result['rss_mib']:>9.0f} {mean:>8.3f} {min(scores):>6.3f}"
+        )
+    if failed:
+        print(f"quality check failed: mean ROUGE-L below {args.min_rouge_l}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
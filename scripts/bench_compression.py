@@ -0,0 +1,130 @@
+"""Benchmark compressed `documents.content` storage: size vs. write/read latency.
+
+Splits a local corpus into a training half (used to train dictionaries) and
+an evaluation half, then for each configuration reports on the evaluation
+documents:
+  - stored bytes and the saving vs. plain UTF-8
+  - median compress / decompress time per document
+  - write and read latency through a `Document` table in a temporary SQLite
+    database (insert all documents, then read each `content` back by id)
+
+    python scripts/bench_compression.py --corpus docs/
+    python scripts/bench_compression.py --corpus docs/ --codecs zlib --level 9
+
+Configurations: `none`, each codec without a dictionary and each codec with
+a dictionary trained on the training half (`zstd` needs `zstandard`).
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+# Allow running as `python scripts/bench_compression.py` from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from models.document import Document  # noqa: E402
+from services import compression  # noqa: E402
+
+
+def load_corpus(directory: str) -> List[str]:
+    texts = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".txt"):
+            with open(os.path.join(directory, name), encoding="utf-8", errors="replace") as f:
+                text = f.read().strip()
+            if text:
+                texts.append(text)
+    return texts
+
+
+def _db_roundtrip(texts: List[str], directory: str) -> Dict[str, float]:
+    """Insert `texts` as documents and read them back, with the current settings."""
+    engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+    Document.__table__.drop(engine, checkfirst=True)
+    Document.__table__.create(engine)
+    with Session(engine) as db:
+        start = time.perf_counter()
+        docs = [Document(filename=f"{i}.txt", content=text) for i, text in enumerate(texts)]
+        db.add_all(docs)
+        db.commit()
+        write = time.perf_counter() - start
+        ids = [doc.id for doc in docs]
+
+    with Session(engine) as db:
+        start = time.perf_counter()
+        for doc_id in ids:
+            db.query(Document.content).filter(Document.id == doc_id).scalar()
+        read = time.perf_counter() - start
+    engine.dispose()
+    return {"write_ms": write * 1000 / len(texts), "read_ms": read * 1000 / len(texts)}
+
+
+def run(texts: List[str], codec: str, dict_id: int, directory: str) -> Dict[str, object]:
+    os.environ["CONTENT_COMPRESSION"] = codec
+    os.environ["CONTENT_DICT_ID"] = f"{dict_id:08x}" if dict_id else ""
+    stored, compress_ms, decompress_ms = 0, [], []
+    for text in texts:
+        start = time.perf_counter()
+        value = compression.compress(text)
+        compress_ms.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        assert compression.decompress(value) == text
+        decompress_ms.append((time.perf_counter() - start) * 1000)
+        stored += len(value)
+    return {
+        "name": codec + ("+dict" if dict_id else ""),
+        "bytes": stored,
+        "compress_ms": statistics.median(compress_ms),
+        "decompress_ms": statistics.median(decompress_ms),
+        **_db_roundtrip(texts, directory),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Content compression benchmark")
+    parser.add_argument("--corpus", required=True, help="directory of .txt documents")
+    parser.add_argument("--codecs", nargs="+", choices=[compression.ZLIB, compression.ZSTD], default=[compression.ZLIB, compression.ZSTD])
+    parser.add_argument("--level", type=int, help="CONTENT_COMPRESSION_LEVEL")
+    args = parser.parse_args(argv)
+
+    texts = load_corpus(args.corpus)
+    if len(texts) < 2:
+        print("corpus needs at least 2 documents", file=sys.stderr)
+        return 2
+    train, evaluate = texts[::2], texts[1::2]
+    if args.level is not None:
+        os.environ["CONTENT_COMPRESSION_LEVEL"] = str(args.level)
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["CONTENT_DICT_DIR"] = directory
+        results = [run(evaluate, compression.NONE, 0, directory)]
+        for codec in args.codecs:
+            try:
+                dict_id = compression.save_dictionary(compression.train_dictionary(train, codec))
+            except RuntimeError as exc:
+                print(f"skipping {codec}: {exc}", file=sys.stderr)
+                continue
+            results.append(run(evaluate, codec, 0, directory))
+            results.append(run(evaluate, codec, dict_id, directory))
+
+    plain = results[0]["bytes"]
+    print(f"{len(evaluate)} documents ({plain} bytes), dictionaries trained on {len(train)}")
+    print(f"{'config':<10} {'bytes':>12} {'saved':>6} {'comp ms':>8} {'decomp ms':>9} {'write ms':>9} {'read ms':>8}")
+    for result in results:
+        print(
+            f"{result['name']:<10} {result['bytes']:>12} {1 - result['bytes'] / plain:>6.0%}"
+            f" {result['compress_ms']:>8.3f} {result['decompress_ms']:>9.3f}"
+            f" {result['write_ms']:>9.3f} {result['read_ms']:>8.3f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
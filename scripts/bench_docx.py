@@ -0,0 +1,99 @@
+"""Benchmark the streaming DOCX extractor against python-docx.
+
+Builds a large DOCX fixture (paragraphs plus a table) with python-docx, then
+times and measures peak Python memory (tracemalloc) for:
+  - `python-docx`: the previous implementation (`Document(...).paragraphs`)
+  - `streaming`: `services.extractors.extract_text` (streaming DOCX parser)
+
+    python scripts/bench_docx.py --paragraphs 20000 --rows 500 --repeat 3
+    python scripts/bench_docx.py --file path/to/report.docx
+
+Requires python-docx (to build the fixture and for the baseline).
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from io import BytesIO
+
+# Allow running as `python scripts/bench_docx.py` from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.extractors import DOCX, extract_text  # noqa: E402
+
+
+def build_fixture(paragraphs: int, rows: int) -> bytes:
+    import docx
+
+    document = docx.Document()
+    sentence = "The quick brown fox jumps over the lazy dog while the lecture continues. "
+    for i in range(paragraphs):
+        document.add_paragraph(f"{i}: " + sentence * 3)
+    table = document.add_table(rows=rows, cols=4)
+    for r, row in enumerate(table.rows):
+        for c, cell in enumerate(row.cells):
+            cell.text = f"r{r}c{c} " + sentence
+    buffer = BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def python_docx_text(path: str) -> str:
+    import docx
+
+    return "\n".join(p.text for p in docx.Document(path).paragraphs).strip()
+
+
+def streaming_text(path: str) -> str:
+    return extract_text(path, DOCX)
+
+
+def measure(func, path: str, repeat: int):
+    times = []
+    peak = 0
+    chars = 0
+    for _ in range(repeat):
+        tracemalloc.start()
+        start = time.perf_counter()
+        chars = len(func(path))
+        times.append(time.perf_counter() - start)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return statistics.median(times), peak, chars
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="DOCX extraction benchmark")
+    parser.add_argument("--paragraphs", type=int, default=20000)
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--file", help="benchmark an existing DOCX instead of a generated fixture")
+    args = parser.parse_args(argv)
+
+    cleanup = None
+    if args.file:
+        path = args.file
+    else:
+        fd, path = tempfile.mkstemp(suffix=".docx")
+        with os.fdopen(fd, "wb") as f:
+            f.write(build_fixture(args.paragraphs, args.rows))
+        cleanup = path
+
+    try:
+        print(f"fixture: {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+        print(f"{'implementation':<14} {'median s':>10} {'peak MiB':>10} {'chars':>12}")
+        for name, func in (("python-docx", python_docx_text), ("streaming", streaming_text)):
+            seconds, peak, chars = measure(func, path, args.repeat)
+            print(f"{name:<14} {seconds:>10.3f} {peak / 2**20:>10.1f} {chars:>12}")
+    finally:
+        if cleanup:
+            os.remove(cleanup)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""Benchmark extractive pre-compression: latency saved vs. ROUGE change.
+
+Summarizes every document of a local corpus with the configured model, once
+on the full text (the baseline) and once per extractive method with
+`EXTRACTIVE_PRECOMPRESS=1`. Reports per method:
+  - mean estimated input tokens after compression and the reduction
+  - mean latency (including the extractive step) and the speed-up
+  - mean / minimum ROUGE-1 and ROUGE-L F1 of the summaries vs. the baseline
+
+    python scripts/bench_precompress.py --corpus docs/
+    python scripts/bench_precompress.py --corpus docs/ --preset short --ratio 3 --methods textrank
+
+The corpus is a directory of `.txt` files; compression only kicks in for
+documents longer than the preset's budget, so use realistic (long) inputs.
+Exits with status 1 if a method's mean ROUGE-L falls below `--min-rouge-l`.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from typing import Dict, List
+
+# Allow running as `python scripts/bench_precompress.py` from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import extractive, summarizer  # noqa: E402
+from services.chunking import estimate_tokens  # noqa: E402
+from services.evaluation import rouge_l, rouge_n  # noqa: E402
+
+
+def load_corpus(directory: str) -> List[str]:
+    texts = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".txt"):
+            with open(os.path.join(directory, name), encoding="utf-8", errors="replace") as f:
+                text = f.read().strip()
+            if text:
+                texts.append(text)
+    return texts
+
+
+def run(texts: List[str], preset: str, method: str) -> Dict[str, object]:
+    """Summarize `texts` with pre-compression off (`method=""`) or with `method`."""
+    if method:
+        os.environ["EXTRACTIVE_PRECOMPRESS"] = "1"
+        os.environ["EXTRACTIVE_METHOD"] = method
+    else:
+        os.environ["EXTRACTIVE_PRECOMPRESS"] = "0"
+
+    max_length = summarizer.LENGTH_PRESETS[preset]["max_length"]
+    window = summarizer.model_window()
+    latencies, summaries, tokens = [], [], []
+    for text in texts:
+        tokens.append(estimate_tokens(extractive.precompress(text, max_length, window)))
+        start = time.perf_counter()
+        summaries.append(summarizer.summarize_text(text, preset))
+        latencies.append(time.perf_counter() - start)
+    return {"method": method or "none", "latencies": latencies, "summaries": summaries, "tokens": tokens}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Extractive pre-compression benchmark")
+    parser.add_argument("--corpus", required=True, help="directory of .txt documents")
+    parser.add_argument("--preset", default="medium", choices=sorted(summarizer.LENGTH_PRESETS))
+    parser.add_argument("--methods", nargs="+", choices=extractive.METHODS, default=list(extractive.METHODS))
+    parser.add_argument("--ratio", type=float, help="EXTRACTIVE_BUDGET_RATIO (budget = preset max_length x ratio)")
+    parser.add_argument("--min-rouge-l", type=float, default=0.0, help="fail if a method's mean ROUGE-L vs. the baseline is lower")
+    args = parser.parse_args(argv)
+
+    texts = load_corpus(args.corpus)
+    if not texts:
+        print("corpus is empty", file=sys.stderr)
+        return 2
+    if args.ratio:
+        os.environ["EXTRACTIVE_BUDGET_RATIO"] = str(args.ratio)
+
+    # Load and warm the model so the first document's latency is comparable
+    summarizer.load_model()
+    summarizer.generate_summary(texts[0][:2000], args.preset)
+
+    baseline = run(texts, args.preset, "")
+    results = [run(texts, args.preset, method) for method in args.methods]
+
+    base_latency = statistics.mean(baseline["latencies"])
+    base_tokens = statistics.mean(baseline["tokens"])
+    print(f"{len(texts)} documents, preset={args.preset}, budget ratio={extractive.budget_ratio()}")
+    print(f"{'method':<10} {'tokens':>8} {'kept':>6} {'mean s':>8} {'speedup':>8} {'ROUGE-1':>8} {'ROUGE-L':>8} {'min L':>6}")
+    print(f"{'none':<10} {base_tokens:>8.0f} {1:>6.0%} {base_latency:>8.3f} {1:>7.2f}x {1:>8.3f} {1:>8.3f} {1:>6.3f}")
+    failed = False
+    for result in results:
+        pairs = list(zip(baseline["summaries"], result["summaries"]))
+        rouge_1 = statistics.mean(rouge_n(ref, cand, 1) for ref, cand in pairs)
+        rouge_ls = [rouge_l(ref, cand) for ref, cand in pairs]
+        mean_l = statistics.mean(rouge_ls)
+        failed = failed or mean_l < args.min_rouge_l
+        tokens = statistics.mean(result["tokens"])
+        latency = statistics.mean(result["latencies"])
+        print(
+            f"{result['method']:<10} {tokens:>8.0f} {tokens / base_tokens:>6.0%} {latency:>8.3f}"
+            f" {base_latency / latency:>7.2f}x {rouge_1:>8.3f} {mean_l:>8.3f} {min(rouge_ls):>6.3f}"
+        )
+    if failed:
+        print(f"quality check failed: mean ROUGE-L below {args.min_rouge_l}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
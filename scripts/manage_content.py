@@ -0,0 +1,134 @@
+"""Maintenance commands for compressed document content (`services.compression`).
+
+    python scripts/manage_content.py train-dict                  # sample 1000 stored documents
+    python scripts/manage_content.py train-dict --corpus docs/ --codec zstd
+    python scripts/manage_content.py migrate --dry-run           # report savings only
+    python scripts/manage_content.py migrate                     # compress existing rows
+
+`train-dict` trains a dictionary for the codec, stores it in
+`CONTENT_DICT_DIR` and prints its id; set `CONTENT_DICT_ID` to that id (and
+re-run `migrate`) to use it. Keep old dictionaries: rows written with them
+need them to be read.
+
+`migrate` first upgrades the schema (`models.migrations`: missing columns,
+and MySQL's `documents.content` converted to `LONGBLOB`) and casts existing
+SQLite values to BLOB, then rewrites, in batches of `--batch-size` committed
+separately, every row not already stored with the configured codec and
+dictionary. It can be interrupted and resumed, and is
+safe while the API is running since readers understand both formats.
+"""
+
+import argparse
+import os
+import sys
+from typing import List
+
+# Allow running as `python scripts/manage_content.py` from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import LargeBinary, bindparam, text  # noqa: E402
+
+from database import Base, engine  # noqa: E402
+from models.migrations import upgrade_schema  # noqa: E402
+from services import compression  # noqa: E402
+
+
+def _load_corpus(directory: str) -> List[str]:
+    texts = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".txt"):
+            with open(os.path.join(directory, name), encoding="utf-8", errors="replace") as f:
+                texts.append(f.read())
+    return texts
+
+
+def _sample_documents(limit: int) -> List[str]:
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT content FROM documents ORDER BY id DESC LIMIT :n"), {"n": limit})
+        return [compression.decompress(row.content) for row in rows]
+
+
+def train_dict(args: argparse.Namespace) -> int:
+    samples = _load_corpus(args.corpus) if args.corpus else _sample_documents(args.samples)
+    if not samples:
+        print("No sample documents found.", file=sys.stderr)
+        return 2
+    data = compression.train_dictionary(samples, args.codec, args.size)
+    dict_id = compression.save_dictionary(data)
+    print(f"Trained {len(data)}-byte {args.codec} dictionary on {len(samples)} documents.")
+    print(f"Saved to {compression.dict_dir()}; enable it with CONTENT_COMPRESSION={args.codec} CONTENT_DICT_ID={dict_id:08x}")
+    return 0
+
+
+def _ensure_binary_column() -> None:
+    """Store existing SQLite values as bytes (MySQL's column is converted by `upgrade_schema`)."""
+    if engine.dialect.name == "sqlite":
+        # SQLite columns accept any type; just store existing values as bytes
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE documents SET content = CAST(content AS BLOB) WHERE typeof(content) = 'text'"))
+
+
+def migrate(args: argparse.Namespace) -> int:
+    if args.dry_run:
+        Base.metadata.create_all(bind=engine)
+    else:
+        upgrade_schema(engine)
+        _ensure_binary_column()
+
+    codec, dict_id = compression.codec(), compression.active_dict_id()
+    target = (codec, dict_id if codec != compression.NONE else 0)
+    update = text("UPDATE documents SET content = :content WHERE id = :id").bindparams(
+        bindparam("content", type_=LargeBinary)
+    )
+    select = text("SELECT id, content FROM documents WHERE id > :after ORDER BY id LIMIT :n")
+
+    last_id, rewritten, skipped, before, after = 0, 0, 0, 0, 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(select, {"after": last_id, "n": args.batch_size}).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            for row in rows:
+                stored = row.content.encode("utf-8") if isinstance(row.content, str) else bytes(row.content)
+                if compression.describe(stored) == target:
+                    skipped += 1
+                    continue
+                encoded = compression.compress(compression.decompress(stored), codec, dict_id)
+                if encoded == stored:
+                    # Too short to compress; stays plain
+                    skipped += 1
+                    continue
+                before += len(stored)
+                after += len(encoded)
+                rewritten += 1
+                if not args.dry_run:
+                    conn.execute(update, {"content": encoded, "id": row.id})
+        print(f"... up to id {last_id}: {rewritten} rewritten, {skipped} already {codec}")
+
+    saved = 1 - after / before if before else 0.0
+    verb = "Would rewrite" if args.dry_run else "Rewrote"
+    print(f"{verb} {rewritten} rows ({before} -> {after} bytes, {saved:.0%} saved); {skipped} already up to date.")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Manage compressed document content")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    train = commands.add_parser("train-dict", help="train a compression dictionary")
+    train.add_argument("--corpus", help="directory of .txt documents (default: sample the documents table)")
+    train.add_argument("--samples", type=int, default=1000, help="documents to sample from the DB")
+    train.add_argument("--codec", choices=[compression.ZLIB, compression.ZSTD], default=compression.ZLIB)
+    train.add_argument("--size", type=int, help="dictionary size in bytes (zlib: at most 32 KiB)")
+
+    mig = commands.add_parser("migrate", help="compress existing documents.content values")
+    mig.add_argument("--batch-size", type=int, default=200)
+    mig.add_argument("--dry-run", action="store_true", help="report the savings without writing")
+
+    args = parser.parse_args(argv)
+    return train_dict(args) if args.command == "train-dict" else migrate(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
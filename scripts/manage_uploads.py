@@ -0,0 +1,80 @@
+"""Maintenance commands for the content-addressed upload store.
+
+    python scripts/manage_uploads.py gc        # delete blobs nothing references
+    python scripts/manage_uploads.py migrate   # move legacy flat `<uuid>_<name>` files into the store
+
+`gc` deletes blobs that no document, unfinished job or live lease refers to
+and that are older than `BLOB_GC_GRACE_SECONDS`; uploads in progress hold a
+lease, so it is safe to run while the API is up.
+
+`migrate` hashes each legacy file in the root of `UPLOAD_DIR`, moves it into
+the sharded layout (dropping byte-identical duplicates) and prints how much
+disk was reclaimed. Legacy files were never referenced from the database, so
+each migrated blob gets a lease that never expires (reason `migrate`);
+otherwise the next `gc` would delete them all. Delete those `blob_leases`
+rows to let `gc` reclaim the legacy files.
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+
+# Allow running as `python scripts/manage_uploads.py` from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Base, SessionLocal, engine  # noqa: E402
+from models.blob_lease import BlobLease  # noqa: E402
+from services.storage import get_store  # noqa: E402
+
+
+def _sha256_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def migrate() -> int:
+    Base.metadata.create_all(bind=engine)
+    store = get_store()
+    moved = duplicates = reclaimed = 0
+    with SessionLocal() as db:
+        pinned = {key for (key,) in db.query(BlobLease.blob_key).filter(BlobLease.reason == "migrate")}
+        for entry in os.scandir(store.root):
+            # Legacy uploads are plain files directly under the root (skip README etc.)
+            if not entry.is_file() or entry.name.lower() == "readme.md":
+                continue
+            size = entry.stat().st_size
+            key = _sha256_file(entry.path)
+            # Pin before moving so `gc` never sees the blob unreferenced
+            if key not in pinned:
+                store.lease(db, key, "migrate", seconds=0)
+                pinned.add(key)
+            if store.ingest(entry.path, key):
+                moved += 1
+            else:
+                duplicates += 1
+                reclaimed += size
+    print(f"Moved {moved} files, removed {duplicates} duplicates ({reclaimed} bytes reclaimed).")
+    return 0
+
+
+def gc() -> int:
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        removed = get_store().collect_garbage(db)
+    print(f"Removed {removed} unreferenced blobs.")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Manage the upload blob store")
+    parser.add_argument("command", choices=["gc", "migrate"])
+    args = parser.parse_args(argv)
+    return gc() if args.command == "gc" else migrate()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""Measure per-worker memory with and without the shared inference server.
+
+Starts `--workers` worker processes the way uvicorn workers would run and
+has each one summarize a document, then reports each process's RSS and PSS
+(proportional set size: shared pages divided among the processes sharing
+them, so PSS values add up to real memory use):
+
+  - `local`: every worker loads its own model (the default setup)
+  - `shared`: one `InferenceServer` process loads the model and workers call
+    it over a Unix socket (`SUMMARIZER_SOCKET`)
+
+    python scripts/measure_rss.py --workers 4
+    python scripts/measure_rss.py --workers 8 --modes shared
+
+Linux only (reads /proc). Uses the configured `SUMMARIZER_MODEL` /
+`SUMMARIZER_BACKEND`.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+# Allow running as `python scripts/measure_rss.py` from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.warmup import WARMUP_TEXT  # noqa: E402
+
+
+def memory_kib(pid: int) -> Dict[str, int]:
+    """RSS and PSS of `pid` in KiB (PSS is 0 where smaps_rollup is unavailable)."""
+    values = {"rss": 0, "pss": 0}
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                values["rss"] = int(line.split()[1])
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    values["pss"] = int(line.split()[1])
+    except OSError:
+        pass
+    return values
+
+
+def _worker(socket_path: Optional[str], ready, done) -> None:
+    if socket_path:
+        os.environ["SUMMARIZER_SOCKET"] = socket_path
+    else:
+        os.environ.pop("SUMMARIZER_SOCKET", None)
+    # Import the app like a uvicorn worker would, then serve one request
+    from services import summarizer
+
+    summarizer.load_model()
+    summarizer.summarize_text(WARMUP_TEXT, "short")
+    ready.set()
+    done.wait()
+
+
+def _server(socket_path: str) -> None:
+    from services.inference_server import InferenceServer
+
+    asyncio.run(InferenceServer(socket_path).serve_forever())
+
+
+def _wait_for_socket(path: str, timeout: float = 600.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(path):
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"inference server did not start within {timeout:.0f}s")
+        time.sleep(0.2)
+
+
+def measure(mode: str, workers: int) -> List[Dict[str, object]]:
+    context = multiprocessing.get_context("spawn")
+    server = None
+    socket_path = None
+    if mode == "shared":
+        socket_path = os.path.join(tempfile.mkdtemp(), "inference.sock")
+        server = context.Process(target=_server, args=(socket_path,), daemon=True)
+        server.start()
+        _wait_for_socket(socket_path)
+
+    done = context.Event()
+    procs = []
+    for _ in range(workers):
+        ready = context.Event()
+        proc = context.Process(target=_worker, args=(socket_path, ready, done), daemon=True)
+        proc.start()
+        procs.append((proc, ready))
+    try:
+        for proc, ready in procs:
+            ready.wait()
+        rows = [{"role": "worker", "pid": proc.pid, **memory_kib(proc.pid)} for proc, _ in procs]
+        if server is not None:
+            rows.append({"role": "server", "pid": server.pid, **memory_kib(server.pid)})
+        return rows
+    finally:
+        done.set()
+        for proc, _ in procs:
+            proc.join(timeout=10)
+        if server is not None:
+            server.terminate()
+            server.join(timeout=10)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Per-worker RSS with and without the shared inference server")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--modes", nargs="+", choices=["local", "shared"], default=["local", "shared"])
+    args = parser.parse_args(argv)
+
+    if not os.path.exists("/proc/self/status"):
+        print("measure_rss.py needs Linux /proc", file=sys.stderr)
+        return 2
+
+    print(f"{'mode':<8} {'role':<7} {'pid':>8} {'RSS MiB':>9} {'PSS MiB':>9}")
+    for mode in args.modes:
+        rows = measure(mode, args.workers)
+        for row in rows:
+            print(f"{mode:<8} {row['role']:<7} {row['pid']:>8} {row['rss'] / 1024:>9.0f} {row['pss'] / 1024:>9.0f}")
+        workers = [r for r in rows if r["role"] == "worker"]
+        mean_rss = sum(r["rss"] for r in workers) / len(workers) / 1024
+        total_pss = sum(r["pss"] for r in rows) / 1024
+        print(f"{mode:<8} per-worker RSS {mean_rss:.0f} MiB, total PSS {total_pss:.0f} MiB\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+"""Upgrade an existing database to the current models (`models.migrations`).
+
+    python scripts/migrate_schema.py --dry-run   # print the DDL only
+    python scripts/migrate_schema.py
+
+Creates missing tables, adds missing columns and indexes to existing ones
+and, on MySQL, converts a `documents.content` column from before compression
+to `LONGBLOB`. Safe to run repeatedly. Back up the database first: on MySQL
+the conversion rewrites the `documents` table.
+
+Afterwards, `manage_content.py migrate` compresses existing rows, and
+`rebuild_search_index.py` / `rebuild_duplicate_index.py` index documents
+uploaded before those features existed.
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+# Allow running as `python scripts/migrate_schema.py` from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import engine  # noqa: E402
+from models.migrations import pending_changes, upgrade_schema  # noqa: E402
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Upgrade the database schema to the current models")
+    parser.add_argument("--dry-run", action="store_true", help="print the statements without running them")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    if args.dry_run:
+        with engine.connect() as conn:
+            statements = pending_changes(conn)
+        for statement in statements:
+            print(f"{statement};")
+        print(f"{len(statements)} change(s) pending (missing tables are not listed).")
+        return 0
+
+    statements = upgrade_schema(engine)
+    print(f"Applied {len(statements)} change(s); the schema is up to date.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
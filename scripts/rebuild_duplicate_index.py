@@ -0,0 +1,39 @@
+"""Rebuild the near-duplicate index (`services.near_duplicates`) from the documents table.
+
+New documents are indexed as they are stored; run this once after upgrading
+to index documents uploaded before near-duplicate detection existed, or
+after changing the shingle/MinHash parameters:
+    python scripts/rebuild_duplicate_index.py
+    python scripts/rebuild_duplicate_index.py --batch-size 500
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+# Allow running as `python scripts/rebuild_duplicate_index.py` from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Base, SessionLocal, engine  # noqa: E402
+from services import near_duplicates  # noqa: E402
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Rebuild the near-duplicate index")
+    parser.add_argument("--batch-size", type=int, default=200, help="documents indexed per transaction")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    # Creates the signature/bucket tables if they don't exist yet
+    Base.metadata.create_all(bind=engine)
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        count = near_duplicates.rebuild(db, batch_size=max(1, args.batch_size))
+    print(f"Indexed {count} documents in {time.perf_counter() - started:.1f}s.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+"""Rebuild the full-text search index (`services.search`) from the documents table.
+
+New documents are indexed as they are stored; run this once after upgrading
+to index documents uploaded before search existed, or to repair the index:
+    python scripts/rebuild_search_index.py
+    python scripts/rebuild_search_index.py --batch-size 500
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+# Allow running as `python scripts/rebuild_search_index.py` from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Base, SessionLocal, engine  # noqa: E402
+from services import search  # noqa: E402
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Rebuild the document search index")
+    parser.add_argument("--batch-size", type=int, default=200, help="documents indexed per transaction")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    # Creates the search table/index if it doesn't exist yet
+    Base.metadata.create_all(bind=engine)
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        try:
+            count = search.rebuild(db, batch_size=max(1, args.batch_size))
+        except RuntimeError as exc:
+            print(exc, file=sys.stderr)
+            return 1
+    print(f"Indexed {count} documents in {time.perf_counter() - started:.1f}s.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+"""Retry summarization for documents stored with `summary = NULL`.
+
+Runs the `services.sweeper.Sweeper` in its own process, with its own model
+instance, so retries never contend with the API's request-serving model:
+    python scripts/resummarize.py --once            # one pass over due rows
+    python scripts/resummarize.py --interval 300    # keep sweeping every 5 min
+
+Uses the same DB settings as the API. Tunables (flags override env):
+`SWEEPER_BATCH_SIZE` (8), `SWEEPER_MAX_ATTEMPTS` (5), `SWEEPER_BASE_DELAY`
+seconds (60) and `SWEEPER_NICE` (10, CPU priority niceness increment).
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+# Allow running as `python scripts/resummarize.py` from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Base, SessionLocal, engine  # noqa: E402
+from services.sweeper import Sweeper  # noqa: E402
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--once", action="store_true", help="run a single sweep and exit")
+    parser.add_argument("--interval", type=float, default=300.0, help="seconds between sweeps")
+    parser.add_argument("--batch-size", type=int, default=int(os.getenv("SWEEPER_BATCH_SIZE", "8")))
+    parser.add_argument("--max-attempts", type=int, default=int(os.getenv("SWEEPER_MAX_ATTEMPTS", "5")))
+    parser.add_argument("--base-delay", type=float, default=float(os.getenv("SWEEPER_BASE_DELAY", "60")))
+    parser.add_argument("--nice", type=int, default=int(os.getenv("SWEEPER_NICE", "10")))
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    # Yield CPU to the API process when both share a machine
+    if args.nice and hasattr(os, "nice"):
+        os.nice(args.nice)
+
+    Base.metadata.create_all(bind=engine)
+    sweeper = Sweeper(batch_size=args.batch_size, max_attempts=args.max_attempts, base_delay=args.base_delay)
+
+    while True:
+        with SessionLocal() as db:
+            result = sweeper.sweep_all(db)
+        if result.failed:
+            logging.warning("Sweep finished with %d failures", result.failed)
+        if args.once:
+            return 0 if not result.failed else 1
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+"""Shared inference server: load the summarization model once for all workers.
+
+    python scripts/run_inference_server.py --socket /tmp/intelli-summarize.sock
+    SUMMARIZER_SOCKET=/tmp/intelli-summarize.sock CPU_POOL_SIZE=0 uvicorn main:app --workers 8
+
+API workers (and their CPU pool processes) then send model calls over the
+Unix socket instead of loading their own copy of the weights. Uses the same
+`SUMMARIZER_MODEL` / `SUMMARIZER_BACKEND` settings as the API; requests from
+all workers are micro-batched (`SUMMARY_MAX_BATCH_SIZE`, `SUMMARY_MAX_WAIT_MS`).
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+
+# Allow running as `python scripts/run_inference_server.py` from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.batching import max_batch_size  # noqa: E402
+from services.inference_server import DEFAULT_SOCKET, InferenceServer  # noqa: E402
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Shared summarization inference server")
+    parser.add_argument("--socket", default=os.getenv("SUMMARIZER_SOCKET") or DEFAULT_SOCKET)
+    parser.add_argument("--max-batch-size", type=int, default=max_batch_size())
+    parser.add_argument("--max-wait-ms", type=float, default=float(os.getenv("SUMMARY_MAX_WAIT_MS", "20")))
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    server = InferenceServer(args.socket, max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""Standalone background worker for asynchronous uploads.
+
+Drains the `summary_jobs` table without serving HTTP, so summarization can
+run on separate machines/processes from the API:
+    JOB_WORKERS=0 uvicorn main:app          # API only enqueues
+    python scripts/run_worker.py            # one or more of these process jobs
+
+Uses the same DB settings as the API (`DATABASE_URL` or DB_* vars) and
+`JOB_WORKER_CONCURRENCY` (default 2) concurrent jobs per process.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+
+# Allow running as `python scripts/run_worker.py` from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Base, engine  # noqa: E402
+from routers.documents import process_job  # noqa: E402
+from services import executor  # noqa: E402
+from services.jobs import JobQueue  # noqa: E402
+
+
+def main() -> int:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    Base.metadata.create_all(bind=engine)
+
+    try:
+        concurrency = int(os.getenv("JOB_WORKER_CONCURRENCY", "2"))
+    except ValueError:
+        concurrency = 2
+    queue = JobQueue(workers=concurrency, poll_interval=float(os.getenv("JOB_POLL_INTERVAL", "0.5")))
+
+    try:
+        asyncio.run(queue.run_forever(process_job))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        executor.shutdown(wait=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
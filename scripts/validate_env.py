@@ -4,14 +4,36 @@ Run this script during local setup or CI to ensure required env vars are set:
     python scripts/validate_env.py
 
 It checks for either `DATABASE_URL` or the individual DB_* vars, plus
-`SECRET_KEY` and `UPLOAD_DIR`. Exits with code 0 on success, 1 on failure.
+`SECRET_KEY` and `UPLOAD_DIR`, and that the connection pool settings
+(`DB_POOL_SIZE`, `DB_MAX_OVERFLOW`, `DB_POOL_TIMEOUT`, `DB_POOL_RECYCLE`),
+when set, are non-negative integers. With `DB_ASYNC=1` it also checks that
+the async driver is importable. Exits with code 0 on success, 1 on failure.
 """
 
+import importlib.util
 import os
 import sys
+from typing import Optional
+
 from dotenv import load_dotenv
 
 
+# Connection pool settings read by `database.pool_options()`
+POOL_VARS = ("DB_POOL_SIZE", "DB_MAX_OVERFLOW", "DB_POOL_TIMEOUT", "DB_POOL_RECYCLE")
+
+# Async driver `database.async_database_url()` picks for each backend
+ASYNC_DRIVERS = {"mysql": "aiomysql", "sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+
+def _async_driver(async_url: Optional[str], database_url: Optional[str]) -> str:
+    """Module name of the async DB driver the app would import ("" if unknown)."""
+    if async_url:
+        # An explicit ASYNC_DATABASE_URL names its driver: dialect+driver://...
+        return async_url.split(":", 1)[0].partition("+")[2]
+    backend = (database_url or "mysql").split(":", 1)[0].partition("+")[0]
+    return ASYNC_DRIVERS.get(backend, "")
+
+
 def check_env() -> int:
     load_dotenv()
     missing = []
@@ -30,6 +52,17 @@ def check_env() -> int:
     if not os.getenv("UPLOAD_DIR"):
         missing.append("UPLOAD_DIR")
 
+    invalid = []
+    for name in POOL_VARS:
+        value = os.getenv(name, "").strip()
+        if value and not value.isdigit():
+            invalid.append(f"{name}={value!r} (expected a non-negative integer)")
+
+    if os.getenv("DB_ASYNC", "0").lower() in {"1", "true", "yes"}:
+        driver = _async_driver(os.getenv("ASYNC_DATABASE_URL"), database_url)
+        if driver and importlib.util.find_spec(driver) is None:
+            invalid.append(f"DB_ASYNC=1 needs the {driver} package (pip install {driver})")
+
     # Summarizer model is optional but warn if missing
     if not os.getenv("SUMMARIZER_MODEL"):
         print("Warning: SUMMARIZER_MODEL not set — default model will be used.")
@@ -38,6 +71,11 @@ def check_env() -> int:
         print("Missing required environment variables:")
         for m in missing:
             print(f" - {m}")
+    if invalid:
+        print("Invalid environment variables:")
+        for i in invalid:
+            print(f" - {i}")
+    if missing or invalid:
         return 1
 
     print("Environment OK — all required variables are present.")
@@ -0,0 +1,220 @@
+"""Admission control and backpressure for summarization capacity.
+
+Without a limit, a burst of uploads piles up behind the model: memory grows
+with every waiting request and eventually all of them time out. The
+`CapacityManager` sits in front of summarization in the upload path:
+
+  - at most `ADMISSION_CONCURRENCY` summarizations run at once (default:
+    CPU workers x `SUMMARY_MAX_BATCH_SIZE`, so the batcher can still fill
+    its batches)
+  - further requests wait in a bounded queue (`ADMISSION_MAX_QUEUE`,
+    default 64), one FIFO per client served round-robin, so one client
+    uploading a hundred files can't starve everybody else
+  - a request is shed with `Overloaded` (503 + `Retry-After` in the router)
+    when the queue is full, when the estimated wait (queue position x
+    average service time / concurrency) exceeds `ADMISSION_MAX_WAIT_SECONDS`
+    (default 30), or when it has actually waited that long
+  - background jobs queue with `shed=False`: they are already bounded by the
+    number of job workers and simply wait their turn
+
+Cache hits never reach the manager. `stats()` reports queue depth, wait
+times and rejections (GET `/documents/capacity/stats`).
+"""
+
+import asyncio
+import math
+import os
+import time
+from collections import Counter, OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Deque, Dict, Optional
+
+from services.batching import max_batch_size
+from services.executor import cpu_pool_size
+
+
+# Upper bounds (seconds) of the queue-wait histogram buckets
+WAIT_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, math.inf)
+
+# Weight of the newest observation in the service-time moving average
+_EWMA_ALPHA = 0.2
+
+
+class Overloaded(Exception):
+    """Raised when a request is shed; `retry_after` is a wait estimate in seconds."""
+
+    def __init__(self, reason: str, retry_after: int) -> None:
+        super().__init__(f"Summarization capacity exhausted ({reason}); retry in {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class CapacityManager:
+    """Bounded, per-client fair admission queue in front of the summarizer."""
+
+    def __init__(
+        self,
+        concurrency: int = 8,
+        max_queue: int = 64,
+        max_wait_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.concurrency = max(1, int(concurrency))
+        self.max_queue = max(0, int(max_queue))
+        self.max_wait = max(0.0, float(max_wait_seconds))
+        self.clock = clock
+
+        self.in_flight = 0
+        self._queues: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+        self._waiting = 0
+
+        # Metrics
+        self.avg_service_seconds: Optional[float] = None
+        self.admitted_total = 0
+        self.rejected: Counter = Counter()
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.wait_histogram: Counter = Counter()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._waiting
+
+    def estimated_wait(self, position: Optional[int] = None) -> float:
+        """Seconds until a request queued at `position` (default: the back) starts."""
+        if self.avg_service_seconds is None:
+            return 0.0
+        position = self._waiting + 1 if position is None else position
+        return position * self.avg_service_seconds / self.concurrency
+
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self.estimated_wait()))
+
+    def _shed(self, reason: str) -> Overloaded:
+        self.rejected[reason] += 1
+        return Overloaded(reason, self.retry_after())
+
+    def _admitted(self, waited: float) -> None:
+        self.admitted_total += 1
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        self.wait_histogram[next(b for b in WAIT_BUCKETS if waited <= b)] += 1
+
+    def _remove(self, client: str, future: asyncio.Future) -> None:
+        queue = self._queues.get(client)
+        if queue is not None and future in queue:
+            queue.remove(future)
+            self._waiting -= 1
+            if not queue:
+                del self._queues[client]
+
+    def _dispatch(self) -> None:
+        """Hand free slots to waiting clients, one request per client in turn."""
+        while self.in_flight < self.concurrency and self._queues:
+            client, queue = next(iter(self._queues.items()))
+            future = queue.popleft()
+            self._waiting -= 1
+            if queue:
+                self._queues.move_to_end(client)
+            else:
+                del self._queues[client]
+            if future.done():
+                continue
+            self.in_flight += 1
+            future.set_result(None)
+
+    async def acquire(self, client: str, shed: bool = True) -> None:
+        """Wait for a slot; raises `Overloaded` if the request is shed."""
+        if self.in_flight < self.concurrency and not self._waiting:
+            self.in_flight += 1
+            self._admitted(0.0)
+            return
+        if shed:
+            if self._waiting >= self.max_queue:
+                raise self._shed("queue_full")
+            if self.estimated_wait() > self.max_wait:
+                raise self._shed("estimated_wait")
+
+        future = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(client, deque()).append(future)
+        self._waiting += 1
+        started = self.clock()
+        try:
+            if shed:
+                await asyncio.wait_for(asyncio.shield(future), timeout=self.max_wait or None)
+            else:
+                await future
+        except asyncio.TimeoutError:
+            if not (future.done() and not future.cancelled()):
+                self._remove(client, future)
+                future.cancel()
+                raise self._shed("timeout")
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was granted as the caller went away: pass it on
+                self.release()
+            else:
+                self._remove(client, future)
+                future.cancel()
+            raise
+        self._admitted(self.clock() - started)
+
+    def release(self, service_seconds: Optional[float] = None) -> None:
+        """Return a slot (recording how long it was used) and admit the next waiter."""
+        self.in_flight -= 1
+        if service_seconds is not None:
+            if self.avg_service_seconds is None:
+                self.avg_service_seconds = service_seconds
+            else:
+                self.avg_service_seconds += _EWMA_ALPHA * (service_seconds - self.avg_service_seconds)
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, client: str, shed: bool = True) -> AsyncIterator[None]:
+        """`async with manager.slot(client):` — hold a slot for the block."""
+        await self.acquire(client, shed)
+        started = self.clock()
+        try:
+            yield
+        finally:
+            self.release(self.clock() - started)
+
+    def stats(self) -> Dict[str, object]:
+        """Snapshot of queue depth, wait times and shedding counters."""
+        return {
+            "concurrency": self.concurrency,
+            "in_flight": self.in_flight,
+            "queue_depth": self._waiting,
+            "max_queue": self.max_queue,
+            "queue_depth_by_client": {client: len(queue) for client, queue in self._queues.items()},
+            "admitted_total": self.admitted_total,
+            "rejected_total": dict(self.rejected),
+            "avg_wait_seconds": self.wait_seconds_total / self.admitted_total if self.admitted_total else 0.0,
+            "max_wait_seconds": self.wait_seconds_max,
+            "wait_seconds_histogram": {str(b): self.wait_histogram[b] for b in WAIT_BUCKETS},
+            "avg_service_seconds": self.avg_service_seconds,
+            "estimated_wait_seconds": self.estimated_wait(),
+        }
+
+
+_CAPACITY: Optional[CapacityManager] = None
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return max(0.0, float(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+def get_capacity() -> CapacityManager:
+    """Return the process-wide capacity manager configured from the environment."""
+    global _CAPACITY
+    if _CAPACITY is None:
+        default_concurrency = max(1, cpu_pool_size()) * max_batch_size()
+        _CAPACITY = CapacityManager(
+            concurrency=int(_env_number("ADMISSION_CONCURRENCY", default_concurrency)) or default_concurrency,
+            max_queue=int(_env_number("ADMISSION_MAX_QUEUE", 64)),
+            max_wait_seconds=_env_number("ADMISSION_MAX_WAIT_SECONDS", 30.0),
+        )
+    return _CAPACITY
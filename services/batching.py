@@ -0,0 +1,157 @@
+"""Dynamic micro-batching for summarization requests.
+
+Running the summarization pipeline once per document wastes most of a CPU
+forward pass on batch-of-1 overhead. `SummaryBatcher` sits in front of the
+model: concurrent callers `await batcher.submit(text, preset)`, requests are
+grouped by `LENGTH_PRESETS` key (max/min length must match within a batch)
+and flushed as one padded batch when either
+
+  - `max_batch_size` requests are waiting for the same preset, or
+  - the oldest waiting request has waited `max_wait_ms` milliseconds.
+
+Each batch is executed off the event loop (on the CPU pool by default) and
+the results are fanned back out to the awaiting callers. A failing batch
+fails every request in it with the same exception so callers can retry.
+
+Configuration (environment):
+  - `SUMMARY_MAX_BATCH_SIZE` (default 8; 1 disables batching in the router)
+  - `SUMMARY_MAX_WAIT_MS` (default 20)
+"""
+
+import asyncio
+import os
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from services.executor import run_cpu
+from services.summarizer import generate_summaries
+
+
+BatchRunner = Callable[[List[str], str], Awaitable[List[str]]]
+
+
+@dataclass
+class _Pending:
+    text: str
+    future: "asyncio.Future[str]"
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+async def _run_on_cpu_pool(texts: List[str], preset: str) -> List[str]:
+    """Default runner: execute `generate_summaries` on the CPU pool."""
+    return await run_cpu(generate_summaries, texts, preset)
+
+
+class SummaryBatcher:
+    """Collects concurrent summarization requests into per-preset batches."""
+
+    def __init__(
+        self,
+        runner: Optional[BatchRunner] = None,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 20.0,
+    ) -> None:
+        self.runner: BatchRunner = runner or _run_on_cpu_pool
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self._pending: Dict[str, List[_Pending]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._tasks: set = set()
+
+        # Metrics
+        self.batch_sizes: Counter = Counter()
+        self.requests_total = 0
+        self.batches_total = 0
+        self.queue_wait_seconds_total = 0.0
+
+    async def submit(self, text: str, preset: str) -> str:
+        """Queue `text` for summarization with `preset` and await its summary."""
+        loop = asyncio.get_running_loop()
+        item = _Pending(text=text, future=loop.create_future())
+        queue = self._pending.setdefault(preset, [])
+        queue.append(item)
+        self.requests_total += 1
+
+        if len(queue) >= self.max_batch_size:
+            self._flush(preset)
+        elif preset not in self._timers:
+            self._timers[preset] = loop.call_later(self.max_wait, self._flush, preset)
+        return await item.future
+
+    def _flush(self, preset: str) -> None:
+        """Start a batch for `preset` with up to `max_batch_size` waiting items."""
+        timer = self._timers.pop(preset, None)
+        if timer is not None:
+            timer.cancel()
+
+        queue = self._pending.get(preset, [])
+        batch, rest = queue[: self.max_batch_size], queue[self.max_batch_size :]
+        self._pending[preset] = rest
+        if rest:
+            # Leftovers start a fresh wait window
+            loop = asyncio.get_running_loop()
+            self._timers[preset] = loop.call_later(self.max_wait, self._flush, preset)
+        if not batch:
+            return
+
+        task = asyncio.ensure_future(self._run(batch, preset))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[_Pending], preset: str) -> None:
+        now = time.perf_counter()
+        self.batches_total += 1
+        self.batch_sizes[len(batch)] += 1
+        self.queue_wait_seconds_total += sum(now - item.enqueued_at for item in batch)
+
+        try:
+            results = await self.runner([item.text for item in batch], preset)
+            if len(results) != len(batch):
+                raise RuntimeError(f"Batch runner returned {len(results)} results for {len(batch)} inputs")
+        except Exception as exc:
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_exception(exc)
+            return
+
+        for item, summary in zip(batch, results):
+            if not item.future.done():
+                item.future.set_result(summary)
+
+    def stats(self) -> Dict[str, object]:
+        """Snapshot of batching metrics (batch-size histogram, averages)."""
+        avg_size = self.requests_total / self.batches_total if self.batches_total else 0.0
+        avg_wait = self.queue_wait_seconds_total / self.requests_total if self.requests_total else 0.0
+        return {
+            "requests_total": self.requests_total,
+            "batches_total": self.batches_total,
+            "avg_batch_size": avg_size,
+            "avg_queue_wait_seconds": avg_wait,
+            "batch_size_histogram": dict(sorted(self.batch_sizes.items())),
+            "pending": {preset: len(items) for preset, items in self._pending.items() if items},
+        }
+
+
+_BATCHER: Optional[SummaryBatcher] = None
+
+
+def max_batch_size() -> int:
+    """Configured maximum batch size (`SUMMARY_MAX_BATCH_SIZE`, default 8)."""
+    try:
+        return max(1, int(os.getenv("SUMMARY_MAX_BATCH_SIZE", "8")))
+    except ValueError:
+        return 8
+
+
+def get_batcher() -> SummaryBatcher:
+    """Return the process-wide batcher, creating it from env config on first use."""
+    global _BATCHER
+    if _BATCHER is None:
+        try:
+            max_wait_ms = float(os.getenv("SUMMARY_MAX_WAIT_MS", "20"))
+        except ValueError:
+            max_wait_ms = 20.0
+        _BATCHER = SummaryBatcher(max_batch_size=max_batch_size(), max_wait_ms=max_wait_ms)
+    return _BATCHER
@@ -0,0 +1,243 @@
+"""Model cascade: per-request model routing and a memory-bounded model pool.
+
+Most uploads are short notes that a distilled model summarizes nearly as
+well as `bart-large-cnn` at a fraction of the cost. `SUMMARIZER_CASCADE`
+lists routing rules, separated by `;`, each a model id followed by optional
+conditions:
+
+    SUMMARIZER_CASCADE="sshleifer/distilbart-cnn-12-6 presets=short; sshleifer/distilbart-cnn-12-6 max_tokens=256"
+
+  - `max_tokens=N`: the input is at most N (estimated) tokens
+  - `presets=a,b`: the requested preset is one of them (`chunk` is the
+    map-reduce intermediate preset)
+
+A rule matches when all its conditions hold (a rule without conditions
+matches everything); the first matching rule wins, and inputs no rule
+matches go to `SUMMARIZER_MODEL`. Token counts use `estimate_tokens` on the
+input as received, so routing needs no tokenizer and is deterministic.
+
+Models are loaded lazily by `ModelPool` on first use and kept in LRU order.
+With `SUMMARIZER_MEMORY_BUDGET_MB` set, least recently used models are
+evicted when loading another would exceed the budget (a model's footprint is
+measured once it has loaded). Routing decisions and pool state are exported
+on `/metrics`.
+"""
+
+import gc
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from services.chunking import estimate_tokens
+
+
+@dataclass(frozen=True)
+class Route:
+    """One cascade rule: send matching inputs to `model`."""
+
+    model: str
+    max_tokens: Optional[int] = None
+    presets: Optional[FrozenSet[str]] = None
+
+    def matches(self, tokens: int, preset: str) -> bool:
+        if self.max_tokens is not None and tokens > self.max_tokens:
+            return False
+        if self.presets is not None and preset not in self.presets:
+            return False
+        return True
+
+
+def parse_cascade(spec: str) -> List[Route]:
+    """Parse a `SUMMARIZER_CASCADE` value; raises ValueError on malformed rules."""
+    routes = []
+    for rule in spec.split(";"):
+        parts = rule.split()
+        if not parts:
+            continue
+        model, conditions = parts[0], {}
+        for part in parts[1:]:
+            key, sep, value = part.partition("=")
+            if not sep or not value:
+                raise ValueError(f"Malformed cascade condition {part!r} in rule {rule.strip()!r}")
+            conditions[key] = value
+        unknown = set(conditions) - {"max_tokens", "presets"}
+        if unknown:
+            raise ValueError(f"Unknown cascade condition(s) {sorted(unknown)} in rule {rule.strip()!r}")
+        max_tokens = None
+        if "max_tokens" in conditions:
+            try:
+                max_tokens = int(conditions["max_tokens"])
+            except ValueError:
+                raise ValueError(f"max_tokens must be an integer in rule {rule.strip()!r}")
+        presets = None
+        if "presets" in conditions:
+            presets = frozenset(p.strip().lower() for p in conditions["presets"].split(",") if p.strip())
+        routes.append(Route(model=model, max_tokens=max_tokens, presets=presets))
+    return routes
+
+
+_ROUTES: Tuple[Optional[str], List[Route]] = (None, [])
+
+
+def routes() -> List[Route]:
+    """Rules from `SUMMARIZER_CASCADE` (re-parsed when it changes; invalid -> none)."""
+    global _ROUTES
+    spec = os.getenv("SUMMARIZER_CASCADE", "").strip()
+    if spec != _ROUTES[0]:
+        try:
+            parsed = parse_cascade(spec)
+        except ValueError as exc:
+            logging.warning("Ignoring invalid SUMMARIZER_CASCADE: %s", exc)
+            parsed = []
+        _ROUTES = (spec, parsed)
+    return _ROUTES[1]
+
+
+def select_model(text: str, preset: str, default: str) -> str:
+    """Model for summarizing `text` with `preset` (`default` when no rule matches)."""
+    rules = routes()
+    if not rules:
+        return default
+    tokens = estimate_tokens(text)
+    preset = (preset or "medium").lower()
+    for route in rules:
+        if route.matches(tokens, preset):
+            return route.model
+    return default
+
+
+def configured_models(default: str) -> List[str]:
+    """Distinct models the cascade can route to, default model first."""
+    models = [default]
+    for route in routes():
+        if route.model not in models:
+            models.append(route.model)
+    return models
+
+
+def signature(default: str) -> str:
+    """Identifies the routing configuration (used in summary cache keys).
+
+    Without a cascade this is just the default model id, so cache keys are
+    the same as for a single-model setup.
+    """
+    if not routes():
+        return default
+    digest = hashlib.sha256(f"{default}|{_ROUTES[0]}".encode("utf-8")).hexdigest()[:16]
+    return f"cascade:{digest}"
+
+
+def model_bytes(pipeline: Any) -> int:
+    """Approximate memory held by a pipeline's model (0 if it can't be measured)."""
+    model = getattr(pipeline, "model", None)
+    footprint = getattr(model, "get_memory_footprint", None)
+    if footprint is not None:
+        try:
+            return int(footprint())
+        except Exception:
+            pass
+    try:
+        return sum(p.numel() * p.element_size() for p in model.parameters())
+    except Exception:
+        return 0
+
+
+class ModelPool:
+    """Lazily loaded pipelines, least recently used first, under a memory budget."""
+
+    def __init__(self, loader: Callable[[str], Any], max_bytes: int = 0, measure: Callable[[Any], int] = model_bytes) -> None:
+        self.loader = loader
+        self.max_bytes = max(0, int(max_bytes))
+        self.measure = measure
+        self._models: "OrderedDict[str, Any]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+        self.loads = 0
+        self.evictions = 0
+
+    @property
+    def bytes(self) -> int:
+        return sum(self._sizes.get(name, 0) for name in self._models)
+
+    def _evict_for(self, incoming: int, keep: Optional[str] = None) -> None:
+        """Drop least recently used models until `incoming` more bytes fit the budget."""
+        if not self.max_bytes:
+            return
+        evicted = False
+        for name in list(self._models):
+            if self.bytes + incoming <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            del self._models[name]
+            self.evictions += 1
+            evicted = True
+            logging.info("Evicted summarization model %s (%d MiB)", name, self._sizes.get(name, 0) >> 20)
+        if evicted:
+            # In-flight calls keep their reference; the weights go once they finish
+            gc.collect()
+
+    def get(self, name: str) -> Any:
+        """Return the pipeline for `name`, loading it (and evicting others) if needed."""
+        with self._lock:
+            pipeline = self._models.get(name)
+            if pipeline is not None:
+                self._models.move_to_end(name)
+                return pipeline
+
+        # One load at a time; requests for already loaded models don't wait for it
+        with self._load_lock:
+            with self._lock:
+                pipeline = self._models.get(name)
+                if pipeline is not None:
+                    return pipeline
+                # Make room using the footprint seen the last time this model was loaded
+                self._evict_for(self._sizes.get(name, 0))
+            pipeline = self.loader(name)
+            size = self.measure(pipeline)
+            with self._lock:
+                self._models[name] = pipeline
+                self._sizes[name] = size
+                self.loads += 1
+                self._evict_for(0, keep=name)
+            return pipeline
+
+    def loaded(self) -> List[str]:
+        with self._lock:
+            return list(self._models)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "loaded": {name: self._sizes.get(name, 0) for name in self._models},
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "loads_total": self.loads,
+                "evictions_total": self.evictions,
+            }
+
+
+_POOL: Optional[ModelPool] = None
+
+
+def get_pool(loader: Callable[[str], Any]) -> ModelPool:
+    """Return the process-wide model pool (created on first use with `loader`)."""
+    global _POOL
+    if _POOL is None:
+        try:
+            budget_mb = int(os.getenv("SUMMARIZER_MEMORY_BUDGET_MB", "0"))
+        except ValueError:
+            budget_mb = 0
+        _POOL = ModelPool(loader, max_bytes=max(0, budget_mb) * 1024 * 1024)
+    return _POOL
+
+
+def pool_stats() -> Optional[Dict[str, object]]:
+    """Stats of the model pool, or None if no model was requested in this process."""
+    return _POOL.stats() if _POOL is not None else None
@@ -0,0 +1,93 @@
+"""Sentence-aligned, token-aware text chunking.
+
+Seq2seq summarizers only see a fixed input window (about 1024 tokens for
+BART); anything beyond it is silently truncated. `chunk_text` splits long
+text into chunks that each fit a token budget while keeping sentences
+intact, so every part of a document reaches the model. `iter_chunks` does
+the same for a lazy stream of text segments.
+
+Token counts come from a caller-supplied `count_tokens(str) -> int`
+(normally the model tokenizer); `estimate_tokens` is a cheap heuristic for
+deciding whether chunking is needed at all without loading a tokenizer.
+"""
+
+import re
+from typing import Callable, Iterable, Iterator, List
+
+
+TokenCounter = Callable[[str], int]
+
+# Sentence boundary: terminal punctuation followed by whitespace, or a blank line
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
+
+# Rough characters-per-token ratio for English BPE vocabularies
+_CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token-count estimate (no tokenizer required)."""
+    return len(text) // _CHARS_PER_TOKEN + 1
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split `text` into sentences, dropping empty fragments."""
+    return [s.strip() for s in _SENTENCE_SPLIT.split(text) if s and s.strip()]
+
+
+def _split_oversized(sentence: str, max_tokens: int, count_tokens: TokenCounter) -> List[str]:
+    """Break a single sentence longer than `max_tokens` on word boundaries."""
+    pieces: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for word in sentence.split():
+        word_tokens = max(1, count_tokens(" " + word))
+        if current and current_tokens + word_tokens > max_tokens:
+            pieces.append(" ".join(current))
+            current, current_tokens = [], 0
+        current.append(word)
+        current_tokens += word_tokens
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def iter_chunks(segments: Iterable[str], max_tokens: int, count_tokens: TokenCounter) -> Iterator[str]:
+    """Greedily pack sentences of `segments` into chunks of at most `max_tokens`.
+
+    - `segments` may be a lazy iterator (e.g. pages or paragraphs from
+      `services.extractors`); each chunk is yielded as soon as it is full, so
+      consumers can start before the whole document has been read.
+    - Sentences are never split unless a single sentence exceeds the budget,
+      in which case it is broken on word boundaries. Sentences never span
+      two segments.
+    """
+    if max_tokens <= 0:
+        raise ValueError("max_tokens must be positive")
+
+    current: List[str] = []
+    current_tokens = 0
+
+    for segment in segments:
+        for sentence in split_sentences(segment):
+            sentence_tokens = count_tokens(sentence)
+            if sentence_tokens > max_tokens:
+                if current:
+                    yield " ".join(current)
+                    current, current_tokens = [], 0
+                yield from _split_oversized(sentence, max_tokens, count_tokens)
+                continue
+            if current and current_tokens + sentence_tokens > max_tokens:
+                yield " ".join(current)
+                current, current_tokens = [], 0
+            current.append(sentence)
+            current_tokens += sentence_tokens
+    if current:
+        yield " ".join(current)
+
+
+def chunk_text(text: str, max_tokens: int, count_tokens: TokenCounter) -> List[str]:
+    """Chunk a single string with `iter_chunks`.
+
+    Returns a list of chunk strings in document order (empty for blank text).
+    """
+    return list(iter_chunks([text], max_tokens, count_tokens))
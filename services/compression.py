@@ -0,0 +1,242 @@
+"""Compression of stored document text (`Document.content`).
+
+Extracted text is by far the largest thing in the database. The
+`models.types.CompressedText` column type runs every value through
+`compress` on write and `decompress` on read, so callers keep working with
+`str`.
+
+Stored format: a 6-byte header (`0xFF`, a codec tag, a 4-byte big-endian
+dictionary id, 0 = none) followed by the compressed bytes. `0xFF` never
+starts valid UTF-8, so plain values (rows written before compression, as
+UTF-8 bytes or `str` on SQLite, and texts too short to gain from it) are
+recognized and returned as is; `scripts/manage_content.py migrate` rewrites
+old rows.
+
+Settings:
+  - `CONTENT_COMPRESSION`: `zlib` (default), `zstd` (needs `zstandard`) or
+    `none` (store plain UTF-8)
+  - `CONTENT_COMPRESSION_LEVEL`: codec level (default 6 for zlib, 3 for zstd)
+  - `CONTENT_DICT_DIR`: directory of trained dictionaries, `<id>.dict`
+    (default `dictionaries`)
+  - `CONTENT_DICT_ID`: hex id of the dictionary used for new writes (empty =
+    no dictionary)
+
+Documents share a lot of vocabulary and boilerplate that a per-row
+compressor cannot see; a dictionary trained on the corpus
+(`train_dictionary`) primes it. Rows record the id of the dictionary they
+were written with, and every dictionary ever used must stay in
+`CONTENT_DICT_DIR` for those rows to stay readable.
+"""
+
+import logging
+import os
+import struct
+import threading
+import zlib
+from collections import Counter
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple, Union
+
+
+ZLIB = "zlib"
+ZSTD = "zstd"
+NONE = "none"
+CODECS = (ZLIB, ZSTD, NONE)
+
+MAGIC = b"\xff"
+_TAGS = {ZLIB: b"z", ZSTD: b"s"}
+_CODEC_BY_TAG = {tag: name for name, tag in _TAGS.items()}
+_HEADER = struct.Struct(">cI")
+HEADER_SIZE = len(MAGIC) + _HEADER.size
+
+_DEFAULT_LEVELS = {ZLIB: 6, ZSTD: 3}
+
+# zlib only looks back 32 KiB, so a larger dictionary would be wasted
+ZLIB_DICT_SIZE = 32 * 1024
+
+
+def codec() -> str:
+    """Codec used for new writes (`CONTENT_COMPRESSION`)."""
+    name = os.getenv("CONTENT_COMPRESSION", ZLIB).strip().lower() or ZLIB
+    if name not in CODECS:
+        logging.warning("Ignoring unknown CONTENT_COMPRESSION=%r; using zlib", name)
+        return ZLIB
+    return name
+
+
+def level(codec_name: str) -> int:
+    raw = os.getenv("CONTENT_COMPRESSION_LEVEL", "").strip()
+    try:
+        return int(raw) if raw else _DEFAULT_LEVELS.get(codec_name, 0)
+    except ValueError:
+        return _DEFAULT_LEVELS.get(codec_name, 0)
+
+
+def dict_dir() -> str:
+    return os.getenv("CONTENT_DICT_DIR", "dictionaries")
+
+
+def active_dict_id() -> int:
+    """Id of the dictionary for new writes (`CONTENT_DICT_ID`), 0 for none."""
+    raw = os.getenv("CONTENT_DICT_ID", "").strip()
+    try:
+        return int(raw, 16) if raw else 0
+    except ValueError:
+        logging.warning("Ignoring invalid CONTENT_DICT_ID=%r", raw)
+        return 0
+
+
+def dictionary_id(data: bytes) -> int:
+    """Stable id of a dictionary (crc32 of its bytes; never 0)."""
+    return zlib.crc32(data) or 1
+
+
+@lru_cache(maxsize=16)
+def _read_dictionary(directory: str, dict_id: int) -> bytes:
+    path = os.path.join(directory, f"{dict_id:08x}.dict")
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError as exc:
+        raise RuntimeError(f"Compression dictionary {dict_id:08x} not found in {directory}: {exc}")
+
+
+def load_dictionary(dict_id: int) -> bytes:
+    """Bytes of dictionary `dict_id` from `CONTENT_DICT_DIR`; raises RuntimeError if missing."""
+    return _read_dictionary(dict_dir(), dict_id)
+
+
+def save_dictionary(data: bytes, directory: Optional[str] = None) -> int:
+    """Store a trained dictionary as `<id>.dict` and return its id."""
+    directory = directory or dict_dir()
+    os.makedirs(directory, exist_ok=True)
+    dict_id = dictionary_id(data)
+    path = os.path.join(directory, f"{dict_id:08x}.dict")
+    with open(path + ".part", "wb") as f:
+        f.write(data)
+    os.replace(path + ".part", path)
+    return dict_id
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError as exc:
+        raise RuntimeError("CONTENT_COMPRESSION=zstd requires `pip install zstandard`") from exc
+    return zstandard
+
+
+# zstd (de)compressors are reusable but not thread-safe: one per thread and settings
+_LOCAL = threading.local()
+
+
+def _zstd_compressor(compression_level: int, dict_id: int):
+    cache = _LOCAL.__dict__.setdefault("compressors", {})
+    key = (compression_level, dict_id)
+    if key not in cache:
+        zstandard = _zstandard()
+        zdict = zstandard.ZstdCompressionDict(load_dictionary(dict_id)) if dict_id else None
+        cache[key] = zstandard.ZstdCompressor(level=compression_level, dict_data=zdict)
+    return cache[key]
+
+
+def _zstd_decompressor(dict_id: int):
+    cache = _LOCAL.__dict__.setdefault("decompressors", {})
+    if dict_id not in cache:
+        zstandard = _zstandard()
+        zdict = zstandard.ZstdCompressionDict(load_dictionary(dict_id)) if dict_id else None
+        cache[dict_id] = zstandard.ZstdDecompressor(dict_data=zdict)
+    return cache[dict_id]
+
+
+def compress(text: str, codec_name: Optional[str] = None, dict_id: Optional[int] = None) -> bytes:
+    """Encode `text` for storage with `codec_name` / `dict_id` (default: configured ones)."""
+    codec_name = codec_name or codec()
+    raw = text.encode("utf-8")
+    if codec_name == NONE:
+        return raw
+    dict_id = active_dict_id() if dict_id is None else dict_id
+    compression_level = level(codec_name)
+    if codec_name == ZLIB:
+        if dict_id:
+            compressor = zlib.compressobj(compression_level, zdict=load_dictionary(dict_id))
+        else:
+            compressor = zlib.compressobj(compression_level)
+        payload = compressor.compress(raw) + compressor.flush()
+    elif codec_name == ZSTD:
+        payload = _zstd_compressor(compression_level, dict_id).compress(raw)
+    else:
+        raise ValueError(f"Unknown codec {codec_name!r}")
+    if len(payload) + HEADER_SIZE >= len(raw):
+        # Tiny texts can grow when compressed; keep those plain
+        return raw
+    return MAGIC + _HEADER.pack(_TAGS[codec_name], dict_id) + payload
+
+
+def describe(value: Union[bytes, str]) -> Tuple[str, int]:
+    """`(codec, dictionary id)` a stored value was written with (`none` for plain text)."""
+    if isinstance(value, str) or len(value) < HEADER_SIZE or value[:1] != MAGIC:
+        return NONE, 0
+    tag, dict_id = _HEADER.unpack_from(value, len(MAGIC))
+    if tag not in _CODEC_BY_TAG:
+        raise RuntimeError(f"Unknown content codec tag {tag!r}")
+    return _CODEC_BY_TAG[tag], dict_id
+
+
+def decompress(value: Union[bytes, str]) -> str:
+    """Text of a stored value; plain (pre-compression) values are returned as is."""
+    if isinstance(value, str):
+        return value
+    value = bytes(value)
+    codec_name, dict_id = describe(value)
+    if codec_name == NONE:
+        return value.decode("utf-8")
+    payload = value[HEADER_SIZE:]
+    if codec_name == ZLIB:
+        decompressor = zlib.decompressobj(zdict=load_dictionary(dict_id)) if dict_id else zlib.decompressobj()
+        raw = decompressor.decompress(payload) + decompressor.flush()
+    else:
+        raw = _zstd_decompressor(dict_id).decompress(payload)
+    return raw.decode("utf-8")
+
+
+def train_dictionary(samples: Iterable[str], codec_name: str = ZLIB, size: Optional[int] = None) -> bytes:
+    """Train a dictionary for `codec_name` on sample documents.
+
+    zstd uses its own trainer (`zstandard.train_dictionary`, default 110 KB).
+    zlib has none, so the dictionary is built from the word 4-grams that
+    occur in the most documents, weighted by length and capped at 32 KiB;
+    the most common ones go last, where zlib reaches them with the shortest
+    back-references.
+    """
+    texts = [s for s in samples if s]
+    if not texts:
+        raise ValueError("No samples to train a dictionary on")
+    if codec_name == ZSTD:
+        zstandard = _zstandard()
+        return zstandard.train_dictionary(size or 110 * 1024, [t.encode("utf-8") for t in texts]).as_bytes()
+    if codec_name != ZLIB:
+        raise ValueError(f"Cannot train a dictionary for {codec_name!r}")
+
+    size = min(size or ZLIB_DICT_SIZE, ZLIB_DICT_SIZE)
+    document_frequency: Counter = Counter()
+    for text in texts:
+        words = text.split()
+        document_frequency.update({" ".join(words[i : i + 4]) for i in range(max(0, len(words) - 3))})
+    # Phrases seen in only one document don't help other documents
+    ranked = sorted(
+        (phrase for phrase, count in document_frequency.items() if count > 1),
+        key=lambda phrase: document_frequency[phrase] * len(phrase),
+        reverse=True,
+    )
+    chosen: List[bytes] = []
+    used = 0
+    for phrase in ranked:
+        if used >= size - 8:
+            break
+        encoded = phrase.encode("utf-8") + b" "
+        if used + len(encoded) > size:
+            continue
+        chosen.append(encoded)
+        used += len(encoded)
+    return b"".join(reversed(chosen))
@@ -0,0 +1,39 @@
+"""ETag / conditional GET responses.
+
+Clients poll GET /documents/{id} until its summary appears. Every response
+carries a strong `ETag` (a hash of the JSON body); when the client sends it
+back in `If-None-Match` and nothing changed, `conditional_json` answers
+`304 Not Modified` with an empty body instead of resending the document.
+"""
+
+import hashlib
+import json
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag for a response body."""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an `If-None-Match` header matches `etag` (weak comparison, RFC 9110)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def conditional_json(request: Request, content: Any) -> Response:
+    """JSON response with an ETag, or 304 if the client already has this body."""
+    body = json.dumps(content, separators=(",", ":")).encode("utf-8")
+    etag = make_etag(body)
+    # Clients may cache the body but must revalidate it on every use
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
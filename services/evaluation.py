@@ -0,0 +1,58 @@
+"""Lightweight summary-quality metrics for benchmarks and regression checks.
+
+Dependency-free ROUGE: summaries produced by an optimized path (quantized
+backend, pre-compression, ...) are compared with a baseline summary rather
+than a human reference, so the scores measure drift, not absolute quality.
+Tokens are lowercased alphanumeric words.
+"""
+
+import re
+from collections import Counter
+from typing import List, Tuple
+
+
+_WORD = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    return _WORD.findall(text.lower())
+
+
+def _f1(overlap: int, candidate: int, reference: int) -> float:
+    if overlap == 0 or candidate == 0 or reference == 0:
+        return 0.0
+    precision = overlap / candidate
+    recall = overlap / reference
+    return 2 * precision * recall / (precision + recall)
+
+
+def rouge_n(reference: str, candidate: str, n: int = 1) -> float:
+    """ROUGE-N F1 between two texts."""
+    ref, cand = tokenize(reference), tokenize(candidate)
+    ref_grams = Counter(tuple(ref[i : i + n]) for i in range(len(ref) - n + 1))
+    cand_grams = Counter(tuple(cand[i : i + n]) for i in range(len(cand) - n + 1))
+    overlap = sum((ref_grams & cand_grams).values())
+    return _f1(overlap, sum(cand_grams.values()), sum(ref_grams.values()))
+
+
+def _lcs_length(a: List[str], b: List[str]) -> int:
+    if len(a) < len(b):
+        a, b = b, a
+    previous = [0] * (len(b) + 1)
+    for x in a:
+        current = [0]
+        for j, y in enumerate(b):
+            current.append(previous[j] + 1 if x == y else max(previous[j + 1], current[j]))
+        previous = current
+    return previous[-1]
+
+
+def rouge_l(reference: str, candidate: str) -> float:
+    """ROUGE-L F1 (longest common subsequence) between two texts."""
+    ref, cand = tokenize(reference), tokenize(candidate)
+    return _f1(_lcs_length(ref, cand), len(cand), len(ref))
+
+
+def rouge_scores(reference: str, candidate: str) -> Tuple[float, float, float]:
+    """(ROUGE-1, ROUGE-2, ROUGE-L) F1 scores."""
+    return rouge_n(reference, candidate, 1), rouge_n(reference, candidate, 2), rouge_l(reference, candidate)
@@ -0,0 +1,186 @@
+"""Execution pools for blocking and CPU-bound work.
+
+The API runs on an asyncio event loop, so anything that blocks (disk writes,
+synchronous SQLAlchemy calls) or burns CPU (PDF parsing, model inference)
+must be moved off the loop or every other request on the worker stalls.
+
+This module owns two lazily created, bounded pools:
+
+  - an I/O thread pool (`IO_POOL_SIZE`, default 8) for file writes and DB
+    round-trips
+  - a CPU process pool (`CPU_POOL_SIZE`, default 2) for text extraction and
+    summarization, so GIL-bound parsing doesn't starve the loop thread
+
+Setting `CPU_POOL_SIZE=0` runs CPU work on the I/O thread pool instead. That
+is useful for tests (which patch in closures that can't be pickled) and for
+small deployments that don't want one model copy per worker process.
+
+Use `run_io(func, *args)` / `run_cpu(func, *args)` from async code; both
+return awaitables resolving to the function's result. Code running in a CPU
+worker process can check `in_cpu_worker()` (e.g. to avoid nesting its own
+process pools inside the worker). `await cpu_channel()` returns a queue and
+an event that CPU work can share with the API process while it runs (e.g. to
+stream partial results and be told to stop); with the process pool active
+they live in a `multiprocessing` manager, which `start_manager()` starts
+ahead of time (on application startup).
+"""
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing.managers import SyncManager
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+from services.metrics import REGISTRY
+
+
+T = TypeVar("T")
+
+_IO_POOL: Optional[ThreadPoolExecutor] = None
+_CPU_POOL: Optional[ProcessPoolExecutor] = None
+_MANAGER: Optional[SyncManager] = None
+_MANAGER_LOCK = threading.Lock()
+
+# Set in the environment of CPU pool worker processes
+_CPU_WORKER_ENV = "INTELLI_CPU_WORKER"
+
+
+def _env_int(name: str, default: int) -> int:
+    """Read a non-negative integer from the environment, falling back to `default`."""
+    raw = os.getenv(name)
+    if raw is None or raw.strip() == "":
+        return default
+    try:
+        return max(0, int(raw))
+    except ValueError:
+        logging.warning("Ignoring invalid %s=%r; using %d", name, raw, default)
+        return default
+
+
+def io_pool_size() -> int:
+    """Configured number of I/O threads (at least 1)."""
+    return max(1, _env_int("IO_POOL_SIZE", 8))
+
+
+def cpu_pool_size() -> int:
+    """Configured number of CPU worker processes (0 disables the process pool)."""
+    return _env_int("CPU_POOL_SIZE", 2)
+
+
+def _init_cpu_worker() -> None:
+    os.environ[_CPU_WORKER_ENV] = "1"
+
+
+def in_cpu_worker() -> bool:
+    """True inside a CPU pool worker process."""
+    return os.getenv(_CPU_WORKER_ENV) == "1"
+
+
+def get_io_pool() -> ThreadPoolExecutor:
+    """Return the shared I/O thread pool, creating it on first use."""
+    global _IO_POOL
+    if _IO_POOL is None:
+        _IO_POOL = ThreadPoolExecutor(max_workers=io_pool_size(), thread_name_prefix="io")
+    return _IO_POOL
+
+
+def get_cpu_pool() -> Executor:
+    """Return the executor used for CPU-bound work.
+
+    A process pool when `CPU_POOL_SIZE > 0`, otherwise the I/O thread pool.
+    Worker processes use the `spawn` start method so they never inherit
+    half-initialised torch/tokenizer threads from the API process.
+    """
+    global _CPU_POOL
+    size = cpu_pool_size()
+    if size == 0:
+        return get_io_pool()
+    if _CPU_POOL is None:
+        _CPU_POOL = ProcessPoolExecutor(
+            max_workers=size, mp_context=multiprocessing.get_context("spawn"), initializer=_init_cpu_worker
+        )
+    return _CPU_POOL
+
+
+def start_manager() -> Optional[SyncManager]:
+    """Start the manager behind `cpu_channel` if the process pool is active.
+
+    Blocks while the manager process starts; call it from startup or through
+    `run_io`. Returns None when CPU work runs on threads.
+    """
+    global _MANAGER
+    if cpu_pool_size() == 0:
+        return None
+    with _MANAGER_LOCK:
+        if _MANAGER is None:
+            _MANAGER = multiprocessing.get_context("spawn").Manager()
+        return _MANAGER
+
+
+def _new_channel() -> Tuple[Any, Any]:
+    manager = start_manager()
+    if manager is None:
+        return queue.Queue(), threading.Event()
+    return manager.Queue(), manager.Event()
+
+
+async def cpu_channel() -> Tuple[Any, Any]:
+    """A `(queue, event)` pair usable from CPU work and from the API process.
+
+    Proxies of a shared `multiprocessing` manager when the process pool is
+    active (plain objects can't cross the process boundary), otherwise a
+    `queue.Queue` and a `threading.Event`. Creating proxies talks to the
+    manager process, so it runs on the I/O pool.
+    """
+    return await run_io(_new_channel)
+
+
+async def _run_in(executor: Executor, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+
+
+async def run_io(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking I/O callable on the I/O thread pool."""
+    return await _run_in(get_io_pool(), func, *args, **kwargs)
+
+
+def _run_reporting(func: Callable[..., T], *args: Any, **kwargs: Any) -> Tuple[T, Dict[str, Any]]:
+    """Run `func` in a CPU worker; return its result and the counters it incremented."""
+    result = func(*args, **kwargs)
+    return result, REGISTRY.drain_counters()
+
+
+async def run_cpu(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a CPU-bound callable on the CPU pool.
+
+    When the process pool is active, `func` and its arguments must be
+    picklable (i.e. module-level functions and plain data), and metric
+    counters it increments in the worker are merged into this process.
+    """
+    executor = get_cpu_pool()
+    if executor is get_io_pool():
+        return await _run_in(executor, func, *args, **kwargs)
+    result, counts = await _run_in(executor, _run_reporting, func, *args, **kwargs)
+    REGISTRY.merge_counters(counts)
+    return result
+
+
+def shutdown(wait: bool = True) -> None:
+    """Shut down both pools; they are recreated lazily if used again."""
+    global _IO_POOL, _CPU_POOL, _MANAGER
+    if _CPU_POOL is not None:
+        _CPU_POOL.shutdown(wait=wait, cancel_futures=True)
+        _CPU_POOL = None
+    with _MANAGER_LOCK:
+        if _MANAGER is not None:
+            _MANAGER.shutdown()
+            _MANAGER = None
+    if _IO_POOL is not None:
+        _IO_POOL.shutdown(wait=wait, cancel_futures=True)
+        _IO_POOL = None
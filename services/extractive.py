@@ -0,0 +1,191 @@
+"""Extractive pre-compression ahead of the abstractive model.
+
+Generation cost grows with input length, and most of a long document never
+makes it into a good summary anyway. With `EXTRACTIVE_PRECOMPRESS=1` the
+summarizer first keeps only the most salient sentences, up to a token budget
+tied to the requested preset:
+
+    budget = LENGTH_PRESETS[preset]["max_length"] x EXTRACTIVE_BUDGET_RATIO
+
+(default ratio 4, so short/medium/long keep about 240/600/1200 tokens),
+capped by the model window. Text already within the budget is unchanged.
+Sentences are scored with vectorized NumPy:
+
+  - `textrank` (default): PageRank over the TF-IDF cosine-similarity graph of
+    the sentences; documents with more than `_MAX_GRAPH_SENTENCES` sentences
+    fall back to `tfidf`
+  - `tfidf`: cosine similarity of each sentence to the document centroid
+
+The selected sentences are kept in document order. Token counts use the
+cheap `estimate_tokens` heuristic, so no tokenizer is needed.
+`scripts/bench_precompress.py` measures the latency saved against the ROUGE
+change.
+"""
+
+import math
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from services.chunking import TokenCounter, estimate_tokens, split_sentences
+
+
+TEXTRANK = "textrank"
+TFIDF = "tfidf"
+METHODS = (TEXTRANK, TFIDF)
+
+_WORD = re.compile(r"[^\W_]+")
+
+# Frequent function words carry no salience signal
+_STOPWORDS = frozenset(
+    "a an and are as at be been but by for from had has have he her his i if in into is it its "
+    "of on or our she so than that the their them then there these they this to was we were "
+    "which while who will with would you your".split()
+)
+
+# The similarity graph is quadratic in sentences; beyond this use centroid scoring
+_MAX_GRAPH_SENTENCES = 2000
+# Dense TF-IDF columns kept for the graph (most widespread terms first)
+_MAX_GRAPH_FEATURES = 4096
+
+_DAMPING = 0.85
+_MAX_ITERATIONS = 50
+_TOLERANCE = 1e-6
+
+
+def enabled() -> bool:
+    return os.getenv("EXTRACTIVE_PRECOMPRESS", "0").lower() in ("1", "true", "yes")
+
+
+def method() -> str:
+    value = os.getenv("EXTRACTIVE_METHOD", TEXTRANK).lower()
+    return value if value in METHODS else TEXTRANK
+
+
+def budget_ratio() -> float:
+    try:
+        return max(1.0, float(os.getenv("EXTRACTIVE_BUDGET_RATIO", "4")))
+    except ValueError:
+        return 4.0
+
+
+def settings() -> Dict[str, object]:
+    """Settings that change summaries (part of the summary cache key); {} when disabled."""
+    if not enabled():
+        return {}
+    return {"extractive": method(), "ratio": budget_ratio()}
+
+
+def _tfidf(sentences: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+    """Sparse L2-normalized TF-IDF as (row, column, weight) arrays plus vocabulary size."""
+    rows: List[int] = []
+    words: List[str] = []
+    for i, sentence in enumerate(sentences):
+        tokens = [w for w in _WORD.findall(sentence.lower()) if w not in _STOPWORDS]
+        rows.extend([i] * len(tokens))
+        words.extend(tokens)
+    if not words:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.zeros(0), 0
+
+    vocab, cols = np.unique(np.array(words), return_inverse=True)
+    n_terms = len(vocab)
+    pairs, counts = np.unique(np.array(rows, dtype=np.int64) * n_terms + cols, return_counts=True)
+    rows_arr, cols_arr = pairs // n_terms, pairs % n_terms
+
+    n = len(sentences)
+    df = np.bincount(cols_arr, minlength=n_terms)
+    idf = np.log((1 + n) / (1 + df)) + 1
+    weights = (1 + np.log(counts)) * idf[cols_arr]
+    norms = np.sqrt(np.bincount(rows_arr, weights=weights**2, minlength=n))
+    weights /= norms[rows_arr]
+    return rows_arr, cols_arr, weights, n_terms
+
+
+def centroid_scores(sentences: List[str]) -> np.ndarray:
+    """Cosine similarity of each sentence's TF-IDF vector to the document centroid."""
+    rows, cols, weights, n_terms = _tfidf(sentences)
+    n = len(sentences)
+    if not n_terms:
+        return np.zeros(n)
+    centroid = np.bincount(cols, weights=weights, minlength=n_terms) / n
+    norm = np.linalg.norm(centroid)
+    return np.bincount(rows, weights=weights * centroid[cols], minlength=n) / (norm or 1.0)
+
+
+def textrank_scores(sentences: List[str]) -> np.ndarray:
+    """PageRank scores over the sentences' TF-IDF cosine-similarity graph."""
+    n = len(sentences)
+    if n > _MAX_GRAPH_SENTENCES:
+        return centroid_scores(sentences)
+    rows, cols, weights, n_terms = _tfidf(sentences)
+    if not n_terms:
+        return np.full(n, 1.0 / max(1, n))
+
+    # Keep the terms shared by the most sentences; rare terms add no edges
+    df = np.bincount(cols, minlength=n_terms)
+    kept = np.argsort(-df, kind="stable")[:_MAX_GRAPH_FEATURES]
+    column = np.full(n_terms, -1)
+    column[kept] = np.arange(len(kept))
+    mask = column[cols] >= 0
+
+    matrix = np.zeros((n, len(kept)), dtype=np.float32)
+    matrix[rows[mask], column[cols[mask]]] = weights[mask]
+    lengths = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix /= np.where(lengths > 0, lengths, 1.0)
+
+    similarity = matrix @ matrix.T
+    np.fill_diagonal(similarity, 0.0)
+    out_weight = similarity.sum(axis=1, keepdims=True)
+    # Sentences without edges spread their rank uniformly
+    transition = np.where(out_weight > 0, similarity / np.where(out_weight > 0, out_weight, 1.0), 1.0 / n)
+
+    scores = np.full(n, 1.0 / n)
+    for _ in range(_MAX_ITERATIONS):
+        updated = (1 - _DAMPING) / n + _DAMPING * (transition.T @ scores)
+        if np.abs(updated - scores).sum() < _TOLERANCE:
+            return updated
+        scores = updated
+    return scores
+
+
+def select_sentences(
+    text: str, max_tokens: int, method_name: str = TEXTRANK, count_tokens: TokenCounter = estimate_tokens
+) -> str:
+    """Keep the highest-scoring sentences of `text` that fit `max_tokens`, in document order.
+
+    Returns `text` unchanged if it already fits or has a single sentence.
+    """
+    if count_tokens(text) <= max_tokens:
+        return text
+    sentences = split_sentences(text)
+    if len(sentences) < 2:
+        return text
+
+    scores = textrank_scores(sentences) if method_name == TEXTRANK else centroid_scores(sentences)
+    chosen: List[int] = []
+    remaining = max_tokens
+    # Highest score first; ties go to the earlier sentence
+    for i in np.argsort(-scores, kind="stable"):
+        tokens = count_tokens(sentences[i])
+        if tokens <= remaining:
+            chosen.append(int(i))
+            remaining -= tokens
+    if not chosen:
+        return text
+    return " ".join(sentences[i] for i in sorted(chosen))
+
+
+def token_budget(max_length: int, window: Optional[int] = None) -> int:
+    """Pre-compression budget for a preset generating up to `max_length` tokens."""
+    budget = int(math.ceil(max_length * budget_ratio()))
+    return min(budget, window) if window else budget
+
+
+def precompress(text: str, max_length: int, window: Optional[int] = None) -> str:
+    """Apply `select_sentences` with the preset's budget when `EXTRACTIVE_PRECOMPRESS` is on."""
+    if not enabled():
+        return text
+    return select_sentences(text, token_budget(max_length, window), method())
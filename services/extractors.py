@@ -0,0 +1,244 @@
+"""Pluggable, streaming text extraction keyed by sniffed file type.
+
+Every supported format registers one extractor here; the documents router,
+`file_processing.extract_text` and scripts all go through it, so a format
+behaves the same everywhere.
+
+  - `sniff_mime(path, filename)` identifies a file by its magic bytes
+    (`%PDF-` at the start of the file, a zip holding `word/document.xml`)
+    before trusting the filename suffix; suffix-less files that look like
+    UTF-8 are treated as plain text. Returns None for unsupported files.
+  - `iter_segments(path)` yields `Segment`s lazily: PDF pages, DOCX
+    paragraphs/table cells, or blank-line separated TXT paragraphs, each with
+    its page/paragraph index and character offset in the joined text.
+  - `extract_text(path)` joins the segments once, for callers that need
+    the full text (e.g. to store it).
+
+TXT files are decoded as a whole, as before: UTF-8 if the entire file is
+valid UTF-8, else latin-1. Splitting them into paragraphs normalizes
+whitespace between paragraphs, though: each paragraph is stripped and runs of
+blank (or whitespace-only) lines become one blank line, so the stored text can
+differ from the raw file in that whitespace only. Paragraph segments are what
+lets chunking follow the document's structure, and the summarizer ignores the
+difference.
+
+Extraction failures are raised as `RuntimeError` ("PDF extraction failed:
+..."), unsupported files as `ValueError`. New formats are added with the
+`register()` decorator.
+"""
+
+import codecs
+import logging
+import os
+import zipfile
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from services.docx_extraction import iter_docx_text
+from services.pdf_extraction import iter_pdf_pages
+
+
+PDF = "application/pdf"
+DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+TEXT = "text/plain"
+
+# Bytes read from the start of a file to sniff its type / text encoding
+_SNIFF_BYTES = 64 * 1024
+
+
+@dataclass(frozen=True)
+class Segment:
+    """A piece of extracted text and where it came from."""
+
+    text: str
+    # Character offset of `text` in the joined document text
+    offset: int = 0
+    # 0-based page (PDF) or paragraph / table cell (DOCX, TXT) index
+    page: Optional[int] = None
+    paragraph: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class Extractor:
+    """A registered format: how to recognize it and how to read it."""
+
+    mime: str
+    label: str
+    suffixes: Tuple[str, ...]
+    extract: Callable[[str], Iterator[Segment]]
+    # Magic-byte check on the first bytes of the file (and its path, for containers)
+    sniff: Optional[Callable[[bytes, str], bool]] = None
+    # Separator between segments in the joined text
+    separator: str = "\n"
+
+
+_REGISTRY: Dict[str, Extractor] = {}
+
+
+def register(
+    mime: str,
+    label: str,
+    suffixes: Tuple[str, ...],
+    sniff: Optional[Callable[[bytes, str], bool]] = None,
+    separator: str = "\n",
+) -> Callable[[Callable[[str], Iterator[Segment]]], Callable[[str], Iterator[Segment]]]:
+    """Decorator registering a segment generator for `mime`."""
+
+    def decorator(func: Callable[[str], Iterator[Segment]]) -> Callable[[str], Iterator[Segment]]:
+        _REGISTRY[mime] = Extractor(mime, label, tuple(s.lower() for s in suffixes), func, sniff, separator)
+        return func
+
+    return decorator
+
+
+def supported_suffixes() -> Tuple[str, ...]:
+    """Filename suffixes of all registered formats."""
+    return tuple(s for extractor in _REGISTRY.values() for s in extractor.suffixes)
+
+
+def _is_utf8(head: bytes) -> bool:
+    """True if `head` decodes as UTF-8 (a multi-byte char cut off at the end is fine)."""
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def _file_is_utf8(path: str) -> bool:
+    """True if the whole file decodes as UTF-8 (checked in blocks, not loaded at once)."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(_SNIFF_BYTES), b""):
+                decoder.decode(block)
+        decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def _looks_like_text(head: bytes) -> bool:
+    return b"\x00" not in head and _is_utf8(head)
+
+
+def _read_head(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read(_SNIFF_BYTES)
+
+
+def sniff_mime(path: str, filename: Optional[str] = None) -> Optional[str]:
+    """Identify the file at `path`; None if no extractor handles it.
+
+    Magic bytes win over the name, so a PDF called `scan.jpg` is still a
+    PDF. Otherwise the suffix of `filename` (or `path`) decides, and a file
+    with no suffix at all is accepted as text if it looks like UTF-8.
+    """
+    head = _read_head(path)
+    for extractor in _REGISTRY.values():
+        if extractor.sniff is not None and extractor.sniff(head, path):
+            return extractor.mime
+
+    name = (filename or os.path.basename(path)).lower()
+    for extractor in _REGISTRY.values():
+        if name.endswith(extractor.suffixes):
+            return extractor.mime
+    if TEXT in _REGISTRY and not os.path.splitext(name)[1] and _looks_like_text(head):
+        return TEXT
+    return None
+
+
+def iter_segments(path: str, mime: Optional[str] = None, filename: Optional[str] = None) -> Iterator[Segment]:
+    """Yield the non-blank segments of a file with offsets into the joined text.
+
+    `mime` skips sniffing when the caller already knows the type. Raises
+    `ValueError` for unsupported files and `RuntimeError` when extraction
+    fails.
+    """
+    mime = mime or sniff_mime(path, filename)
+    extractor = _REGISTRY.get(mime) if mime else None
+    if extractor is None:
+        raise ValueError(f"Unsupported file type; supported: {', '.join(supported_suffixes())}")
+
+    offset = 0
+    try:
+        for segment in extractor.extract(path):
+            text = segment.text.strip()
+            if not text:
+                continue
+            if offset:
+                offset += len(extractor.separator)
+            yield replace(segment, text=text, offset=offset)
+            offset += len(text)
+    except Exception as exc:
+        # Engine-specific errors (corrupt PDFs, bad XML, unreadable files, ...)
+        raise RuntimeError(f"{extractor.label} extraction failed: {exc}")
+
+
+def join_texts(mime: str, texts: Iterable[str]) -> str:
+    """Join pieces of extracted `mime` text like `extract_text` does, dropping blank ones."""
+    separator = _REGISTRY[mime].separator if mime in _REGISTRY else "\n"
+    return separator.join(stripped for stripped in (text.strip() for text in texts) if stripped)
+
+
+def extract_text(path: str, mime: Optional[str] = None, filename: Optional[str] = None) -> str:
+    """Return the full text of a file (segments joined once); see `iter_segments`."""
+    mime = mime or sniff_mime(path, filename)
+    return join_texts(mime, (segment.text for segment in iter_segments(path, mime, filename)))
+
+
+# Built-in formats
+
+
+def _is_pdf(head: bytes, path: str) -> bool:
+    # Only at the start (after an optional BOM or whitespace): text that merely
+    # mentions "%PDF-" stays text
+    if head.startswith(codecs.BOM_UTF8):
+        head = head[len(codecs.BOM_UTF8):]
+    return head.lstrip(b" \t\r\n\f").startswith(b"%PDF-")
+
+
+@register(PDF, "PDF", (".pdf",), sniff=_is_pdf)
+def _pdf_segments(path: str) -> Iterator[Segment]:
+    engines: Dict[str, Dict[str, float]] = {}
+    for page in iter_pdf_pages(path):
+        stats = engines.setdefault(page.engine, {"pages": 0, "seconds": 0.0})
+        stats["pages"] += 1
+        stats["seconds"] += page.seconds
+        yield Segment(page.text, page=page.index)
+    logging.info("PDF extraction timings: %s", engines)
+
+
+def _is_docx(head: bytes, path: str) -> bool:
+    if not head.startswith(b"PK\x03\x04"):
+        return False
+    try:
+        with zipfile.ZipFile(path) as archive:
+            archive.getinfo("word/document.xml")
+        return True
+    except (zipfile.BadZipFile, KeyError, OSError):
+        return False
+
+
+@register(DOCX, "DOCX", (".docx",), sniff=_is_docx)
+def _docx_segments(path: str) -> Iterator[Segment]:
+    for index, text in enumerate(iter_docx_text(path)):
+        yield Segment(text, paragraph=index)
+
+
+@register(TEXT, "Text", (".txt",), separator="\n\n")
+def _text_segments(path: str) -> Iterator[Segment]:
+    # Like the original whole-file decode: utf-8 if the entire file is valid, else latin-1
+    encoding = "utf-8" if _file_is_utf8(path) else "latin-1"
+    with open(path, encoding=encoding) as f:
+        lines = []
+        index = 0
+        for line in f:
+            if line.strip():
+                lines.append(line)
+            elif lines:
+                yield Segment("".join(lines), paragraph=index)
+                lines = []
+                index += 1
+        if lines:
+            yield Segment("".join(lines), paragraph=index)
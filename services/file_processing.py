@@ -1,16 +1,22 @@
 """File text extraction helpers for uploaded documents.
 
 Provides `extract_text(file: UploadFile) -> str` which supports PDF, DOCX,
-and TXT files. Uses `pdfplumber` (preferred) or `PyMuPDF` as a fallback for
-PDFs and `python-docx` for DOCX. Raises `ValueError` for unsupported types
-and `RuntimeError` for extraction failures.
+and TXT files. The upload is streamed to a temporary file and handed to the
+`services.extractors` registry, which sniffs the type from the content and
+filename, so this behaves exactly like the documents router. Raises
+`ValueError` for unsupported types and `RuntimeError` for extraction
+failures.
 """
 
-from io import BytesIO
-from typing import Optional
+import os
+import tempfile
 
 from fastapi import UploadFile
 
+from services import extractors
+from services.executor import run_cpu, run_io
+from services.uploads import stream_to_disk
+
 
 async def extract_text(file: UploadFile) -> str:
     """Read an uploaded file and return extracted text.
@@ -20,73 +26,29 @@ async def extract_text(file: UploadFile) -> str:
     - Raises `ValueError` for unsupported file types
     - Raises `RuntimeError` for extraction failures or empty content
     """
-    filename = (file.filename or "").lower()
-
-    # Read file bytes and close the upload
+    fd, path = tempfile.mkstemp(prefix="upload-")
+    os.close(fd)
     try:
-        data = await file.read()
-    finally:
-        await file.close()
-
-    if not data:
-        raise RuntimeError("Uploaded file is empty")
-
-    # PDF extraction: prefer pdfplumber, fall back to PyMuPDF (fitz)
-    if filename.endswith(".pdf"):
-        # Try pdfplumber first
-        try:
-            import pdfplumber
-
-            with pdfplumber.open(BytesIO(data)) as pdf:
-                pages = [p.extract_text() or "" for p in pdf.pages]
-            text = "\n".join(pages).strip()
-            if text:
-                return text
-        except Exception:
-            # ignore and try fallback
-            pass
-
-        # Fallback: PyMuPDF
         try:
-            import fitz  # PyMuPDF
-
-            doc = fitz.open(stream=data, filetype="pdf")
-            text_parts = [page.get_text() for page in doc]
-            doc.close()
-            text = "\n".join(text_parts).strip()
-            if text:
-                return text
-            raise RuntimeError("No text extracted from PDF")
-        except Exception as exc:
-            raise RuntimeError(f"PDF extraction failed: {exc}")
-
-    # DOCX extraction using python-docx
-    if filename.endswith(".docx"):
-        try:
-            import docx
-
-            doc = docx.Document(BytesIO(data))
-            paragraphs = [p.text for p in doc.paragraphs]
-            text = "\n".join(paragraphs).strip()
-            if text:
-                return text
-            raise RuntimeError("No text extracted from DOCX")
-        except Exception as exc:
-            raise RuntimeError(f"DOCX extraction failed: {exc}")
+            stored = await stream_to_disk(file, path)
+        finally:
+            await file.close()
+        if stored.size == 0:
+            raise RuntimeError("Uploaded file is empty")
+
+        mime = await run_io(extractors.sniff_mime, path, file.filename)
+        if mime is None:
+            raise ValueError(f"Unsupported file type; supported: {', '.join(extractors.supported_suffixes())}")
+        text = await run_cpu(extractors.extract_text, path, mime)
+        if not text:
+            raise RuntimeError("No text extracted from uploaded file")
+        return text
+    finally:
+        await run_io(_remove_quietly, path)
 
-    # Plain text files
-    if filename.endswith(".txt"):
-        try:
-            try:
-                text = data.decode("utf-8")
-            except UnicodeDecodeError:
-                text = data.decode("latin-1")
-            text = text.strip()
-            if text:
-                return text
-            raise RuntimeError("Uploaded text file is empty")
-        except Exception as exc:
-            raise RuntimeError(f"Text extraction failed: {exc}")
 
-    # Unsupported file type
-    raise ValueError("Unsupported file type; supported: .pdf, .docx, .txt")
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,99 @@
+"""Selectable CPU inference backends for the summarization pipeline.
+
+`SUMMARIZER_BACKEND` picks how the model behind the `transformers`
+summarization pipeline is executed:
+
+  - `torch` (default): full-precision PyTorch on CPU, as before
+  - `torch-int8`: the same model with every `nn.Linear` dynamically quantized
+    to int8 (`torch.ao.quantization.quantize_dynamic`); weights shrink about
+    4x and matmuls use int8 kernels, at a small quality cost
+  - `onnx`: the model exported to ONNX and run by ONNX Runtime through
+    `optimum.onnxruntime`. The export is slow, so set `ONNX_MODEL_DIR` to a
+    directory where it is saved on first use and loaded afterwards; each
+    model gets its own subdirectory (`export_dir()`).
+
+Every backend returns a regular summarization pipeline, so the rest of
+`services.summarizer` is unchanged. Compare latency, throughput, memory and
+summary quality across backends with `scripts/bench_backends.py`.
+"""
+
+import logging
+import os
+import re
+from typing import Any, Callable, Dict, Optional
+
+
+TORCH = "torch"
+TORCH_INT8 = "torch-int8"
+ONNX = "onnx"
+
+
+def backend_name() -> str:
+    """Backend configured via `SUMMARIZER_BACKEND` (unknown values fall back to torch)."""
+    name = os.getenv("SUMMARIZER_BACKEND", TORCH).strip().lower()
+    if name not in _BUILDERS:
+        logging.warning("Unknown SUMMARIZER_BACKEND %r; using %s", name, TORCH)
+        return TORCH
+    return name
+
+
+def export_dir(model: str) -> Optional[str]:
+    """Where the ONNX export of `model` is kept: `ONNX_MODEL_DIR/<model id>`, or None."""
+    root = os.getenv("ONNX_MODEL_DIR")
+    if not root:
+        return None
+    # "org/name" -> "org--name"; anything else unsafe in a path becomes "_"
+    name = re.sub(r"[^A-Za-z0-9._-]", "_", model.strip("/").replace("/", "--")).lstrip(".")
+    return os.path.join(root, name or "model")
+
+
+def _torch_pipeline(model: str) -> Any:
+    from transformers import pipeline
+
+    return pipeline("summarization", model=model, device=-1)
+
+
+def _torch_int8_pipeline(model: str) -> Any:
+    import torch
+    from torch.ao.quantization import quantize_dynamic
+
+    summarizer = _torch_pipeline(model)
+    summarizer.model = quantize_dynamic(summarizer.model, {torch.nn.Linear}, dtype=torch.qint8)
+    summarizer.model.eval()
+    return summarizer
+
+
+def _onnx_pipeline(model: str) -> Any:
+    try:
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    except ImportError as exc:
+        raise RuntimeError("SUMMARIZER_BACKEND=onnx requires `pip install optimum[onnxruntime]`") from exc
+    from transformers import AutoTokenizer, pipeline
+
+    saved = export_dir(model)
+    if saved and os.path.isfile(os.path.join(saved, "config.json")):
+        ort_model = ORTModelForSeq2SeqLM.from_pretrained(saved)
+        tokenizer = AutoTokenizer.from_pretrained(saved)
+    else:
+        logging.info("Exporting %s to ONNX (set ONNX_MODEL_DIR to keep the export)", model)
+        ort_model = ORTModelForSeq2SeqLM.from_pretrained(model, export=True)
+        tokenizer = AutoTokenizer.from_pretrained(model)
+        if saved:
+            ort_model.save_pretrained(saved)
+            tokenizer.save_pretrained(saved)
+    return pipeline("summarization", model=ort_model, tokenizer=tokenizer)
+
+
+_BUILDERS: Dict[str, Callable[[str], Any]] = {
+    TORCH: _torch_pipeline,
+    TORCH_INT8: _torch_int8_pipeline,
+    ONNX: _onnx_pipeline,
+}
+
+
+def build_pipeline(model: str, backend: Optional[str] = None) -> Any:
+    """Create a summarization pipeline for `model` on `backend` (default: configured)."""
+    backend = backend or backend_name()
+    if backend not in _BUILDERS:
+        raise ValueError(f"Unknown backend {backend!r}; expected one of: {', '.join(_BUILDERS)}")
+    return _BUILDERS[backend](model)
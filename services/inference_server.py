@@ -0,0 +1,208 @@
+"""Shared local inference server: one copy of the model for all API workers.
+
+Every uvicorn worker (and every CPU pool process) used to build its own
+summarization pipeline, so N workers held N copies of the weights. With
+`SUMMARIZER_SOCKET` set, `services.summarizer` sends its model calls to a
+single server process listening on that Unix socket instead, and workers
+never load the model themselves:
+
+    python scripts/run_inference_server.py           # loads the model once
+    SUMMARIZER_SOCKET=/tmp/intelli-summarize.sock uvicorn main:app --workers 8
+
+The server micro-batches requests from all workers with `SummaryBatcher`
+and runs the model on one thread, so concurrent uploads across workers still
+share forward passes. Long documents go through `summarizer.summarize_text`
+on the server (extractive pre-compression, then map-reduce if the text still
+exceeds the window); shorter ones are pre-compressed by the batch runner.
+
+Protocol: each message is a 4-byte big-endian length followed by a UTF-8
+JSON object. Requests carry an `op` (`ping`, `summaries`, `summarize`,
+`summarize_presets`);
+responses carry `ok` plus either the result or an `error` string, which the
+client re-raises as `RuntimeError` (the summarizer's error contract).
+`scripts/measure_rss.py` compares per-worker RSS with and without the server.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from services import summarizer
+from services.batching import SummaryBatcher
+
+
+DEFAULT_SOCKET = "/tmp/intelli-summarize.sock"
+
+_HEADER = struct.Struct(">I")
+
+# Set in the server process so its own summarizer calls run the local model
+_SERVING = False
+
+
+def _encode(message: Dict[str, Any]) -> bytes:
+    body = json.dumps(message).encode("utf-8")
+    return _HEADER.pack(len(body)) + body
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    buffer = bytearray()
+    while len(buffer) < size:
+        chunk = sock.recv(size - len(buffer))
+        if not chunk:
+            raise ConnectionError("Inference server closed the connection")
+        buffer.extend(chunk)
+    return bytes(buffer)
+
+
+class InferenceClient:
+    """Blocking client for the inference server (one connection per call)."""
+
+    def __init__(self, path: str, timeout: float = 300.0) -> None:
+        self.path = path
+        self.timeout = timeout
+
+    def call(self, op: str, **payload: Any) -> Dict[str, Any]:
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(self.timeout)
+                sock.connect(self.path)
+                sock.sendall(_encode({"op": op, **payload}))
+                (size,) = _HEADER.unpack(_recv_exactly(sock, _HEADER.size))
+                response = json.loads(_recv_exactly(sock, size))
+        except OSError as exc:
+            raise RuntimeError(f"Inference server unavailable at {self.path}: {exc}")
+        if not response.get("ok"):
+            raise RuntimeError(response.get("error") or "Inference server error")
+        return response
+
+    def ping(self) -> Dict[str, Any]:
+        return self.call("ping")
+
+    def wait_ready(self, timeout: float = 120.0, interval: float = 0.5) -> Dict[str, Any]:
+        """Ping until the server answers (it only listens once the model is loaded)."""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                return self.ping()
+            except RuntimeError:
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(interval)
+
+    def summaries(self, texts: List[str], preset: str) -> List[str]:
+        return self.call("summaries", texts=list(texts), preset=preset)["summaries"]
+
+    def summarize(self, text: str, length: str) -> str:
+        return self.call("summarize", text=text, length=length)["summary"]
+
+    def summarize_presets(self, text: str, presets: List[str]) -> Dict[str, str]:
+        return self.call("summarize_presets", text=text, presets=list(presets))["summaries"]
+
+
+_CLIENT: Optional[InferenceClient] = None
+
+
+def get_client() -> Optional[InferenceClient]:
+    """Client for `SUMMARIZER_SOCKET`, or None when the model should run locally."""
+    global _CLIENT
+    path = os.getenv("SUMMARIZER_SOCKET")
+    if _SERVING or not path:
+        return None
+    if _CLIENT is None or _CLIENT.path != path:
+        try:
+            timeout = float(os.getenv("SUMMARIZER_SOCKET_TIMEOUT", "300"))
+        except ValueError:
+            timeout = 300.0
+        _CLIENT = InferenceClient(path, timeout=timeout)
+    return _CLIENT
+
+
+class InferenceServer:
+    """Owns the only model copy and serves summarization over a Unix socket."""
+
+    def __init__(self, path: str, max_batch_size: int = 8, max_wait_ms: float = 20.0) -> None:
+        self.path = path
+        # The model is used from a single thread; batching provides the parallelism
+        self._model_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model")
+        self.batcher = SummaryBatcher(runner=self._run_batch, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+        self.requests_total = 0
+
+    async def _in_model_thread(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._model_thread, func, *args)
+
+    async def _run_batch(self, texts: List[str], preset: str) -> List[str]:
+        return await self._in_model_thread(summarizer.generate_summaries, texts, preset)
+
+    async def _dispatch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        op = request.get("op")
+        if op == "ping":
+            return {
+                "model": summarizer.model_name(),
+                "backend": summarizer.backend_name(),
+                "pid": os.getpid(),
+                "requests_total": self.requests_total,
+                "batching": self.batcher.stats(),
+            }
+        if op == "summaries":
+            texts, preset = request["texts"], request["preset"]
+            results = await asyncio.gather(*(self.batcher.submit(text, preset) for text in texts))
+            return {"summaries": list(results)}
+        if op == "summarize":
+            text, length = request["text"], request["length"]
+            if summarizer.is_long_text(text):
+                # Same path as a local call: pre-compression first, map-reduce only if still needed
+                summary = await self._in_model_thread(summarizer.summarize_text, text, length)
+            else:
+                summary = await self.batcher.submit(text, length)
+            return {"summary": summary}
+        if op == "summarize_presets":
+            summaries = await self._in_model_thread(summarizer.summarize_presets, request["text"], request["presets"])
+            return {"summaries": summaries}
+        raise ValueError(f"Unknown op {op!r}")
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            (size,) = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+            try:
+                request = json.loads(await reader.readexactly(size))
+            except (json.JSONDecodeError, UnicodeDecodeError) as exc:
+                response = {"ok": False, "error": f"Malformed request: {exc}"}
+            else:
+                self.requests_total += 1
+                try:
+                    response = {"ok": True, **await self._dispatch(request)}
+                except Exception as exc:
+                    response = {"ok": False, "error": str(exc)}
+            writer.write(_encode(response))
+            await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve_forever(self) -> None:
+        """Load the model, then listen on the socket until cancelled."""
+        global _SERVING
+        _SERVING = True
+        started = time.perf_counter()
+        await self._in_model_thread(summarizer.load_model)
+        logging.info("Model %s loaded in %.1fs", summarizer.model_name(), time.perf_counter() - started)
+
+        if os.path.exists(self.path):
+            os.remove(self.path)  # stale socket from a previous run
+        server = await asyncio.start_unix_server(self._handle, path=self.path)
+        os.chmod(self.path, 0o660)
+        logging.info("Inference server listening on %s (pid %d)", self.path, os.getpid())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self._model_thread.shutdown(wait=False)
+            if os.path.exists(self.path):
+                os.remove(self.path)
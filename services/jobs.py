@@ -0,0 +1,287 @@
+"""Background job queue for asynchronous uploads.
+
+With `mode=async` the upload endpoint persists the file, inserts a
+`SummaryJob` row and returns 202 immediately; the slow extraction and
+summarization happen here, so request latency no longer depends on model
+latency (or on load-balancer timeouts).
+
+The `summary_jobs` table is the queue. `JobQueue` runs `JOB_WORKERS`
+(default 2) asyncio worker loops that
+
+  1. claim the oldest `queued` job with a conditional UPDATE (so several
+     API processes and standalone workers can share one table safely),
+  2. hand it to a processor coroutine supplied by the caller (the
+     documents router's `process_job`), and
+  3. record `done` with the resulting document id, or `failed` with the
+     error message.
+
+Jobs left `running` by a worker that crashed or was stopped are recovered:
+before claiming, any `running` job started more than `JOB_STALE_AFTER`
+seconds ago (default 900) is requeued, or marked `failed` once it has been
+attempted `JOB_MAX_ATTEMPTS` times (default 3) so a job that kills its
+worker can't loop forever; either way its blob reference is released once
+it finishes. A graceful `JobQueue.stop()` requeues its own in-flight jobs
+right away. Keep `JOB_STALE_AFTER` above the slowest expected job, or a
+live job may be picked up a second time.
+
+Workers wake immediately when a job is enqueued in the same process and
+otherwise poll every `JOB_POLL_INTERVAL` seconds (default 0.5). Set
+`JOB_WORKERS=0` to disable in-process workers and run
+`python scripts/run_worker.py` instead.
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Iterable, List, Optional, Set, Tuple
+from uuid import uuid4
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models.job import JOB_DONE, JOB_FAILED, JOB_QUEUED, JOB_RUNNING, SummaryJob
+from services.executor import run_io
+
+
+# Processor: given a session and a claimed job, return the upload result dict
+# (`id`, `summary`, optional `message`) or raise.
+JobProcessor = Callable[[Session, SummaryJob], Awaitable[dict]]
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return max(0.0, float(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+def stale_after() -> float:
+    """Seconds after which a `running` job is considered abandoned."""
+    return _env_number("JOB_STALE_AFTER", 900)
+
+
+def max_attempts() -> int:
+    """Claims of one job before a stale job is failed instead of requeued."""
+    return max(1, int(_env_number("JOB_MAX_ATTEMPTS", 3)))
+
+
+def enqueue(
+    db: Session, filename: str, file_path: str, length: str, retries: int, content_hash: Optional[str] = None
+) -> SummaryJob:
+    """Insert a queued job and return it (synchronous; run on the I/O pool)."""
+    job = SummaryJob(
+        id=uuid4().hex,
+        filename=filename,
+        file_path=file_path,
+        content_hash=content_hash,
+        length=length,
+        retries=retries,
+        status=JOB_QUEUED,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def requeue_stale(db: Session, older_than: Optional[float] = None, limit: Optional[int] = None) -> Tuple[int, int]:
+    """Recover `running` jobs started more than `older_than` seconds ago.
+
+    Jobs with attempts left go back to `queued`; the others are marked
+    `failed`. Returns (requeued, failed).
+    """
+    cutoff = _now() - timedelta(seconds=stale_after() if older_than is None else older_than)
+    attempts = max_attempts() if limit is None else limit
+    stale = db.query(SummaryJob).filter(SummaryJob.status == JOB_RUNNING, SummaryJob.started_at <= cutoff)
+    # Both UPDATEs re-check the status, so a job that just finished is left alone
+    requeued = stale.filter(SummaryJob.attempts < attempts).update(
+        {"status": JOB_QUEUED, "started_at": None}, synchronize_session=False
+    )
+    failed = stale.filter(SummaryJob.attempts >= attempts).update(
+        {
+            "status": JOB_FAILED,
+            "message": f"Worker stopped while processing the job; gave up after {attempts} attempts",
+            "finished_at": _now(),
+        },
+        synchronize_session=False,
+    )
+    db.commit()
+    if requeued or failed:
+        logging.warning("Recovered abandoned jobs: %d requeued, %d failed", requeued, failed)
+    return requeued, failed
+
+
+def requeue(db: Session, job_ids: Iterable[str]) -> int:
+    """Put still-`running` jobs back in the queue (e.g. on shutdown)."""
+    ids = list(job_ids)
+    if not ids:
+        return 0
+    count = (
+        db.query(SummaryJob)
+        .filter(SummaryJob.id.in_(ids), SummaryJob.status == JOB_RUNNING)
+        .update({"status": JOB_QUEUED, "started_at": None}, synchronize_session=False)
+    )
+    db.commit()
+    return count
+
+
+def claim_next(db: Session) -> Optional[SummaryJob]:
+    """Atomically move the oldest queued job to `running` and return it.
+
+    Abandoned `running` jobs are requeued first (see `requeue_stale`). The
+    conditional UPDATE only succeeds for one claimant, so concurrent
+    workers (in this or other processes) never process the same job twice.
+    """
+    requeue_stale(db)
+    while True:
+        candidate = (
+            db.query(SummaryJob.id)
+            .filter(SummaryJob.status == JOB_QUEUED)
+            .order_by(SummaryJob.created_at, SummaryJob.id)
+            .first()
+        )
+        if candidate is None:
+            return None
+        claimed = (
+            db.query(SummaryJob)
+            .filter(SummaryJob.id == candidate.id, SummaryJob.status == JOB_QUEUED)
+            .update(
+                {"status": JOB_RUNNING, "started_at": _now(), "attempts": SummaryJob.attempts + 1},
+                synchronize_session=False,
+            )
+        )
+        db.commit()
+        if claimed:
+            return db.get(SummaryJob, candidate.id)
+
+
+def finish(db: Session, job_id: str, status: str, document_id: Optional[int] = None, message: Optional[str] = None) -> None:
+    """Record the outcome of a job."""
+    db.query(SummaryJob).filter(SummaryJob.id == job_id).update(
+        {"status": status, "document_id": document_id, "message": message, "finished_at": _now()},
+        synchronize_session=False,
+    )
+    db.commit()
+
+
+class JobQueue:
+    """Runs background worker loops that drain the `summary_jobs` table."""
+
+    def __init__(self, workers: int = 2, poll_interval: float = 0.5, session_factory=SessionLocal) -> None:
+        self.workers = max(0, int(workers))
+        self.poll_interval = max(0.01, float(poll_interval))
+        self.session_factory = session_factory
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = False
+        # Jobs claimed by this queue's workers and not finished yet
+        self._claimed: Set[str] = set()
+
+        self.processed = 0
+        self.failed = 0
+
+    def notify(self) -> None:
+        """Wake idle workers (call after enqueueing in this process)."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def start(self, processor: JobProcessor) -> None:
+        """Spawn the worker loops on the running event loop."""
+        if self._tasks or self.workers == 0:
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.ensure_future(self._worker(processor, i)) for i in range(self.workers)]
+        logging.info("Started %d background summarization workers", self.workers)
+
+    async def stop(self) -> None:
+        """Cancel worker loops and requeue the jobs they were processing."""
+        self._stopping = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._claimed:
+            db = self.session_factory()
+            try:
+                count = await run_io(requeue, db, list(self._claimed))
+                logging.info("Requeued %d in-flight jobs on shutdown", count)
+            except Exception:
+                logging.exception("Failed to requeue in-flight jobs; they are recovered after JOB_STALE_AFTER")
+            finally:
+                db.close()
+            self._claimed.clear()
+
+    async def run_forever(self, processor: JobProcessor) -> None:
+        """Run workers until cancelled (used by the standalone worker script)."""
+        self.workers = max(1, self.workers)
+        self.start(processor)
+        await asyncio.gather(*self._tasks)
+
+    async def _worker(self, processor: JobProcessor, index: int) -> None:
+        while not self._stopping:
+            try:
+                handled = await self._run_one(processor)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logging.exception("Job worker %d crashed while claiming a job", index)
+                handled = False
+            if handled:
+                continue
+            # Idle: sleep until notified or the poll interval elapses
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _run_one(self, processor: JobProcessor) -> bool:
+        """Claim and process a single job; returns False if the queue is empty."""
+        db = self.session_factory()
+        try:
+            job = await run_io(claim_next, db)
+            if job is None:
+                return False
+            self._claimed.add(job.id)
+            try:
+                result = await processor(db, job)
+            except HTTPException as exc:
+                await run_io(finish, db, job.id, JOB_FAILED, None, str(exc.detail))
+                self.failed += 1
+            except Exception as exc:
+                logging.exception("Background job %s failed", job.id)
+                await run_io(finish, db, job.id, JOB_FAILED, None, str(exc))
+                self.failed += 1
+            else:
+                await run_io(finish, db, job.id, JOB_DONE, result.get("id"), result.get("message"))
+                self.processed += 1
+            self._claimed.discard(job.id)
+            return True
+        finally:
+            db.close()
+
+
+_QUEUE: Optional[JobQueue] = None
+
+
+def get_queue() -> JobQueue:
+    """Return the process-wide job queue configured from the environment."""
+    global _QUEUE
+    if _QUEUE is None:
+        try:
+            workers = int(os.getenv("JOB_WORKERS", "2"))
+        except ValueError:
+            workers = 2
+        try:
+            poll_interval = float(os.getenv("JOB_POLL_INTERVAL", "0.5"))
+        except ValueError:
+            poll_interval = 0.5
+        _QUEUE = JobQueue(workers=workers, poll_interval=poll_interval)
+    return _QUEUE
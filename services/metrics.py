@@ -0,0 +1,339 @@
+"""Per-stage latency instrumentation and Prometheus metrics.
+
+The upload pipeline records how long each stage takes:
+
+  - `read`    receiving the upload body (`services.uploads`)
+  - `save`    writing it to disk
+  - `extract` type sniffing and text extraction
+  - `cache`   summary cache lookup/store
+  - `queue`   waiting for summarization capacity (`services.admission`)
+  - `generate` model time (including batching)
+  - `persist` the `Document` insert and commit
+
+`stage(name)` / `record_stage(name, seconds)` observe the
+`upload_stage_seconds{stage}` histogram and add the duration to the current
+request's `RequestTimings`, which `main` turns into a `Server-Timing`
+header. Upload sizes and (estimated) tokens in/out are histograms too.
+
+`REGISTRY.render()` produces the Prometheus text exposition format served
+by GET `/metrics`; it also includes the counters kept by the batcher,
+summary cache, admission control and job queue, and the DB connection
+pools' checkout waits (once `instrument_db_pools()` has run) and occupancy
+(see `database`). No client library is
+needed. Model routing decisions (`services.cascade`) are counted per model
+and preset by the summarizer each time a model actually runs, and the model
+pool's footprint is exported when models are loaded in the API process.
+Counters incremented inside CPU pool workers travel back with each
+`run_cpu` result (`Registry.drain_counters` / `merge_counters`).
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, math.inf)
+SIZE_BUCKETS = tuple(float(2**i) for i in range(10, 28, 2)) + (math.inf,)  # 1 KiB .. 128 MiB
+TOKEN_BUCKETS = (16, 64, 128, 256, 512, 1024, 2048, 4096, 16384, 65536, math.inf)
+
+Labels = Tuple[Tuple[str, str], ...]
+# A collected sample: metric name suffix (e.g. "_bucket" or ""), labels, value
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    body = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items())
+    return "{" + body + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Labels:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple((name, str(labels[name])) for name in self.labelnames)
+
+    def samples(self) -> Iterator[Sample]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> Iterator[Sample]:
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield "", dict(key), value
+
+    def drain(self) -> Dict[Labels, float]:
+        """Return the counts so far and reset them (see `Registry.drain_counters`)."""
+        with self._lock:
+            values, self._values = self._values, {}
+        return values
+
+    def merge(self, values: Dict[Labels, float]) -> None:
+        with self._lock:
+            for key, amount in values.items():
+                self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        if self.buckets[-1] != math.inf:
+            self.buckets += (math.inf,)
+        # Per label set: [bucket counts..., sum, count]
+        self._values: Dict[Labels, List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    def samples(self) -> Iterator[Sample]:
+        with self._lock:
+            items = [(key, list(state)) for key, state in self._values.items()]
+        for key, state in items:
+            labels = dict(key)
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                yield "_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield "_sum", labels, state[-2]
+            yield "_count", labels, state[-1]
+
+
+# Collector: returns (name, kind, help, samples) families computed on demand
+Collector = Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]
+
+
+class Registry:
+    """Holds metrics and on-demand collectors; renders Prometheus text format."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Collector] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.setdefault(metric.name, metric)
+        return self._metrics[metric.name]
+
+    def register_collector(self, collector: Collector) -> None:
+        if collector not in self._collectors:
+            self._collectors.append(collector)
+
+    def drain_counters(self) -> Dict[str, Dict[Labels, float]]:
+        """Take the non-zero counters of this process, e.g. to ship them from a CPU worker."""
+        drained = {name: metric.drain() for name, metric in self._metrics.items() if isinstance(metric, Counter)}
+        return {name: values for name, values in drained.items() if values}
+
+    def merge_counters(self, counts: Dict[str, Dict[Labels, float]]) -> None:
+        """Add counts drained in another process to this registry's counters."""
+        for name, values in counts.items():
+            metric = self._metrics.get(name)
+            if isinstance(metric, Counter):
+                metric.merge(values)
+
+    def _families(self) -> Iterator[Tuple[str, str, str, List[Sample]]]:
+        for metric in self._metrics.values():
+            yield metric.name, metric.kind, metric.help, list(metric.samples())
+        for collector in self._collectors:
+            yield from collector()
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for name, kind, help, samples in self._families():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for suffix, labels, value in samples:
+                lines.append(f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram("upload_stage_seconds", "Time spent per upload pipeline stage.", ("stage",)))
+UPLOAD_BYTES = REGISTRY.register(Histogram("upload_size_bytes", "Size of received uploads.", buckets=SIZE_BUCKETS))
+SUMMARY_TOKENS = REGISTRY.register(
+    Histogram("summary_tokens", "Estimated tokens per summarization (direction=in|out).", ("direction",), buckets=TOKEN_BUCKETS)
+)
+MODEL_ROUTES = REGISTRY.register(
+    Counter("summarizer_model_routes_total", "Summarization requests per routed model and preset.", ("model", "preset"))
+)
+HTTP_SECONDS = REGISTRY.register(
+    Histogram("http_request_duration_seconds", "HTTP request latency per endpoint.", ("method", "handler", "status"))
+)
+DB_POOL_WAIT = REGISTRY.register(
+    Histogram("db_pool_checkout_seconds", "Time spent checking a connection out of the DB pool.", ("engine",))
+)
+DB_POOL_TIMEOUTS = REGISTRY.register(
+    Counter("db_pool_timeouts_total", "DB pool checkouts that gave up after DB_POOL_TIMEOUT.", ("engine",))
+)
+
+
+def _record_checkout(engine: str, seconds: float, timed_out: bool) -> None:
+    DB_POOL_WAIT.observe(seconds, engine=engine)
+    if timed_out:
+        DB_POOL_TIMEOUTS.inc(engine=engine)
+
+
+def instrument_db_pools() -> None:
+    """Record DB pool checkouts in `db_pool_checkout_seconds` and `db_pool_timeouts_total`."""
+    from database import add_checkout_listener
+
+    add_checkout_listener(_record_checkout)
+
+
+class RequestTimings:
+    """Stage durations of one request, in the order they finished."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def server_timing(self) -> str:
+        """`Server-Timing` header value (durations in milliseconds)."""
+        parts = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.stages.items()]
+        parts.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_CURRENT: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def start_request() -> RequestTimings:
+    """Begin collecting stage timings for the current request (context-local)."""
+    timings = RequestTimings()
+    _CURRENT.set(timings)
+    return timings
+
+
+def record_stage(name: str, seconds: float) -> None:
+    STAGE_SECONDS.observe(seconds, stage=name)
+    timings = _CURRENT.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time the enclosed block as pipeline stage `name` (works around awaits too)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - start)
+
+
+def _stats_families() -> Iterator[Tuple[str, str, str, List[Sample]]]:
+    """Expose the counters kept by the batcher, cache, admission control, job queue and DB pools."""
+    from database import pool_stats as db_pool_stats
+    from services.admission import get_capacity
+    from services.batching import get_batcher
+    from services.cascade import pool_stats
+    from services.jobs import get_queue
+    from services.summary_cache import get_cache
+
+    batching = get_batcher().stats()
+    yield "summary_batch_requests_total", "counter", "Requests submitted to the micro-batcher.", [("", {}, batching["requests_total"])]
+    yield "summary_batches_total", "counter", "Batches run by the micro-batcher.", [("", {}, batching["batches_total"])]
+    yield "summary_batches_by_size_total", "counter", "Batches run by the micro-batcher, per batch size.", [
+        ("", {"size": str(size)}, count) for size, count in batching["batch_size_histogram"].items()
+    ]
+
+    cache = get_cache().stats()
+    yield "summary_cache_lookups_total", "counter", "Summary cache lookups by result.", [
+        ("", {"result": "hit"}, cache["hits"]),
+        ("", {"result": "db_hit"}, cache["db_hits"]),
+        ("", {"result": "miss"}, cache["misses"]),
+    ]
+    yield "summary_cache_bytes", "gauge", "Bytes held by the in-process summary cache.", [("", {}, cache["bytes"])]
+
+    capacity = get_capacity().stats()
+    yield "admission_in_flight", "gauge", "Summarizations currently running.", [("", {}, capacity["in_flight"])]
+    yield "admission_queue_depth", "gauge", "Requests waiting for summarization capacity.", [("", {}, capacity["queue_depth"])]
+    yield "admission_rejected_total", "counter", "Requests shed by admission control.", [
+        ("", {"reason": reason}, count) for reason, count in capacity["rejected_total"].items()
+    ]
+    wait_buckets, cumulative = [], 0
+    for bound, count in capacity["wait_seconds_histogram"].items():
+        cumulative += count
+        wait_buckets.append(("_bucket", {"le": _format_value(float(bound))}, cumulative))
+    wait_sum = capacity["avg_wait_seconds"] * capacity["admitted_total"]
+    yield "admission_wait_seconds", "histogram", "Time admitted requests waited for capacity.", wait_buckets + [
+        ("_sum", {}, wait_sum),
+        ("_count", {}, capacity["admitted_total"]),
+    ]
+
+    models = pool_stats()
+    if models is not None:
+        yield "summarizer_models_loaded_bytes", "gauge", "Memory held by each loaded summarization model.", [
+            ("", {"model": name}, size) for name, size in models["loaded"].items()
+        ]
+        yield "summarizer_model_loads_total", "counter", "Summarization models loaded by this process.", [("", {}, models["loads_total"])]
+        yield "summarizer_model_evictions_total", "counter", "Models evicted to stay within the memory budget.", [
+            ("", {}, models["evictions_total"])
+        ]
+
+    pools = db_pool_stats()
+    yield "db_pool_checked_out", "gauge", "DB connections currently checked out.", [
+        ("", {"engine": name}, pool["checked_out"]) for name, pool in pools.items()
+    ]
+    yield "db_pool_overflow", "gauge", "DB connections open beyond DB_POOL_SIZE.", [
+        ("", {"engine": name}, pool["overflow"]) for name, pool in pools.items()
+    ]
+
+    queue = get_queue()
+    yield "summary_jobs_total", "counter", "Background jobs handled by this process.", [
+        ("", {"status": "done"}, queue.processed),
+        ("", {"status": "failed"}, queue.failed),
+    ]
+
+
+REGISTRY.register_collector(_stats_families)
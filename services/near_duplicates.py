@@ -0,0 +1,247 @@
+"""Near-duplicate detection of uploads with MinHash + LSH.
+
+The summary cache only matches byte-identical text, so the same lecture notes
+re-exported with a different header or page footer pay for a full model run.
+This module estimates the Jaccard similarity of documents' word shingles:
+
+  - text is lower-cased and split into words; every run of `SHINGLE_WORDS`
+    consecutive words is a shingle, hashed to 32 bits
+  - the MinHash signature keeps, for each of `NUM_PERM` seeded hash
+    permutations `(a * x + b) mod p`, the minimum over the shingles
+    (vectorized with NumPy); the fraction of equal positions in two
+    signatures estimates their Jaccard similarity
+  - locality-sensitive hashing splits the signature into `BANDS` bands of
+    `ROWS` rows and hashes each band into a bucket; documents sharing a
+    bucket are candidates. With 32 bands of 4 rows a pair at similarity 0.8
+    shares a bucket with probability > 0.999, one at 0.3 about 0.23, and
+    unrelated documents (~0.0) practically never
+
+Signatures and buckets live in `document_signatures` / `document_lsh_buckets`
+(`models.near_duplicate`) and are added incrementally by `index_document()`
+in the transaction that stores a document; `find()` looks up the candidates
+of a new signature and returns the most similar one at or above
+`NEAR_DUP_THRESHOLD` (default 0.8). `NEAR_DUP_MODE` controls what the upload
+path does with a match:
+
+  - `reuse` (default): use the earlier document's summaries instead of
+    running the model, and report the match in the response. They are
+    looked up in the summary cache by the earlier text's hash, so a
+    changed model or preset is never answered with a stale summary
+  - `flag`: summarize as usual, but report (and record) the match
+  - `off`: no lookups and no indexing
+
+`scripts/rebuild_duplicate_index.py` backfills documents stored before the
+index existed (or after changing the parameters below).
+"""
+
+import hashlib
+import logging
+import os
+import re
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from models.document import Document
+from models.near_duplicate import DocumentSignature, LshBucket
+from services.summary_cache import text_hash
+
+
+REUSE = "reuse"
+FLAG = "flag"
+OFF = "off"
+MODES = (REUSE, FLAG, OFF)
+
+# Changing any of these invalidates stored signatures (rebuild the index)
+SHINGLE_WORDS = 5
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+_SEED = 1
+
+# Mersenne prime 2**61 - 1 for the universal hash family
+_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+# Shingles hashed per NumPy block (bounds the shingles x NUM_PERM matrix)
+_BLOCK = 4096
+# Most-overlapping candidates whose signatures are compared
+MAX_CANDIDATES = 200
+
+_WORD = re.compile(r"[^\W_]+")
+
+_rng = np.random.RandomState(_SEED)
+_A = _rng.randint(1, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64)
+_B = _rng.randint(0, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64)
+
+
+def mode() -> str:
+    value = os.getenv("NEAR_DUP_MODE", REUSE).lower()
+    return value if value in MODES else REUSE
+
+
+def threshold() -> float:
+    try:
+        return min(1.0, max(0.0, float(os.getenv("NEAR_DUP_THRESHOLD", "0.8"))))
+    except ValueError:
+        return 0.8
+
+
+@dataclass
+class Signature:
+    values: np.ndarray
+    shingle_count: int
+    text_hash: str = ""
+
+    def to_bytes(self) -> bytes:
+        return self.values.astype("<u4").tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes, shingle_count: int = 0, text_hash: str = "") -> "Signature":
+        return cls(np.frombuffer(data, dtype="<u4").astype(np.uint32), shingle_count, text_hash)
+
+    def similarity(self, other: "Signature") -> float:
+        """Estimated Jaccard similarity of the two shingle sets."""
+        return float(np.count_nonzero(self.values == other.values)) / NUM_PERM
+
+    def buckets(self) -> List[str]:
+        """LSH bucket key of each band."""
+        values = self.values.astype("<u4")
+        return [
+            hashlib.blake2b(band.to_bytes(2, "little") + values[band * ROWS:(band + 1) * ROWS].tobytes(), digest_size=8).hexdigest()
+            for band in range(BANDS)
+        ]
+
+
+@dataclass
+class NearDuplicate:
+    document_id: int
+    similarity: float
+    text_hash: str = ""
+
+
+def shingles(text: str) -> np.ndarray:
+    """32-bit hashes of the distinct word shingles of `text`."""
+    words = _WORD.findall(text.lower())
+    if not words:
+        return np.empty(0, dtype=np.uint64)
+    count = max(1, len(words) - SHINGLE_WORDS + 1)
+    hashed = {
+        int.from_bytes(hashlib.blake2b(" ".join(words[i:i + SHINGLE_WORDS]).encode("utf-8"), digest_size=4).digest(), "little")
+        for i in range(count)
+    }
+    return np.fromiter(hashed, dtype=np.uint64, count=len(hashed))
+
+
+def minhash(text: str) -> Optional[Signature]:
+    """MinHash signature of `text`, or None when it has no words."""
+    hashes = shingles(text)
+    if not len(hashes):
+        return None
+    values = np.full(NUM_PERM, _MAX_HASH, dtype=np.uint64)
+    for start in range(0, len(hashes), _BLOCK):
+        block = hashes[start:start + _BLOCK, None]
+        # uint64 arithmetic wraps, which keeps the permutations well mixed
+        permuted = ((block * _A + _B) % _PRIME) & _MAX_HASH
+        np.minimum(values, permuted.min(axis=0), out=values)
+    return Signature(values.astype(np.uint32), len(hashes), text_hash(text))
+
+
+def find(db: Session, signature: Signature, min_similarity: Optional[float] = None) -> Optional[NearDuplicate]:
+    """Most similar indexed document at or above the threshold, or None."""
+    limit = threshold() if min_similarity is None else min_similarity
+    shared = func.count(LshBucket.band)
+    candidates = (
+        db.query(LshBucket.document_id)
+        .filter(LshBucket.bucket.in_(signature.buckets()))
+        .group_by(LshBucket.document_id)
+        .order_by(shared.desc(), LshBucket.document_id.desc())
+        .limit(MAX_CANDIDATES)
+        .all()
+    )
+    if not candidates:
+        return None
+    rows = db.query(DocumentSignature.document_id, DocumentSignature.signature, DocumentSignature.text_hash).filter(
+        DocumentSignature.document_id.in_([row.document_id for row in candidates])
+    )
+    best: Optional[NearDuplicate] = None
+    for row in rows:
+        score = signature.similarity(Signature.from_bytes(row.signature))
+        # Prefer the earliest document among equally similar ones
+        if score >= limit and (best is None or (score, -row.document_id) > (best.similarity, -best.document_id)):
+            best = NearDuplicate(row.document_id, score, row.text_hash)
+    return best
+
+
+def _add(db: Session, document_id: int, signature: Signature, match: Optional[NearDuplicate]) -> None:
+    db.query(LshBucket).filter(LshBucket.document_id == document_id).delete(synchronize_session=False)
+    db.merge(
+        DocumentSignature(
+            document_id=document_id,
+            signature=signature.to_bytes(),
+            shingle_count=signature.shingle_count,
+            text_hash=signature.text_hash,
+            duplicate_of=match.document_id if match else None,
+            similarity=match.similarity if match else None,
+        )
+    )
+    db.add_all(LshBucket(document_id=document_id, band=band, bucket=bucket) for band, bucket in enumerate(signature.buckets()))
+
+
+def index_document(
+    db: Session,
+    document_id: int,
+    text: str,
+    signature: Optional[Signature] = None,
+    match: Optional[NearDuplicate] = None,
+) -> None:
+    """Add a document to the index inside the caller's transaction (best effort).
+
+    `signature` is computed from `text` when not given; `match` records the
+    near-duplicate found at upload time.
+    """
+    if mode() == OFF:
+        return
+    try:
+        signature = signature or minhash(text)
+        if signature is None:
+            return
+        with db.begin_nested():
+            _add(db, document_id, signature, match)
+    except Exception:
+        logging.exception("Failed to index document %s for near-duplicate detection", document_id)
+
+
+def rebuild(db: Session, batch_size: int = 200) -> int:
+    """Recompute every signature and bucket from scratch; returns the number indexed.
+
+    Matches recorded at upload time are kept.
+    """
+    matches = {
+        row.document_id: NearDuplicate(row.duplicate_of, row.similarity)
+        for row in db.query(DocumentSignature).filter(DocumentSignature.duplicate_of.isnot(None))
+    }
+    db.query(LshBucket).delete(synchronize_session=False)
+    db.query(DocumentSignature).delete(synchronize_session=False)
+    count, last_id = 0, 0
+    while True:
+        docs = (
+            db.query(Document.id, Document.content)
+            .filter(Document.id > last_id)
+            .order_by(Document.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not docs:
+            break
+        for doc in docs:
+            signature = minhash(doc.content)
+            if signature is not None:
+                _add(db, doc.id, signature, matches.get(doc.id))
+                count += 1
+        last_id = docs[-1].id
+        db.commit()
+        db.expunge_all()
+    return count
@@ -0,0 +1,34 @@
+"""Keyset (cursor) pagination helpers.
+
+OFFSET pagination makes the database walk and discard every skipped row, so
+deep pages get slower as the table grows, and rows inserted between requests
+shift the pages. GET /documents/ instead orders by `(uploaded_at, id)`
+(newest first) and resumes after the last row of the previous page, which
+the `ix_documents_uploaded_at_id` index serves as a range scan.
+
+The position is handed to clients as an opaque cursor: the sort key of the
+last row as URL-safe base64 JSON. `decode_cursor` raises `ValueError` for
+anything it did not produce.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Tuple
+
+
+def encode_cursor(uploaded_at: datetime, row_id: int) -> str:
+    """Opaque cursor pointing just after the row with sort key `(uploaded_at, row_id)`."""
+    raw = json.dumps([uploaded_at.isoformat(), row_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Sort key encoded by `encode_cursor`; raises ValueError if malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        uploaded_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(uploaded_at), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as exc:
+        raise ValueError(f"Invalid cursor: {exc}")
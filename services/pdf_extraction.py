@@ -0,0 +1,235 @@
+"""Per-page, parallel PDF text extraction with an engine selector.
+
+The original extractor ran pdfplumber over every page serially and only
+switched to PyMuPDF when pdfplumber raised. PyMuPDF is much faster on PDFs
+that have a text layer, so this module inverts that:
+
+  - the fast engine (`PDF_ENGINE`, default `pymupdf`) extracts every page
+  - only pages where it yields no text are re-extracted with the careful
+    engine (the other one), so one awkward page doesn't slow the whole file
+  - documents with at least `PDF_PARALLEL_MIN_PAGES` pages (default 16) are
+    split into `PDF_PAGE_WORKERS` page ranges (0 or 1 disables; default 4
+    outside CPU pool workers, off inside them). Uploads are extracted from
+    the API process: the documents router gets the ranges from
+    `page_ranges()` and fans them out over the CPU pool itself. Other
+    callers of `iter_pdf_pages()` (scripts, `file_processing`) run the
+    ranges on a dedicated process pool of that size.
+
+`iter_pdf_pages()` yields `PageText`s in page order as they become ready,
+with the engine that produced each page and its timing. Engines are imported
+lazily; if one isn't installed the other is used alone.
+"""
+
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from services.executor import in_cpu_worker
+
+
+Source = Union[str, bytes]
+
+PYMUPDF = "pymupdf"
+PDFPLUMBER = "pdfplumber"
+
+# Pages extracted per serial step of `iter_pdf_pages`
+_STREAM_PAGES = 8
+
+_PAGE_POOL: Optional[ProcessPoolExecutor] = None
+
+
+@dataclass
+class PageText:
+    """Text of one page and how it was obtained."""
+
+    index: int
+    text: str
+    engine: str
+    seconds: float
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(0, int(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+def _pymupdf_pages(source: Source, indexes: Sequence[int]) -> List[Tuple[str, float]]:
+    import fitz  # PyMuPDF
+
+    doc = fitz.open(source) if isinstance(source, str) else fitz.open(stream=source, filetype="pdf")
+    try:
+        results = []
+        for i in indexes:
+            start = time.perf_counter()
+            text = doc[i].get_text() or ""
+            results.append((text, time.perf_counter() - start))
+        return results
+    finally:
+        doc.close()
+
+
+def _pdfplumber_pages(source: Source, indexes: Sequence[int]) -> List[Tuple[str, float]]:
+    import pdfplumber
+
+    with pdfplumber.open(source if isinstance(source, str) else BytesIO(source)) as pdf:
+        results = []
+        for i in indexes:
+            start = time.perf_counter()
+            text = pdf.pages[i].extract_text() or ""
+            results.append((text, time.perf_counter() - start))
+        return results
+
+
+_ENGINES: Dict[str, Callable[[Source, Sequence[int]], List[Tuple[str, float]]]] = {
+    PYMUPDF: _pymupdf_pages,
+    PDFPLUMBER: _pdfplumber_pages,
+}
+
+
+def _installed(engine: str) -> bool:
+    module = "fitz" if engine == PYMUPDF else "pdfplumber"
+    try:
+        __import__(module)
+        return True
+    except ImportError:
+        return False
+
+
+def select_engines(preferred: Optional[str] = None) -> Tuple[str, Optional[str]]:
+    """Return (primary, fallback) engine names based on `PDF_ENGINE` and availability."""
+    primary = (preferred or os.getenv("PDF_ENGINE", PYMUPDF)).lower()
+    if primary not in _ENGINES:
+        logging.warning("Unknown PDF_ENGINE %r; using %s", primary, PYMUPDF)
+        primary = PYMUPDF
+    fallback: Optional[str] = PDFPLUMBER if primary == PYMUPDF else PYMUPDF
+    if not _installed(primary):
+        primary, fallback = fallback, None
+    elif not _installed(fallback):
+        fallback = None
+    return primary, fallback
+
+
+def page_count(source: Source, engine: str) -> int:
+    """Number of pages, counted with `engine`."""
+    if engine == PYMUPDF:
+        import fitz  # PyMuPDF
+
+        doc = fitz.open(source) if isinstance(source, str) else fitz.open(stream=source, filetype="pdf")
+        try:
+            return len(doc)
+        finally:
+            doc.close()
+    import pdfplumber
+
+    with pdfplumber.open(source if isinstance(source, str) else BytesIO(source)) as pdf:
+        return len(pdf.pages)
+
+
+def extract_page_range(source: Source, start: int, stop: int, primary: str, fallback: Optional[str]) -> List[PageText]:
+    """Extract pages `[start, stop)`, falling back per page where `primary` finds no text."""
+    indexes = list(range(start, stop))
+    try:
+        primary_results = _ENGINES[primary](source, indexes)
+    except Exception:
+        if fallback is None:
+            raise
+        logging.warning("PDF engine %s failed on pages %d-%d; using %s", primary, start, stop - 1, fallback)
+        primary_results = [("", 0.0)] * len(indexes)
+
+    pages = [PageText(i, text, primary, secs) for i, (text, secs) in zip(indexes, primary_results)]
+    empty = [p for p in pages if not p.text.strip()]
+    if empty and fallback is not None:
+        try:
+            retried = _ENGINES[fallback](source, [p.index for p in empty])
+        except Exception:
+            logging.warning("Fallback PDF engine %s failed on pages %d-%d", fallback, start, stop - 1)
+            retried = []
+        for page, (text, secs) in zip(empty, retried):
+            if text.strip():
+                page.text, page.engine = text, fallback
+            page.seconds += secs
+    return pages
+
+
+def page_workers() -> int:
+    """Size of the page pool; off by default inside a CPU pool worker."""
+    return _env_int("PDF_PAGE_WORKERS", 0 if in_cpu_worker() else 4)
+
+
+def _page_pool(workers: int) -> ProcessPoolExecutor:
+    global _PAGE_POOL
+    if _PAGE_POOL is None:
+        _PAGE_POOL = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    return _PAGE_POOL
+
+
+def _ranges(total: int, parts: int) -> List[Tuple[int, int]]:
+    size = -(-total // parts)  # ceil division
+    return [(start, min(start + size, total)) for start in range(0, total, size)]
+
+
+def _open_engines(source: Source, engine: Optional[str]) -> Tuple[str, Optional[str], int]:
+    """Pick engines and count pages, dropping to the fallback if the primary can't open the file."""
+    primary, fallback = select_engines(engine)
+    try:
+        return primary, fallback, page_count(source, primary)
+    except Exception:
+        if fallback is None:
+            raise
+        return fallback, None, page_count(source, fallback)
+
+
+def page_ranges(source: Source, parts: int, engine: Optional[str] = None) -> Tuple[str, Optional[str], List[Tuple[int, int]]]:
+    """Engines for `source` and the page ranges to extract it in, as `(primary, fallback, ranges)`.
+
+    Documents with at least `PDF_PARALLEL_MIN_PAGES` pages are split into
+    `parts` ranges; smaller ones (or `parts` < 2) get a single range.
+    """
+    primary, fallback, total = _open_engines(source, engine)
+    min_pages = _env_int("PDF_PARALLEL_MIN_PAGES", 16)
+    if parts > 1 and total >= max(min_pages, 2):
+        return primary, fallback, _ranges(total, parts)
+    return primary, fallback, [(0, total)] if total else []
+
+
+def iter_pdf_pages(source: Source, engine: Optional[str] = None) -> Iterator[PageText]:
+    """Yield the pages of a PDF in order as soon as each page range is done.
+
+    Large documents given by path are split across the page pool and ranges
+    are yielded as they complete (in order); otherwise pages are extracted
+    serially in batches of `_STREAM_PAGES`, so callers can start consuming
+    the first pages while later ones are still being read. Raises whatever
+    the engines raise when neither can open the file.
+    """
+    workers = page_workers()
+    primary, fallback, ranges = page_ranges(source, workers if isinstance(source, str) else 0, engine)
+
+    if len(ranges) > 1:
+        pool = _page_pool(workers)
+        futures = [pool.submit(extract_page_range, source, a, b, primary, fallback) for a, b in ranges]
+        try:
+            for future in futures:
+                yield from future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+        return
+
+    for first, stop in ranges:
+        for start in range(first, stop, _STREAM_PAGES):
+            yield from extract_page_range(source, start, min(start + _STREAM_PAGES, stop), primary, fallback)
+
+
+def shutdown() -> None:
+    """Stop the page pool (recreated lazily on next use)."""
+    global _PAGE_POOL
+    if _PAGE_POOL is not None:
+        _PAGE_POOL.shutdown(wait=False, cancel_futures=True)
+        _PAGE_POOL = None
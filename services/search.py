@@ -0,0 +1,328 @@
+"""Full-text search over stored documents and their summaries.
+
+`Document.content` is compressed (and the only indexed text column is
+`filename`), so keyword search uses a separate inverted index in the
+`document_search` table, one row per document:
+
+  - SQLite (local/tests): a contentless FTS5 virtual table (`content=''`,
+    `porter unicode61` tokenizer) over filename, text and summary. It stores
+    only the index (postings and column sizes), not a second copy of the
+    text; hits are ranked with `bm25()` weighting filename > summary >
+    content, and snippets are cut in Python from the decompressed
+    `Document.content` / `summary` of the page of hits
+  - MySQL: an InnoDB table with a `FULLTEXT` index over filename, content
+    and summary, queried in boolean mode and ranked by `MATCH ... AGAINST`;
+    snippets are cut in Python from the matching rows of the page. InnoDB
+    can only index stored text, so this table holds the text of every
+    document
+
+The table is created by `Base.metadata.create_all()` (via a metadata
+`after_create` hook) and kept up to date incrementally: `index_document()`
+runs in the transaction that stores a new document and `update_summary()`
+when the sweeper recovers a missing summary. Index failures are logged and
+never fail the upload. `scripts/rebuild_search_index.py` backfills
+documents stored before the index existed.
+
+Queries are split into words (a trailing `*` makes a prefix match) and all
+words must match; other dialects get no index (`get_search_index()` returns
+None).
+"""
+
+import logging
+import re
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session, load_only, undefer
+
+from database import Base
+from models.document import Document
+
+
+HIGHLIGHT_OPEN = "<mark>"
+HIGHLIGHT_CLOSE = "</mark>"
+ELLIPSIS = "…"
+# Words of context per snippet
+SNIPPET_WORDS = 24
+MAX_TERMS = 16
+
+
+@dataclass
+class SearchHit:
+    id: int
+    filename: str
+    score: float
+    snippet: str
+    summary_snippet: Optional[str] = None
+
+
+@dataclass
+class SearchPage:
+    total: int
+    hits: List[SearchHit] = field(default_factory=list)
+
+
+def query_terms(query: str) -> List[str]:
+    """Words of a search query; a trailing `*` is kept to mark a prefix search."""
+    return [m.group(0) for m in re.finditer(r"\w+\*?", query or "")][:MAX_TERMS]
+
+
+def _term_pattern(terms: List[str]) -> "re.Pattern[str]":
+    parts = [re.escape(t[:-1]) + r"\w*" if t.endswith("*") else re.escape(t) + r"\b" for t in terms]
+    return re.compile(r"\b(?:" + "|".join(parts) + ")", re.IGNORECASE)
+
+
+def make_snippet(value: Optional[str], terms: List[str], words: int = SNIPPET_WORDS) -> Optional[str]:
+    """About `words` words of `value` around the first match, matches highlighted."""
+    if not value:
+        return value
+    pattern = _term_pattern(terms)
+    tokens = value.split()
+    first = next((i for i, token in enumerate(tokens) if pattern.search(token)), 0)
+    start = max(0, first - words // 4)
+    end = min(len(tokens), start + words)
+    piece = pattern.sub(lambda m: HIGHLIGHT_OPEN + m.group(0) + HIGHLIGHT_CLOSE, " ".join(tokens[start:end]))
+    return (ELLIPSIS if start > 0 else "") + piece + (ELLIPSIS if end < len(tokens) else "")
+
+
+class SearchIndex(ABC):
+    """Inverted index of documents for one database dialect."""
+
+    @abstractmethod
+    def create_schema(self, conn: Connection) -> None:
+        """Create the `document_search` table if it doesn't exist."""
+
+    @abstractmethod
+    def add(self, db: Session, document_id: int, filename: str, content: str, summary: Optional[str]) -> None:
+        """Index a new document."""
+
+    @abstractmethod
+    def set_summary(self, db: Session, doc: Document, previous: Optional[str]) -> None:
+        """Re-index `doc.summary`; `previous` is the summary indexed so far."""
+
+    def clear(self, db: Session) -> None:
+        db.execute(text("DELETE FROM document_search"))
+
+    @abstractmethod
+    def search(self, db: Session, terms: List[str], limit: int, offset: int) -> SearchPage:
+        """Page of hits matching all `terms`, best first."""
+
+
+class SqliteFtsIndex(SearchIndex):
+    """Contentless FTS5 table keyed by `rowid` = document id.
+
+    A contentless table can't return or update column values: rows are
+    removed with the FTS5 `delete` command, which needs the exact values
+    that were indexed.
+    """
+
+    def create_schema(self, conn: Connection) -> None:
+        conn.execute(
+            text(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS document_search "
+                "USING fts5(filename, content, summary, content = '', tokenize = 'porter unicode61')"
+            )
+        )
+
+    def _write(self, db: Session, command: Optional[str], document_id: int, filename: str, content: str, summary: Optional[str]) -> None:
+        values = {"id": document_id, "filename": filename, "content": content, "summary": summary}
+        if command is None:
+            db.execute(text("INSERT INTO document_search (rowid, filename, content, summary) VALUES (:id, :filename, :content, :summary)"), values)
+        else:
+            db.execute(
+                text(
+                    "INSERT INTO document_search (document_search, rowid, filename, content, summary) "
+                    "VALUES (:command, :id, :filename, :content, :summary)"
+                ),
+                {"command": command, **values},
+            )
+
+    def add(self, db: Session, document_id: int, filename: str, content: str, summary: Optional[str]) -> None:
+        self._write(db, None, document_id, filename, content, summary)
+
+    def set_summary(self, db: Session, doc: Document, previous: Optional[str]) -> None:
+        self._write(db, "delete", doc.id, doc.filename, doc.content, previous)
+        self._write(db, None, doc.id, doc.filename, doc.content, doc.summary)
+
+    def clear(self, db: Session) -> None:
+        db.execute(text("INSERT INTO document_search (document_search) VALUES ('delete-all')"))
+
+    @staticmethod
+    def match_expression(terms: List[str]) -> str:
+        # Quote every word so FTS5 operators in user input are taken literally
+        return " ".join('"' + t.rstrip("*") + '"' + ("*" if t.endswith("*") else "") for t in terms)
+
+    def search(self, db: Session, terms: List[str], limit: int, offset: int) -> SearchPage:
+        params = {"q": self.match_expression(terms), "limit": limit, "offset": offset}
+        total = db.execute(text("SELECT count(*) FROM document_search WHERE document_search MATCH :q"), params).scalar()
+        ranked = db.execute(
+            text(
+                "SELECT rowid AS id, bm25(document_search, 4.0, 1.0, 2.0) AS rank "
+                "FROM document_search WHERE document_search MATCH :q "
+                "ORDER BY rank, rowid DESC LIMIT :limit OFFSET :offset"
+            ),
+            params,
+        ).all()
+        # Only the page of hits is decompressed, for its snippets
+        docs = {
+            doc.id: doc
+            for doc in db.query(Document)
+            .options(load_only(Document.id, Document.filename, Document.content, Document.summary))
+            .filter(Document.id.in_([row.id for row in ranked]))
+        }
+        # bm25() is lower-is-better; report higher-is-better scores
+        hits = [
+            SearchHit(doc.id, doc.filename, -row.rank, make_snippet(doc.content, terms), make_snippet(doc.summary, terms))
+            for row in ranked
+            if (doc := docs.get(row.id)) is not None
+        ]
+        return SearchPage(total=total or 0, hits=hits)
+
+
+class MysqlFulltextIndex(SearchIndex):
+    """InnoDB table with a FULLTEXT index, queried in boolean mode.
+
+    InnoDB skips stopwords and words shorter than `innodb_ft_min_token_size`
+    (3 by default), so such terms are dropped from the query.
+    """
+
+    MATCH = "MATCH (filename, content, summary) AGAINST (:q IN BOOLEAN MODE)"
+
+    def create_schema(self, conn: Connection) -> None:
+        conn.execute(
+            text(
+                "CREATE TABLE IF NOT EXISTS document_search ("
+                "document_id INT NOT NULL PRIMARY KEY, "
+                "filename VARCHAR(255) NOT NULL, "
+                "content LONGTEXT NOT NULL, "
+                "summary TEXT NULL, "
+                "FULLTEXT KEY ft_document_search (filename, content, summary), "
+                "CONSTRAINT fk_document_search_document FOREIGN KEY (document_id) "
+                "REFERENCES documents (id) ON DELETE CASCADE"
+                ") ENGINE=InnoDB DEFAULT CHARSET=utf8mb4"
+            )
+        )
+
+    def add(self, db: Session, document_id: int, filename: str, content: str, summary: Optional[str]) -> None:
+        db.execute(
+            text(
+                "INSERT INTO document_search (document_id, filename, content, summary) "
+                "VALUES (:id, :filename, :content, :summary) "
+                "ON DUPLICATE KEY UPDATE filename = VALUES(filename), content = VALUES(content), summary = VALUES(summary)"
+            ),
+            {"id": document_id, "filename": filename, "content": content, "summary": summary},
+        )
+
+    def set_summary(self, db: Session, doc: Document, previous: Optional[str]) -> None:
+        db.execute(
+            text("UPDATE document_search SET summary = :summary WHERE document_id = :id"), {"id": doc.id, "summary": doc.summary}
+        )
+
+    @staticmethod
+    def match_expression(terms: List[str]) -> str:
+        return " ".join("+" + t for t in terms if len(t.rstrip("*")) >= 3)
+
+    def search(self, db: Session, terms: List[str], limit: int, offset: int) -> SearchPage:
+        expression = self.match_expression(terms)
+        if not expression:
+            return SearchPage(total=0)
+        params = {"q": expression, "limit": limit, "offset": offset}
+        total = db.execute(text(f"SELECT COUNT(*) FROM document_search WHERE {self.MATCH}"), params).scalar()
+        rows = db.execute(
+            text(
+                f"SELECT document_id, filename, content, summary, {self.MATCH} AS score "
+                f"FROM document_search WHERE {self.MATCH} "
+                "ORDER BY score DESC, document_id DESC LIMIT :limit OFFSET :offset"
+            ),
+            params,
+        )
+        hits = [
+            SearchHit(row.document_id, row.filename, float(row.score), make_snippet(row.content, terms), make_snippet(row.summary, terms))
+            for row in rows
+        ]
+        return SearchPage(total=total or 0, hits=hits)
+
+
+_INDEXES = {"sqlite": SqliteFtsIndex(), "mysql": MysqlFulltextIndex()}
+
+
+def get_search_index(dialect_name: str) -> Optional[SearchIndex]:
+    """Search index implementation for a SQLAlchemy dialect name, or None if unsupported."""
+    return _INDEXES.get(dialect_name)
+
+
+def _index_for(db: Session) -> Optional[SearchIndex]:
+    return get_search_index(db.get_bind().dialect.name)
+
+
+def index_document(db: Session, document_id: int, filename: str, content: str, summary: Optional[str]) -> None:
+    """Add a document to the search index inside the caller's transaction (best effort)."""
+    index = _index_for(db)
+    if index is None:
+        return
+    try:
+        with db.begin_nested():
+            index.add(db, document_id, filename, content, summary)
+    except Exception:
+        logging.exception("Failed to index document %s for search", document_id)
+
+
+def update_summary(db: Session, doc: Document, previous: Optional[str] = None) -> None:
+    """Re-index `doc.summary` after it changed from `previous` (best effort).
+
+    `doc.content` is needed on SQLite, so load the document with it undeferred.
+    """
+    index = _index_for(db)
+    if index is None:
+        return
+    try:
+        with db.begin_nested():
+            index.set_summary(db, doc, previous)
+    except Exception:
+        logging.exception("Failed to update the search index for document %s", doc.id)
+
+
+def search(db: Session, terms: List[str], limit: int, offset: int) -> SearchPage:
+    """Ranked page of documents matching all `terms`; raises RuntimeError if unsupported."""
+    index = _index_for(db)
+    if index is None:
+        raise RuntimeError(f"Full-text search is not supported on {db.get_bind().dialect.name}")
+    return index.search(db, terms, limit, offset)
+
+
+def rebuild(db: Session, batch_size: int = 200) -> int:
+    """Re-index every document from scratch; returns the number indexed."""
+    index = _index_for(db)
+    if index is None:
+        raise RuntimeError(f"Full-text search is not supported on {db.get_bind().dialect.name}")
+    index.clear(db)
+    count, last_id = 0, 0
+    while True:
+        docs = (
+            db.query(Document)
+            .options(undefer(Document.content))
+            .filter(Document.id > last_id)
+            .order_by(Document.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not docs:
+            break
+        for doc in docs:
+            index.add(db, doc.id, doc.filename, doc.content, doc.summary)
+        count += len(docs)
+        last_id = docs[-1].id
+        db.commit()
+        # Drop the batch's (large) content from the session
+        db.expunge_all()
+    return count
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_search_schema(target, connection: Connection, **kw) -> None:
+    index = get_search_index(connection.dialect.name)
+    if index is not None:
+        index.create_schema(connection)
@@ -0,0 +1,263 @@
+"""Content-addressed, deduplicated storage for uploaded files.
+
+Uploads used to be written as `<uuid>_<filename>` into one flat directory,
+so identical files were stored many times and the directory grew without
+bound. `BlobStore` is the small interface the documents router uses instead;
+`LocalBlobStore` implements it on the local filesystem:
+
+  - blobs are keyed by the sha256 of their content and sharded into
+    `<root>/<k[0:2]>/<k[2:4]>/<key>` so no directory gets huge
+  - new uploads are streamed into `<root>/tmp/` and atomically renamed into
+    place; if the blob already exists the temp file is simply discarded, so
+    duplicates cost no extra disk
+  - blobs are reference counted from `Document.content_hash`, jobs that
+    haven't finished yet and unexpired leases (`models.blob_lease`);
+    `release()` deletes a blob once nothing refers to it, and
+    `collect_garbage()` sweeps any unreferenced leftovers. Each blob has a
+    `blobs` row (`models.blob`); `release()` checks the references and
+    deletes that row in one conditional `DELETE`, and unlinks the file
+    before committing, so a concurrent `lease()` of the same blob either
+    keeps it or waits and stores it again
+
+An upload is only referenced by a document or job once it has been
+processed, so the router takes a lease with `lease()` before ingesting the
+file and hands it back to `release(db, key, lease_id)` when done. Leases
+expire after `BLOB_LEASE_SECONDS` (default 3600) in case the process dies.
+`release()` and `collect_garbage()` also keep blobs leased or modified less
+than `BLOB_GC_GRACE_SECONDS` ago (default 3600), which covers the moment
+between a lease and the rename into place; ingesting a duplicate refreshes
+the existing blob's mtime. A blob released right after a failed upload is
+therefore removed by a later `collect_garbage()`.
+
+The root directory comes from `UPLOAD_DIR` (default: `uploads/` in the
+project root).
+"""
+
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List, Optional
+from uuid import uuid4
+
+from sqlalchemy import delete, exists, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import ColumnElement
+
+from models.blob import StoredBlob
+from models.blob_lease import BlobLease
+from models.document import Document
+from models.job import JOB_DONE, JOB_FAILED, SummaryJob
+
+
+DEFAULT_UPLOAD_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "uploads")
+
+
+def _env_seconds(name: str, default: int) -> int:
+    try:
+        return max(0, int(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _unreferenced(key: str) -> List[ColumnElement]:
+    """Conditions that hold while no document, unfinished job or live lease refers to `key`."""
+    return [
+        ~exists().where(Document.content_hash == key),
+        ~exists().where(SummaryJob.content_hash == key, SummaryJob.status.notin_([JOB_DONE, JOB_FAILED])),
+        ~exists().where(BlobLease.blob_key == key, or_(BlobLease.expires_at.is_(None), BlobLease.expires_at > _now())),
+    ]
+
+
+class BlobStore(ABC):
+    """Interface for content-addressed upload storage."""
+
+    @abstractmethod
+    def temp_path(self) -> str:
+        """Return a fresh path to stream a new upload into."""
+
+    @abstractmethod
+    def ingest(self, temp_path: str, key: str) -> bool:
+        """Move `temp_path` into the store under `key`.
+
+        Returns True if the blob was new, False if an identical blob already
+        existed (the temp file is discarded).
+        """
+
+    @abstractmethod
+    def path(self, key: str) -> str:
+        """Local filesystem path of the blob `key`."""
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        """True if the blob `key` is stored."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove the blob `key` (nothing happens if it's missing)."""
+
+    @abstractmethod
+    def modified_at(self, key: str) -> float:
+        """Last time (epoch seconds) the blob was written or re-ingested."""
+
+    @abstractmethod
+    def keys(self) -> Iterator[str]:
+        """Iterate over all stored blob keys."""
+
+    # Reference counting is shared: references live in the database.
+
+    def lease(self, db: Session, key: str, reason: str = "upload", seconds: Optional[int] = None) -> str:
+        """Reference `key` while it is processed; returns the lease id.
+
+        The lease expires after `seconds` (default `BLOB_LEASE_SECONDS`);
+        `seconds=0` never expires. Also refreshes the blob's `blobs` row,
+        waiting for a `release()` of the same blob that is in progress.
+        """
+        ttl = _env_seconds("BLOB_LEASE_SECONDS", 3600) if seconds is None else seconds
+        now = _now()
+        lease = BlobLease(
+            id=uuid4().hex, blob_key=key, reason=reason, expires_at=now + timedelta(seconds=ttl) if ttl else None
+        )
+        db.add(lease)
+        if not self._register(db, key, now, refresh=True):
+            db.query(StoredBlob).filter(StoredBlob.key == key).update({StoredBlob.touched_at: now}, synchronize_session=False)
+        db.commit()
+        return lease.id
+
+    @staticmethod
+    def _register(db: Session, key: str, touched_at: datetime, refresh: bool = False) -> bool:
+        """Add the `blobs` row of `key` unless it exists; True if it was added."""
+        if refresh and db.query(StoredBlob).filter(StoredBlob.key == key).update(
+            {StoredBlob.touched_at: touched_at}, synchronize_session=False
+        ):
+            return True
+        try:
+            with db.begin_nested():
+                db.add(StoredBlob(key=key, touched_at=touched_at))
+            return True
+        except IntegrityError:
+            # Registered concurrently
+            return False
+
+    def release(self, db: Session, key: str, lease_id: Optional[str] = None, grace: Optional[int] = None) -> bool:
+        """End `lease_id` (if given), then delete the blob if nothing references it; True if deleted.
+
+        The blob's `blobs` row is deleted by one statement that only matches
+        while nothing references it and it hasn't been leased for `grace`
+        seconds (default `BLOB_GC_GRACE_SECONDS`). The file is unlinked, if
+        it is that old too, before the deletion commits.
+        """
+        grace = _env_seconds("BLOB_GC_GRACE_SECONDS", 3600) if grace is None else grace
+        if lease_id is not None:
+            db.query(BlobLease).filter(BlobLease.id == lease_id).delete(synchronize_session=False)
+            db.commit()
+        cutoff = _now() - timedelta(seconds=grace)
+        deleted = db.execute(
+            delete(StoredBlob).where(StoredBlob.key == key, StoredBlob.touched_at <= cutoff, *_unreferenced(key))
+        ).rowcount
+        if not deleted:
+            db.rollback()
+            return False
+        try:
+            if self.modified_at(key) > time.time() - grace:
+                # Re-ingested by an upload that hasn't leased it yet
+                db.rollback()
+                return False
+            self.delete(key)
+        except FileNotFoundError:
+            # Only the row was left
+            db.commit()
+            return False
+        except Exception:
+            db.rollback()
+            raise
+        db.commit()
+        return True
+
+    def collect_garbage(self, db: Session, grace: Optional[int] = None) -> int:
+        """Delete every unreferenced blob older than `grace` seconds; returns the number removed."""
+        db.query(BlobLease).filter(BlobLease.expires_at <= _now()).delete(synchronize_session=False)
+        db.commit()
+        known = {key for (key,) in db.query(StoredBlob.key)}
+        stored = set(self.keys())
+        for key in stored - known:
+            # Blobs stored without a lease are aged by their mtime
+            try:
+                modified = datetime.fromtimestamp(self.modified_at(key), timezone.utc)
+            except FileNotFoundError:
+                continue
+            self._register(db, key, modified)
+        db.commit()
+        return sum(1 for key in sorted(stored | known) if self.release(db, key, grace=grace))
+
+
+class LocalBlobStore(BlobStore):
+    """`BlobStore` backed by a hash-sharded directory tree."""
+
+    def __init__(self, root: str) -> None:
+        self.root = os.path.abspath(root)
+        self._tmp = os.path.join(self.root, "tmp")
+        os.makedirs(self._tmp, exist_ok=True)
+
+    def temp_path(self) -> str:
+        return os.path.join(self._tmp, uuid4().hex)
+
+    def path(self, key: str) -> str:
+        if len(key) < 8 or not all(c in "0123456789abcdef" for c in key):
+            raise ValueError(f"Invalid blob key: {key!r}")
+        return os.path.join(self.root, key[:2], key[2:4], key)
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self.path(key))
+
+    def ingest(self, temp_path: str, key: str) -> bool:
+        final = self.path(key)
+        try:
+            # Counts as a fresh write for the garbage collector's grace period
+            os.utime(final)
+        except FileNotFoundError:
+            pass
+        else:
+            os.remove(temp_path)
+            return False
+        os.makedirs(os.path.dirname(final), exist_ok=True)
+        # Atomic on POSIX; a concurrent identical upload just overwrites with the same bytes
+        os.replace(temp_path, final)
+        return True
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def modified_at(self, key: str) -> float:
+        return os.path.getmtime(self.path(key))
+
+    def keys(self) -> Iterator[str]:
+        for shard in os.listdir(self.root):
+            if len(shard) != 2:
+                continue
+            shard_dir = os.path.join(self.root, shard)
+            for sub in os.listdir(shard_dir):
+                for name in os.listdir(os.path.join(shard_dir, sub)):
+                    yield name
+
+
+_STORE: Optional[BlobStore] = None
+
+
+def get_store() -> BlobStore:
+    """Return the process-wide blob store rooted at `UPLOAD_DIR`."""
+    global _STORE
+    if _STORE is None:
+        root = os.getenv("UPLOAD_DIR") or DEFAULT_UPLOAD_DIR
+        _STORE = LocalBlobStore(root)
+        logging.info("Storing uploads in %s", _STORE.root)
+    return _STORE
@@ -0,0 +1,126 @@
+"""Server-Sent Events helpers for streaming summaries.
+
+`POST /documents/upload/stream` reports progress and the summary as it is
+generated instead of after 20+ seconds of silence. `WorkerStream` runs the
+blocking generator (`summary_events`, wrapping
+`services.summarizer.stream_summary`) on the CPU pool like every other
+summarization, so it uses the warmed-up worker models or the shared
+inference server, and hands every item it emits back to the event loop
+through a queue (`services.executor.cpu_channel`) that a dedicated thread
+per stream drains with `call_soon_threadsafe`, so waiting for tokens never
+holds an I/O pool thread. `sse_event` formats one `text/event-stream`
+message.
+
+Generation runs at its own pace: emitted items wait in the queue until the
+client reads them, and `on_done` fires as soon as the worker has finished,
+so a slow reader doesn't hold summarization capacity. If the client
+disconnects, `cancel()` stops the producer at its next `emit` and the model
+stops decoding at its next token.
+"""
+
+import asyncio
+import json
+import threading
+from typing import Any, AsyncIterator, Callable, Optional
+
+from services.executor import cpu_channel, run_cpu, run_io
+from services.summarizer import stream_summary
+
+
+class StreamClosed(Exception):
+    """Raised inside the producer when the consumer has gone away."""
+
+
+# Marks the end of the items (must survive pickling across processes)
+_END = None
+
+def sse_event(event: str, data: Any) -> str:
+    """One Server-Sent Events message with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def summary_events(emit: Callable[[Any], None], text: str, length: str) -> None:
+    """Emit the `progress` and `token` events of a streamed summary."""
+    for piece in stream_summary(text, length, progress=lambda event: emit(("progress", event))):
+        emit(("token", {"text": piece}))
+
+
+def _produce(items, stop, func: Callable[..., Any], *args: Any) -> None:
+    """Run `func(emit, *args)`, putting what it emits on `items` (runs on the CPU pool)."""
+
+    def emit(item: Any) -> None:
+        if stop.is_set():
+            raise StreamClosed()
+        items.put(item)
+
+    try:
+        func(emit, *args)
+    except StreamClosed:
+        pass
+    finally:
+        items.put(_END)
+
+
+class WorkerStream:
+    """Everything `func(emit, *args)` emits while it runs on the CPU pool.
+
+    Generation starts on construction; iterate (`async for`) to receive the
+    items. Exceptions raised by `func` are re-raised by the iteration after
+    the items emitted before them. With the process pool active, `func`
+    must be a picklable module-level function.
+    """
+
+    def __init__(self, func: Callable[..., Any], *args: Any, on_done: Optional[Callable[[], None]] = None) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._received: "asyncio.Queue[Any]" = asyncio.Queue()
+        self._stop: Any = None
+        self._cancelled = False
+        self._future = asyncio.ensure_future(self._run(func, *args))
+        # Retrieve the outcome even if the consumer stops early and never awaits it
+        self._future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        if on_done is not None:
+            self._future.add_done_callback(lambda f: on_done())
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> None:
+        try:
+            items, self._stop = await cpu_channel()
+        except BaseException:
+            self._received.put_nowait(_END)
+            raise
+        if self._cancelled:
+            self._stop.set()
+        threading.Thread(target=self._bridge, args=(items,), name="worker-stream", daemon=True).start()
+        try:
+            await run_cpu(_produce, items, self._stop, func, *args)
+        finally:
+            # Ends the bridge even if the worker died before its own `_END`
+            await run_io(items.put, _END)
+
+    def _bridge(self, items) -> None:
+        """Hand items from the channel to the event loop (runs on its own thread)."""
+        try:
+            while True:
+                item = items.get()
+                self._loop.call_soon_threadsafe(self._received.put_nowait, item)
+                if item is _END:
+                    return
+        except (EOFError, OSError, RuntimeError):
+            # Manager or event loop shut down
+            return
+
+    def cancel(self) -> None:
+        """Ask the producer to stop (at its next `emit`)."""
+        self._cancelled = True
+        if self._stop is not None:
+            self._stop.set()
+
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        try:
+            while True:
+                item = await self._received.get()
+                if item is _END:
+                    break
+                yield item
+            await self._future
+        finally:
+            self.cancel()
@@ -1,47 +1,139 @@
 """AI summarization service using HuggingFace Transformers.
 
 Provides `generate_summary(text: str, summary_type: str) -> str` and an alias
-`summarize_text` for backward compatibility with the router. Uses a cached
+`summarize_text` for backward compatibility with the router, plus
+`generate_summaries(texts, summary_type)` which runs several documents through
+the model as one padded batch (used by `services.batching`).
+
+Long documents: inputs longer than the model window (`LONG_DOC_WINDOW_TOKENS`,
+default 1024) are summarized hierarchically by `summarize_long`. The text is
+split into sentence-aligned chunks, chunks are summarized in batches with a
+fixed intermediate preset, and the concatenated partial summaries are reduced
+recursively until they fit the window, at which point the requested preset is
+applied. Chunk summaries are cached by content hash, so re-running the same
+document with a different preset only repeats the final reduce step. Uses a cached
 `transformers` summarization pipeline (default model configurable via
-`SUMMARIZER_MODEL` env var).
+`SUMMARIZER_MODEL` env var, CPU backend via `SUMMARIZER_BACKEND`).
+
+Optional extractive pre-compression (`EXTRACTIVE_PRECOMPRESS=1`, see
+`services.extractive`) trims the input to its most salient sentences, within
+a budget derived from the preset, before the abstractive pass.
+
+With `SUMMARIZER_CASCADE` set, each call is routed to one of several models
+by input size and preset (`services.cascade`), e.g. a distilled model for
+short notes; models load lazily into a pool bounded by
+`SUMMARIZER_MEMORY_BUDGET_MB`.
 
 Presets:
   - short  : concise summary
   - medium : default
   - long   : more detailed
 
+`summarize_presets(text, presets)` produces several presets at once: the
+map-reduce step (for long documents) and the encoder pass are shared, and
+only the decoder runs once per preset.
+
+`stream_summary(text, summary_type)` yields the summary piece by piece as
+the model decodes it (for Server-Sent Events), reporting map-reduce chunk
+progress through a callback.
+
 On failure the function raises `RuntimeError` with an informative message so
 calling FastAPI endpoints can handle/retry as appropriate.
 """
 
 import os
+import hashlib
 import logging
-from typing import Dict
+import threading
+from collections import OrderedDict
+from functools import partial
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
-from transformers import pipeline, Pipeline
+from services import cascade, extractive
+from services.chunking import chunk_text, estimate_tokens
+from services.inference_backends import TORCH, backend_name, build_pipeline
+from services.metrics import MODEL_ROUTES
 
+if TYPE_CHECKING:
+    # `transformers` (and torch) are imported only when the model is loaded,
+    # so importing the app, health checks and tests stay fast
+    from transformers import Pipeline
 
-_SUMMARIZER: Pipeline | None = None
 
+DEFAULT_MODEL = "facebook/bart-large-cnn"
 
-def _get_summarizer() -> Pipeline:
-    """Return a cached summarization pipeline instance.
 
-    The model may be overridden with the `SUMMARIZER_MODEL` environment
-    variable (for example: `facebook/bart-large-cnn`, `t5-base`, or
-    `google/pegasus-xsum`). Loading the model is done once and reused.
+def model_name() -> str:
+    """Model id currently configured via `SUMMARIZER_MODEL`."""
+    return os.getenv("SUMMARIZER_MODEL", DEFAULT_MODEL)
+
+
+def model_signature() -> str:
+    """`SUMMARIZER_MODEL`, or an id of the whole cascade when `SUMMARIZER_CASCADE` is set.
+
+    A backend other than the fp32 `torch` default (int8 quantization, ONNX)
+    is appended, since it changes the summaries.
+    """
+    signature = cascade.signature(model_name())
+    backend = backend_name()
+    return signature if backend == TORCH else f"{signature}+{backend}"
+
+
+def select_model(text: str, summary_type: str = "medium") -> str:
+    """Model the cascade routes (`text`, `summary_type`) to (see `services.cascade`)."""
+    return cascade.select_model(text, summary_type, model_name())
+
+
+def _route(text: str, summary_type: str) -> str:
+    """Model `text` is sent to for `summary_type`, counted in `summarizer_model_routes_total`.
+
+    Call it with the text the model actually sees (after pre-compression,
+    per chunk or reduce step), right before running the model.
     """
-    global _SUMMARIZER
-    if _SUMMARIZER is not None:
-        return _SUMMARIZER
+    model = select_model(text, summary_type)
+    MODEL_ROUTES.inc(model=model, preset=(summary_type or "medium").lower())
+    return model
+
 
-    model_name = os.getenv("SUMMARIZER_MODEL", "facebook/bart-large-cnn")
+def _load_pipeline(name: str) -> "Pipeline":
+    backend = backend_name()
     try:
-        _SUMMARIZER = pipeline("summarization", model=model_name, device=-1)
-        return _SUMMARIZER
+        return build_pipeline(name, backend)
     except Exception as exc:
-        logging.exception("Failed to create summarization pipeline using model %s", model_name)
-        raise RuntimeError(f"Failed to load summarization model '{model_name}': {exc}")
+        logging.exception("Failed to create %s summarization pipeline using model %s", backend, name)
+        raise RuntimeError(f"Failed to load summarization model '{name}' ({backend}): {exc}")
+
+
+def _get_summarizer(name: Optional[str] = None) -> "Pipeline":
+    """Return a cached summarization pipeline for `name` (default `SUMMARIZER_MODEL`).
+
+    The model may be overridden with the `SUMMARIZER_MODEL` environment
+    variable (for example: `facebook/bart-large-cnn`, `t5-base`, or
+    `google/pegasus-xsum`) and the inference backend with
+    `SUMMARIZER_BACKEND` (see `services.inference_backends`). Pipelines are
+    loaded once into the `services.cascade` model pool and reused until the
+    pool's memory budget forces an eviction.
+    """
+    return cascade.get_pool(_load_pipeline).get(name or model_name())
+
+
+def _remote():
+    """Client for the shared inference server when `SUMMARIZER_SOCKET` is set, else None."""
+    if not os.getenv("SUMMARIZER_SOCKET"):
+        return None
+    from services.inference_server import get_client
+
+    return get_client()
+
+
+def load_model() -> None:
+    """Make sure the models are available: load them, or wait for the inference server."""
+    client = _remote()
+    if client is not None:
+        client.wait_ready()
+        return
+    for name in cascade.configured_models(model_name()):
+        _get_summarizer(name)
 
 
 # Preset token-lengths for summary types. Values are model-dependent but
@@ -52,6 +144,21 @@ LENGTH_PRESETS: Dict[str, Dict[str, int]] = {
     "long": {"max_length": 300, "min_length": 80},
 }
 
+# Intermediate preset for map-phase chunk summaries. It is independent of the
+# requested preset so chunk summaries can be reused across short/medium/long.
+CHUNK_PRESET = "chunk"
+_CHUNK_PARAMS: Dict[str, int] = {"max_length": 150, "min_length": 30}
+
+
+def _resolve_preset(summary_type: str) -> Dict[str, int]:
+    """Validate `summary_type` and return its `LENGTH_PRESETS` entry."""
+    summary_type = (summary_type or "medium").lower()
+    if summary_type == CHUNK_PRESET:
+        return _CHUNK_PARAMS
+    if summary_type not in LENGTH_PRESETS:
+        raise RuntimeError("Invalid summary_type; expected one of: short, medium, long")
+    return LENGTH_PRESETS[summary_type]
+
 
 def generate_summary(text: str, summary_type: str = "medium") -> str:
     """Generate a summary for `text` using the preset `summary_type`.
@@ -63,15 +170,24 @@ def generate_summary(text: str, summary_type: str = "medium") -> str:
     if not isinstance(text, str) or not text.strip():
         raise RuntimeError("No text provided for summarization")
 
-    summary_type = (summary_type or "medium").lower()
-    if summary_type not in LENGTH_PRESETS:
-        raise RuntimeError("Invalid summary_type; expected one of: short, medium, long")
+    _resolve_preset(summary_type)
 
-    params = LENGTH_PRESETS[summary_type]
+    client = _remote()
+    if client is not None:
+        return client.summaries([text], summary_type)[0]
 
-    # Get or create the summarization pipeline
-    summarizer = _get_summarizer()
+    return _summarize_precompressed(_precompress(text, summary_type), summary_type)
 
+
+def _summarize_precompressed(text: str, summary_type: str) -> str:
+    """`generate_summary` for text the caller has already pre-compressed."""
+    # Get or create the summarization pipeline of the routed model
+    return _run_pipeline(_get_summarizer(_route(text, summary_type)), text, summary_type)
+
+
+def _run_pipeline(summarizer: "Pipeline", text: str, summary_type: str) -> str:
+    """One pipeline call on already routed (and pre-compressed) `text`."""
+    params = _resolve_preset(summary_type)
     try:
         # The pipeline may return a list of dicts with 'summary_text'
         result = summarizer(text, max_length=params["max_length"], min_length=params["min_length"], truncation=True)
@@ -88,6 +204,361 @@ def generate_summary(text: str, summary_type: str = "medium") -> str:
         raise RuntimeError(f"Summarization failed: {exc}")
 
 
+def generate_summaries(texts: List[str], summary_type: str = "medium") -> List[str]:
+    """Summarize several texts with one batched pipeline call per model.
+
+    All texts share the `summary_type` preset (max/min length are per call).
+    Texts the cascade routes to different models run as separate batches.
+    Inputs are padded to the longest text in the batch. Returns summaries in
+    input order; raises `RuntimeError` if the batch fails or any input is
+    empty, so callers can retry the whole batch.
+    """
+    if not texts:
+        return []
+    if any(not isinstance(t, str) or not t.strip() for t in texts):
+        raise RuntimeError("No text provided for summarization")
+
+    params = _resolve_preset(summary_type)
+    client = _remote()
+    if client is not None:
+        return client.summaries(texts, summary_type)
+
+    texts = [_precompress(t, summary_type) for t in texts]
+    groups: Dict[str, List[int]] = {}
+    for i, text in enumerate(texts):
+        groups.setdefault(_route(text, summary_type), []).append(i)
+
+    summaries: List[str] = [""] * len(texts)
+    for model, indices in groups.items():
+        batch = _generate_batch(_get_summarizer(model), [texts[i] for i in indices], params)
+        for i, summary in zip(indices, batch):
+            summaries[i] = summary
+    return summaries
+
+
+def _generate_batch(summarizer: "Pipeline", texts: List[str], params: Dict[str, int]) -> List[str]:
+    """Run one padded batch through `summarizer`."""
+    try:
+        result = summarizer(
+            list(texts),
+            max_length=params["max_length"],
+            min_length=params["min_length"],
+            truncation=True,
+            batch_size=len(texts),
+        )
+        summaries = []
+        for item in result:
+            # Each input yields a dict (or a single-element list of dicts)
+            if isinstance(item, list):
+                item = item[0] if item else {}
+            summary = (item.get("summary_text") or "").strip()
+            if not summary:
+                raise RuntimeError("Summarizer returned no summary")
+            summaries.append(summary)
+        if len(summaries) != len(texts):
+            raise RuntimeError(f"Summarizer returned {len(summaries)} summaries for {len(texts)} inputs")
+        return summaries
+    except Exception as exc:
+        logging.exception("Batch summarization error")
+        raise RuntimeError(f"Summarization failed: {exc}")
+
+
+# Receives progress events (plain dicts) from long-running summarization
+Progress = Callable[[Dict[str, object]], None]
+
+# Tokens reserved for special tokens when packing chunks into the window
+_WINDOW_MARGIN = 16
+
+# Safety bound on reduce levels; each level shrinks the text several-fold
+_MAX_REDUCE_DEPTH = 6
+
+_CHUNK_CACHE: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+def model_window() -> int:
+    """Input window (in tokens) used to decide when to chunk."""
+    return _env_int("LONG_DOC_WINDOW_TOKENS", 1024)
+
+
+def is_long_text(text: str) -> bool:
+    """Cheap check (no tokenizer) for whether `text` likely exceeds the window."""
+    return estimate_tokens(text) > model_window()
+
+
+def _precompress(text: str, summary_type: str) -> str:
+    """Extractive pre-compression for a user-facing preset (no-op unless enabled)."""
+    if (summary_type or "").lower() == CHUNK_PRESET:
+        return text
+    max_length = _resolve_preset(summary_type)["max_length"]
+    return extractive.precompress(text, max_length, model_window() - _WINDOW_MARGIN)
+
+
+def _token_counter(model: str) -> Callable[[str], int]:
+    """Token counter backed by the tokenizer of `model`'s pooled pipeline."""
+    tokenizer = _get_summarizer(model).tokenizer
+    return lambda s: len(tokenizer.encode(s, add_special_tokens=False))
+
+
+def _chunk_key(chunk: str) -> Tuple[str, str]:
+    return select_model(chunk, CHUNK_PRESET), hashlib.sha256(chunk.encode("utf-8")).hexdigest()
+
+
+def _summarize_chunks(chunks: Iterable[str], on_batch: Optional[Callable[[int], None]] = None) -> List[str]:
+    """Map step: summarize `chunks` with `CHUNK_PRESET`, reusing cached results.
+
+    `chunks` may be lazy; a batch is sent to the model as soon as
+    `LONG_DOC_BATCH_SIZE` uncached chunks are waiting. `on_batch(done)` is
+    called after each batch with the number of chunks summarized so far.
+    """
+    batch_size = _env_int("LONG_DOC_BATCH_SIZE", 4)
+    cache_size = _env_int("CHUNK_CACHE_SIZE", 4096)
+
+    results: List[Optional[str]] = []
+    pending: List[Tuple[int, str]] = []
+
+    def flush() -> None:
+        summaries = generate_summaries([chunk for _, chunk in pending], CHUNK_PRESET)
+        for (i, chunk), summary in zip(pending, summaries):
+            results[i] = summary
+            _CHUNK_CACHE[_chunk_key(chunk)] = summary
+            while len(_CHUNK_CACHE) > cache_size:
+                _CHUNK_CACHE.popitem(last=False)
+        pending.clear()
+        if on_batch is not None:
+            on_batch(len(results))
+
+    for chunk in chunks:
+        key = _chunk_key(chunk)
+        if key in _CHUNK_CACHE:
+            _CHUNK_CACHE.move_to_end(key)
+            results.append(_CHUNK_CACHE[key])
+            continue
+        results.append(None)
+        pending.append((len(results) - 1, chunk))
+        if len(pending) >= batch_size:
+            flush()
+    if pending:
+        flush()
+
+    return results
+
+
+def summarize_long(text: str, summary_type: str = "medium", count_tokens: Callable[[str], int] | None = None) -> str:
+    """Hierarchical map-reduce summarization for text longer than the window.
+
+    `text` is expected to be pre-compressed already (`summarize_text` does
+    it once up front); the reduced text gets the requested preset without
+    being compressed again. Raises `RuntimeError` on failure, like
+    `generate_summary`.
+    """
+    if not isinstance(text, str) or not text.strip():
+        raise RuntimeError("No text provided for summarization")
+    _resolve_preset(summary_type)
+
+    # Chunks are sized for the model the map step routes them to
+    count = count_tokens or _token_counter(select_model(text, CHUNK_PRESET))
+    budget = max(1, model_window() - _WINDOW_MARGIN)
+
+    # Final pass applies the requested preset (truncating only if depth ran out)
+    return _summarize_precompressed(_reduce(text, count, budget), summary_type)
+
+
+def _reduce(current: str, count: Callable[[str], int], budget: int, progress: Optional[Progress] = None) -> str:
+    """Summarize chunks of `current` level by level until it fits `budget` tokens.
+
+    `progress` receives `{"stage": "chunks", "level", "done", "total"}` events.
+    """
+    for level in range(1, _MAX_REDUCE_DEPTH + 1):
+        if count(current) <= budget:
+            break
+        chunks = chunk_text(current, budget, count)
+        if len(chunks) <= 1:
+            break
+        on_batch = partial(_report_chunks, progress, level, len(chunks)) if progress is not None else None
+        current = "\n".join(_summarize_chunks(chunks, on_batch))
+    return current
+
+
+def _report_chunks(progress: Progress, level: int, total: int, done: int) -> None:
+    progress({"stage": "chunks", "level": level, "done": done, "total": total})
+
+
 # Backwards-compatible alias used by routers
 def summarize_text(text: str, length: str = "medium") -> str:
-    return generate_summary(text, summary_type=length)
+    """Summarize `text`, switching to map-reduce mode for long documents."""
+    client = _remote()
+    if client is not None:
+        return client.summarize(text, length)
+    if not isinstance(text, str) or not text.strip():
+        raise RuntimeError("No text provided for summarization")
+    # Pre-compressed text usually fits the window, skipping map-reduce entirely
+    text = _precompress(text, length)
+    if is_long_text(text):
+        return summarize_long(text, summary_type=length)
+    return _summarize_precompressed(text, length)
+
+
+def _generate_shared(summarizer: "Pipeline", text: str, presets: List[str]) -> List[str]:
+    """Summaries of `text` for each preset from a single encoder pass.
+
+    Seq2seq PyTorch models encode the input once and run only the decoder
+    (`generate` with the cached `encoder_outputs`) per preset. Other
+    backends (e.g. ONNX Runtime) fall back to one pipeline call per preset.
+    """
+    model = getattr(summarizer, "model", None)
+    try:
+        import torch
+        from transformers.modeling_outputs import BaseModelOutput
+    except ImportError:
+        torch = None
+    if torch is None or not isinstance(model, torch.nn.Module) or not hasattr(model, "get_encoder"):
+        return [_run_pipeline(summarizer, text, preset) for preset in presets]
+
+    tokenizer = summarizer.tokenizer
+    prefix = getattr(model.config, "prefix", None) or ""
+    try:
+        inputs = tokenizer(prefix + text, return_tensors="pt", truncation=True)
+        summaries = []
+        with torch.no_grad():
+            hidden = model.get_encoder()(**inputs, return_dict=True).last_hidden_state
+            for preset in presets:
+                params = _resolve_preset(preset)
+                # `generate` expands encoder outputs for beam search in place, so pass a fresh wrapper
+                output = model.generate(
+                    attention_mask=inputs["attention_mask"],
+                    encoder_outputs=BaseModelOutput(last_hidden_state=hidden),
+                    max_length=params["max_length"],
+                    min_length=params["min_length"],
+                )
+                summary = tokenizer.decode(output[0], skip_special_tokens=True, clean_up_tokenization_spaces=True).strip()
+                if not summary:
+                    raise RuntimeError("Summarizer returned no summary")
+                summaries.append(summary)
+        return summaries
+    except Exception as exc:
+        logging.exception("Shared-encoder summarization error")
+        raise RuntimeError(f"Summarization failed: {exc}")
+
+
+def summarize_presets(text: str, presets: List[str]) -> Dict[str, str]:
+    """Summarize `text` once per preset, sharing the work the presets have in common.
+
+    Long documents are map-reduced to the model window once (chunk summaries
+    don't depend on the preset); presets whose input and routed model match
+    then share one encoder pass (`_generate_shared`). Returns summaries keyed
+    by preset in the order given; raises `RuntimeError` like `generate_summary`.
+    """
+    presets = list(dict.fromkeys((p or "medium").lower() for p in presets))
+    for preset in presets:
+        _resolve_preset(preset)
+    if len(presets) == 1:
+        return {presets[0]: summarize_text(text, presets[0])}
+    if not isinstance(text, str) or not text.strip():
+        raise RuntimeError("No text provided for summarization")
+
+    client = _remote()
+    if client is not None:
+        return client.summarize_presets(text, presets)
+
+    reduced: Dict[str, str] = {}
+    groups: Dict[Tuple[str, str], List[str]] = {}
+    for preset in presets:
+        source = _precompress(text, preset)
+        if is_long_text(source):
+            if source not in reduced:
+                count = _token_counter(select_model(source, CHUNK_PRESET))
+                reduced[source] = _reduce(source, count, max(1, model_window() - _WINDOW_MARGIN))
+            source = reduced[source]
+        groups.setdefault((_route(source, preset), source), []).append(preset)
+
+    results: Dict[str, str] = {}
+    for (model, source), group in groups.items():
+        results.update(zip(group, _generate_shared(_get_summarizer(model), source, group)))
+    return {preset: results[preset] for preset in presets}
+
+
+def _stream_generate(summarizer: "Pipeline", text: str, summary_type: str) -> Iterator[str]:
+    """Yield summary text pieces as the model decodes them.
+
+    Decoding runs on a helper thread feeding a `TextIteratorStreamer`; it
+    stops at the next token once this generator is closed (e.g. the client
+    went away). Streaming needs greedy decoding (`num_beams=1`), so wording
+    can differ slightly from the beam-searched non-streaming summary. Models
+    without `generate` (or without `transformers` streamers) yield the whole
+    summary at once.
+    """
+    model = getattr(summarizer, "model", None)
+    try:
+        from transformers import StoppingCriteriaList, TextIteratorStreamer
+    except ImportError:
+        TextIteratorStreamer = None
+    if TextIteratorStreamer is None or not hasattr(model, "generate"):
+        yield _run_pipeline(summarizer, text, summary_type)
+        return
+
+    params = _resolve_preset(summary_type)
+    tokenizer = summarizer.tokenizer
+    prefix = getattr(model.config, "prefix", None) or ""
+    streamer = TextIteratorStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True)
+    errors: List[Exception] = []
+    closed = threading.Event()
+
+    def decode() -> None:
+        try:
+            inputs = tokenizer(prefix + text, return_tensors="pt", truncation=True)
+            model.generate(
+                **inputs,
+                streamer=streamer,
+                stopping_criteria=StoppingCriteriaList([lambda input_ids, scores, **kwargs: closed.is_set()]),
+                max_length=params["max_length"],
+                min_length=params["min_length"],
+                num_beams=1,
+            )
+        except Exception as exc:
+            logging.exception("Streaming summarization error")
+            errors.append(exc)
+            streamer.end()
+
+    thread = threading.Thread(target=decode, name="summary-stream", daemon=True)
+    thread.start()
+    try:
+        for piece in streamer:
+            if piece:
+                yield piece
+    finally:
+        closed.set()
+    thread.join()
+    if errors:
+        raise RuntimeError(f"Summarization failed: {errors[0]}")
+
+
+def stream_summary(text: str, summary_type: str = "medium", progress: Optional[Progress] = None) -> Iterator[str]:
+    """Summarize `text`, yielding the summary in pieces as it is generated.
+
+    Same pipeline as `summarize_text` (pre-compression, map-reduce for long
+    documents, cascade routing), but the final decode is streamed; chunk
+    progress of the map-reduce step is reported through `progress`. With a
+    shared inference server the summary arrives as a single piece. Raises
+    `RuntimeError` like `generate_summary`.
+    """
+    if not isinstance(text, str) or not text.strip():
+        raise RuntimeError("No text provided for summarization")
+    _resolve_preset(summary_type)
+
+    client = _remote()
+    if client is not None:
+        yield client.summarize(text, summary_type)
+        return
+
+    text = _precompress(text, summary_type)
+    if is_long_text(text):
+        count = _token_counter(select_model(text, CHUNK_PRESET))
+        text = _reduce(text, count, max(1, model_window() - _WINDOW_MARGIN), progress)
+    yield from _stream_generate(_get_summarizer(_route(text, summary_type)), text, summary_type)
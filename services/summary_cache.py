@@ -0,0 +1,168 @@
+"""Content-addressed summary cache.
+
+Users re-upload the same documents often; generating the summary again is by
+far the most expensive step. `SummaryCache` maps
+
+    sha256(text) + SUMMARIZER_MODEL (or cascade) + backend + LENGTH_PRESETS[preset]  ->  summary
+
+through two tiers:
+
+  - an in-process LRU bounded by total summary size in bytes
+    (`SUMMARY_CACHE_MAX_BYTES`, default 64 MiB)
+  - the `summary_cache` DB table (`models.summary_cache`), shared by all
+    workers and surviving restarts
+
+Because the model id (or cascade signature), the inference backend and
+preset parameters are part of the key, changing `SUMMARIZER_MODEL`,
+`SUMMARIZER_CASCADE`, `SUMMARIZER_BACKEND` or a preset never returns stale
+summaries. When the model changes the in-process tier is dropped, and
+`purge_other_models()` removes DB rows produced by other models (called on
+startup).
+
+Hit/miss counters are available via `stats()`. All methods are synchronous
+and expect to run on the I/O pool with a caller-provided session.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models.summary_cache import SummaryCacheEntry
+from services import extractive
+from services.summarizer import LENGTH_PRESETS, model_signature
+
+
+def text_hash(text: str) -> str:
+    """sha256 hex digest of the extracted text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def make_key(digest: str, model: str, preset: str) -> str:
+    """Cache key over text digest, model id and the preset's parameters."""
+    # Pre-compression settings only join the key when enabled, so existing keys stay valid
+    params = json.dumps({**LENGTH_PRESETS.get(preset, {}), **extractive.settings()}, sort_keys=True)
+    return hashlib.sha256(f"{digest}|{model}|{preset}|{params}".encode("utf-8")).hexdigest()
+
+
+class SummaryCache:
+    """Two-tier (memory LRU + DB) summary cache."""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024) -> None:
+        self.max_bytes = max(0, int(max_bytes))
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._bytes = 0
+        self._model = model_signature()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    def _check_model(self) -> str:
+        """Drop in-process entries if the model (or cascade) changed since last use."""
+        current = model_signature()
+        if current != self._model:
+            logging.info("Summarizer model changed (%s -> %s); clearing summary cache", self._model, current)
+            self._entries.clear()
+            self._bytes = 0
+            self._model = current
+        return current
+
+    def _remember(self, key: str, summary: str) -> None:
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return
+        size = len(summary.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        self._entries[key] = summary
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted.encode("utf-8"))
+
+    def get(self, db: Session, text: str, preset: str) -> Optional[str]:
+        """Return a cached summary for (`text`, `preset`) or None."""
+        return self.get_by_hash(db, text_hash(text), preset)
+
+    def get_by_hash(self, db: Session, digest: str, preset: str) -> Optional[str]:
+        """Like `get` for text known by its `text_hash` only (e.g. a near-duplicate's)."""
+        with self._lock:
+            model = self._check_model()
+            key = make_key(digest, model, preset)
+            summary = self._entries.get(key)
+            if summary is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return summary
+
+        row = db.query(SummaryCacheEntry.summary).filter(SummaryCacheEntry.cache_key == key).first()
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.db_hits += 1
+            self._remember(key, row.summary)
+            return row.summary
+
+    def put(self, db: Session, text: str, preset: str, summary: str) -> None:
+        """Store `summary` for (`text`, `preset`) in both tiers."""
+        digest = text_hash(text)
+        with self._lock:
+            model = self._check_model()
+            key = make_key(digest, model, preset)
+            self._remember(key, summary)
+
+        entry = SummaryCacheEntry(cache_key=key, text_hash=digest, model_name=model, preset=preset, summary=summary)
+        db.add(entry)
+        try:
+            db.commit()
+        except IntegrityError:
+            # Another request stored the same key concurrently; keep theirs
+            db.rollback()
+
+    def purge_other_models(self, db: Session) -> int:
+        """Delete DB entries produced by a model other than the current one."""
+        with self._lock:
+            model = self._check_model()
+        deleted = db.query(SummaryCacheEntry).filter(SummaryCacheEntry.model_name != model).delete(synchronize_session=False)
+        db.commit()
+        return deleted
+
+    def stats(self) -> Dict[str, object]:
+        """Hit/miss counters and current in-process footprint."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "model": self._model,
+                "hits": self.hits,
+                "db_hits": self.db_hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+_CACHE: Optional[SummaryCache] = None
+
+
+def get_cache() -> SummaryCache:
+    """Return the process-wide summary cache, created from env config."""
+    global _CACHE
+    if _CACHE is None:
+        try:
+            max_bytes = int(os.getenv("SUMMARY_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+        except ValueError:
+            max_bytes = 64 * 1024 * 1024
+        _CACHE = SummaryCache(max_bytes=max_bytes)
+    return _CACHE
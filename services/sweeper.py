@@ -0,0 +1,200 @@
+"""Re-summarization sweeper for documents stored without all their summaries.
+
+When summarization fails after all inline attempts, the upload endpoint
+still stores the document (with `summary_attempts` and `summary_error`
+recorded). `Sweeper` finds those rows in batches and retries them:
+
+  - rows are selected when `summary` is NULL or the last attempt left an
+    error (e.g. `length=short,long` where only `short` was cached), only
+    while `summary_attempts < max_attempts` and once their
+    `summary_next_attempt_at` has passed, oldest first
+  - every preset listed in `summary_length` that has no `Summary` row yet
+    is retried; `Document.summary` is filled from the first one
+  - short texts with the same length preset are summarized as one batch via
+    `generate_summaries`; long texts use map-reduce `summarize_text`
+  - if a batch fails, its rows are retried one by one so a single bad
+    document doesn't block the others
+  - a document with any failed preset increments `summary_attempts`
+    (once per pass), stores `summary_error` and
+    schedules the next try after `base_delay * 2**(attempts - 1)` seconds (capped
+    at `max_delay`)
+  - successes are written back and stored in the summary cache
+
+The sweeper is meant to run in its own process (`scripts/resummarize.py`),
+so it loads a separate model instance and never competes with the API's
+request-serving pipeline or micro-batcher.
+"""
+
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session, undefer
+
+from models.document import Document
+from models.summary import Summary
+from services import search, summarizer
+from services.summary_cache import get_cache
+
+
+@dataclass
+class SweepResult:
+    """Counts from one sweep pass."""
+
+    scanned: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    errors: Dict[int, str] = field(default_factory=dict)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class Sweeper:
+    """Retries NULL-summary documents with batching and exponential backoff."""
+
+    def __init__(
+        self,
+        batch_size: int = 8,
+        max_attempts: int = 5,
+        base_delay: float = 60.0,
+        max_delay: float = 6 * 3600.0,
+        default_length: str = "medium",
+        clock: Callable[[], datetime] = _now,
+    ) -> None:
+        self.batch_size = max(1, int(batch_size))
+        self.max_attempts = max(1, int(max_attempts))
+        self.base_delay = max(0.0, float(base_delay))
+        self.max_delay = max(self.base_delay, float(max_delay))
+        self.default_length = default_length
+        self.clock = clock
+
+    def backoff(self, attempts: int) -> timedelta:
+        """Delay before the next retry after `attempts` failures."""
+        return timedelta(seconds=min(self.max_delay, self.base_delay * (2 ** max(0, attempts - 1))))
+
+    def find_pending(self, db: Session) -> List[Document]:
+        """Return up to `batch_size` documents that are due for a retry."""
+        now = self.clock()
+        return (
+            db.query(Document)
+            .options(undefer(Document.content))
+            .filter(
+                or_(Document.summary.is_(None), Document.summary_error.isnot(None)),
+                Document.summary_attempts < self.max_attempts,
+                or_(Document.summary_next_attempt_at.is_(None), Document.summary_next_attempt_at <= now),
+            )
+            .order_by(Document.id)
+            .limit(self.batch_size)
+            .all()
+        )
+
+    def requested_presets(self, doc: Document) -> List[str]:
+        """Presets stored in `doc.summary_length` (primary first), `default_length` if none are valid."""
+        presets = [p.strip() for p in (doc.summary_length or "").split(",")]
+        return list(dict.fromkeys(p for p in presets if p in summarizer.LENGTH_PRESETS)) or [self.default_length]
+
+    def _summarize_group(self, docs: List[Document], length: str) -> Dict[int, object]:
+        """Summarize docs sharing a preset; maps doc id to summary or exception."""
+        outcomes: Dict[int, object] = {}
+        short = [d for d in docs if not summarizer.is_long_text(d.content)]
+        long = [d for d in docs if summarizer.is_long_text(d.content)]
+
+        if short:
+            try:
+                summaries = summarizer.generate_summaries([d.content for d in short], length)
+                outcomes.update({d.id: s for d, s in zip(short, summaries)})
+            except Exception:
+                # Isolate the failing document(s) by retrying individually
+                long = short + long
+
+        for doc in long:
+            try:
+                outcomes[doc.id] = summarizer.summarize_text(doc.content, length=length)
+            except Exception as exc:
+                outcomes[doc.id] = exc
+        return outcomes
+
+    def sweep_once(self, db: Session) -> SweepResult:
+        """Process one batch of due documents and commit the results."""
+        result = SweepResult()
+        docs = self.find_pending(db)
+        result.scanned = len(docs)
+        if not docs:
+            return result
+
+        # Summaries already stored, by document and preset
+        stored: Dict[int, Dict[str, str]] = defaultdict(dict)
+        for row in db.query(Summary.document_id, Summary.preset, Summary.summary).filter(
+            Summary.document_id.in_([doc.id for doc in docs])
+        ):
+            stored[row.document_id][row.preset] = row.summary
+
+        groups: Dict[str, List[Document]] = defaultdict(list)
+        for doc in docs:
+            for preset in self.requested_presets(doc):
+                if preset not in stored[doc.id]:
+                    groups[preset].append(doc)
+
+        outcomes: Dict[int, Dict[str, object]] = defaultdict(dict)
+        for length, group in groups.items():
+            for doc_id, outcome in self._summarize_group(group, length).items():
+                outcomes[doc_id][length] = outcome
+
+        now = self.clock()
+        recovered = []
+        for doc in docs:
+            errors = []
+            for length, outcome in outcomes[doc.id].items():
+                if isinstance(outcome, str) and outcome:
+                    db.add(Summary(document_id=doc.id, preset=length, summary=outcome))
+                    stored[doc.id][length] = outcome
+                    recovered.append((doc.content, length, outcome))
+                else:
+                    errors.append(str(outcome) if outcome is not None else "No summary produced")
+            primary = self.requested_presets(doc)[0]
+            if doc.summary is None and primary in stored[doc.id]:
+                doc.summary = stored[doc.id][primary]
+                search.update_summary(db, doc, None)
+            if errors:
+                doc.summary_attempts = (doc.summary_attempts or 0) + 1
+                doc.summary_error = "; ".join(errors)
+                doc.summary_next_attempt_at = now + self.backoff(doc.summary_attempts)
+                result.failed += 1
+                result.errors[doc.id] = doc.summary_error
+            else:
+                doc.summary_error = None
+                doc.summary_next_attempt_at = None
+                result.succeeded += 1
+        db.commit()
+
+        cache = get_cache()
+        for text, length, summary in recovered:
+            try:
+                cache.put(db, text, length, summary)
+            except Exception:
+                logging.exception("Failed to cache a re-generated summary")
+
+        logging.info(
+            "Sweep: %d scanned, %d re-summarized, %d failed", result.scanned, result.succeeded, result.failed
+        )
+        return result
+
+    def sweep_all(self, db: Session, max_batches: Optional[int] = None) -> SweepResult:
+        """Run `sweep_once` until nothing is due (or `max_batches` is reached)."""
+        total = SweepResult()
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            step = self.sweep_once(db)
+            batches += 1
+            total.scanned += step.scanned
+            total.succeeded += step.succeeded
+            total.failed += step.failed
+            total.errors.update(step.errors)
+            if step.scanned < self.batch_size:
+                break
+        return total
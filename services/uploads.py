@@ -0,0 +1,110 @@
+"""Streaming ingestion of uploaded files.
+
+Reading an upload with `await file.read()` materializes the whole file in
+RAM, once per concurrent request. `stream_to_disk` instead copies the upload
+to disk in fixed-size chunks (`UPLOAD_CHUNK_BYTES`, default 1 MiB):
+
+  - a sha256 of the content is computed on the fly, so no second pass over
+    the file is needed to hash it
+  - the size limit (`MAX_UPLOAD_BYTES`, default 100 MiB) is enforced while
+    streaming; `UploadTooLarge` is raised as soon as it is exceeded and the
+    partial file is removed
+  - data is written to a `.part` temp file and renamed into place, so a
+    crashed request never leaves a truncated file under its final name
+
+Time spent receiving (`read`) and writing (`save`) is recorded as upload
+stages in `services.metrics`. Extractors then open the stored file by path
+(or memory-map it) instead of receiving an in-memory copy.
+"""
+
+import hashlib
+import os
+import time
+from dataclasses import dataclass
+from uuid import uuid4
+
+from fastapi import UploadFile
+
+from services.executor import run_io
+from services.metrics import UPLOAD_BYTES, record_stage
+
+
+class UploadTooLarge(Exception):
+    """Raised when an upload exceeds the configured size limit."""
+
+    def __init__(self, limit: int) -> None:
+        super().__init__(f"Uploaded file exceeds the {limit} byte limit")
+        self.limit = limit
+
+
+@dataclass
+class StoredUpload:
+    """A file streamed to disk: where it is, how big, and its sha256."""
+
+    path: str
+    size: int
+    sha256: str
+
+
+def max_upload_bytes() -> int:
+    """Configured upload size limit in bytes (`MAX_UPLOAD_BYTES`)."""
+    try:
+        return max(1, int(os.getenv("MAX_UPLOAD_BYTES", str(100 * 1024 * 1024))))
+    except ValueError:
+        return 100 * 1024 * 1024
+
+
+def _chunk_bytes() -> int:
+    try:
+        return max(4096, int(os.getenv("UPLOAD_CHUNK_BYTES", str(1024 * 1024))))
+    except ValueError:
+        return 1024 * 1024
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+async def stream_to_disk(file: UploadFile, dest_path: str, max_bytes: int | None = None) -> StoredUpload:
+    """Copy `file` to `dest_path` chunk by chunk, hashing as it goes.
+
+    - Raises `UploadTooLarge` (and deletes the partial file) when more than
+      `max_bytes` are received.
+    - Returns a `StoredUpload`; `size == 0` means the upload was empty (the
+      empty file is still written so callers decide how to handle it).
+    """
+    limit = max_upload_bytes() if max_bytes is None else max_bytes
+    chunk_size = _chunk_bytes()
+    part_path = f"{dest_path}.{uuid4().hex}.part"
+    digest = hashlib.sha256()
+    size = 0
+
+    read_seconds = 0.0
+    save_started = time.perf_counter()
+    out = await run_io(open, part_path, "wb")
+    try:
+        while True:
+            started = time.perf_counter()
+            chunk = await file.read(chunk_size)
+            read_seconds += time.perf_counter() - started
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > limit:
+                raise UploadTooLarge(limit)
+            digest.update(chunk)
+            await run_io(out.write, chunk)
+    except BaseException:
+        await run_io(out.close)
+        await run_io(_remove_quietly, part_path)
+        raise
+    await run_io(out.close)
+    await run_io(os.replace, part_path, dest_path)
+
+    record_stage("read", read_seconds)
+    record_stage("save", time.perf_counter() - save_started - read_seconds)
+    UPLOAD_BYTES.observe(size)
+    return StoredUpload(path=dest_path, size=size, sha256=digest.hexdigest())
@@ -0,0 +1,48 @@
+"""Shared pytest fixtures for the Intelli Summarize backend.
+
+`sqlite_app` points the app at a temporary SQLite database (via
+`DATABASE_URL`) and imports a fresh copy of `main` and every project module,
+so module-level state (engine, caches, pools) never leaks between tests.
+"""
+
+import importlib
+import os
+import sys
+
+import pytest
+
+
+# Top-level project modules/packages that cache DB or service state on import
+_PROJECT_MODULES = ("main", "database", "routers", "models", "services")
+
+
+def _import_app_with_sqlite(tmp_path):
+    """Ensure environment uses a temporary SQLite DB and import a fresh `main` app."""
+    # Use a file-based SQLite DB in the temporary path so SQLAlchemy can create tables
+    db_path = tmp_path / "test.db"
+    sqlite_url = f"sqlite:///{db_path.as_posix()}"
+
+    # Ensure fresh import: remove modules that may cache DB/routers/services
+    for name in list(sys.modules):
+        if name.split(".")[0] in _PROJECT_MODULES:
+            del sys.modules[name]
+
+    # Set env vars before importing (database.py reads env on import)
+    os.environ["DATABASE_URL"] = sqlite_url
+    # Keep uploaded blobs out of the project's uploads/ directory
+    os.environ["UPLOAD_DIR"] = str(tmp_path / "uploads")
+    # Run CPU work on threads so patched (unpicklable) fakes are used
+    os.environ["CPU_POOL_SIZE"] = "0"
+    # Call the patched `summarize_text` directly instead of batching
+    os.environ["SUMMARY_MAX_BATCH_SIZE"] = "1"
+    # Don't load the real model on startup; tests that need warm-up opt in
+    os.environ["WARMUP_ON_START"] = "0"
+
+    # Import main (will import database and create app)
+    return importlib.import_module("main")
+
+
+@pytest.fixture
+def sqlite_app(tmp_path):
+    """Fresh `main` module bound to a temporary SQLite database."""
+    return _import_app_with_sqlite(tmp_path)
@@ -0,0 +1,104 @@
+"""Tests for admission control (`services.admission`) and the 503 it causes."""
+
+import asyncio
+import importlib
+import threading
+from io import BytesIO
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def admission():
+    return importlib.import_module("services.admission")
+
+
+def test_waiting_clients_are_served_round_robin(admission):
+    async def scenario():
+        manager = admission.CapacityManager(concurrency=1, max_queue=10, max_wait_seconds=5)
+        order = []
+        gate = asyncio.Event()
+
+        async def job(client, name):
+            async with manager.slot(client):
+                order.append(name)
+                await gate.wait()
+
+        first = asyncio.ensure_future(job("a", "a0"))
+        await asyncio.sleep(0)
+        tasks = [asyncio.ensure_future(job("a", f"a{i}")) for i in (1, 2, 3)]
+        tasks.append(asyncio.ensure_future(job("b", "b1")))
+        await asyncio.sleep(0)
+        assert manager.stats()["queue_depth_by_client"] == {"a": 3, "b": 1}
+
+        gate.set()
+        await asyncio.gather(first, *tasks)
+        return order, manager.stats()
+
+    order, stats = asyncio.run(scenario())
+    assert order == ["a0", "a1", "b1", "a2", "a3"]
+    assert stats["admitted_total"] == 5 and stats["queue_depth"] == 0 and stats["in_flight"] == 0
+
+
+def test_requests_are_shed_with_a_retry_estimate(admission):
+    async def scenario():
+        manager = admission.CapacityManager(concurrency=1, max_queue=1, max_wait_seconds=0.05)
+        await manager.acquire("a")
+
+        # Waiting too long
+        with pytest.raises(admission.Overloaded) as timeout:
+            await manager.acquire("b")
+        # Queue full
+        waiter = asyncio.ensure_future(manager.acquire("c", shed=False))
+        await asyncio.sleep(0)
+        with pytest.raises(admission.Overloaded) as full:
+            await manager.acquire("d")
+        # Estimated wait above the limit once service times are known
+        manager.release(service_seconds=4.0)
+        await waiter
+        manager.max_queue = 10
+        with pytest.raises(admission.Overloaded) as estimated:
+            await manager.acquire("e")
+        return timeout.value, full.value, estimated.value, manager.stats()
+
+    timeout, full, estimated, stats = asyncio.run(scenario())
+    assert (timeout.reason, full.reason, estimated.reason) == ("timeout", "queue_full", "estimated_wait")
+    assert estimated.retry_after == 4
+    assert stats["rejected_total"] == {"timeout": 1, "queue_full": 1, "estimated_wait": 1}
+
+
+def test_overloaded_upload_returns_503_with_retry_after(sqlite_app, monkeypatch):
+    monkeypatch.setenv("ADMISSION_CONCURRENCY", "1")
+    monkeypatch.setenv("ADMISSION_MAX_QUEUE", "0")
+    docs_mod = importlib.import_module("routers.documents")
+    started, release = threading.Event(), threading.Event()
+
+    def blocking_summarize(text: str, length: str = "medium") -> str:
+        started.set()
+        release.wait(timeout=5)
+        return "summary"
+
+    monkeypatch.setattr(docs_mod, "summarize_text", blocking_summarize)
+
+    with TestClient(sqlite_app.app) as client:
+        result = {}
+
+        def upload():
+            files = {"file": ("first.txt", BytesIO(b"First document text."), "text/plain")}
+            result["resp"] = client.post("/documents/upload/", files=files)
+
+        worker = threading.Thread(target=upload)
+        worker.start()
+        assert started.wait(timeout=5)
+
+        files = {"file": ("second.txt", BytesIO(b"Second document text."), "text/plain")}
+        shed = client.post("/documents/upload/", files=files, headers={"X-Client-Id": "tenant-b"})
+        release.set()
+        worker.join(timeout=5)
+
+        assert shed.status_code == 503
+        assert int(shed.headers["Retry-After"]) >= 1
+        assert result["resp"].status_code == 201
+        stats = client.get("/documents/capacity/stats").json()
+        assert stats["rejected_total"] == {"queue_full": 1}
@@ -0,0 +1,69 @@
+"""Tests for the summarization micro-batcher in `services.batching`.
+
+The batch runner is replaced with a fake coroutine that records each batch,
+so no model is loaded.
+"""
+
+import asyncio
+
+from services.batching import SummaryBatcher
+
+
+def _recording_runner(calls):
+    async def runner(texts, preset):
+        calls.append((preset, list(texts)))
+        return [f"{preset}:{t}" for t in texts]
+
+    return runner
+
+
+def test_concurrent_requests_share_one_batch_per_preset():
+    calls = []
+    batcher = SummaryBatcher(runner=_recording_runner(calls), max_batch_size=8, max_wait_ms=50)
+
+    async def scenario():
+        return await asyncio.gather(
+            batcher.submit("a", "short"),
+            batcher.submit("b", "short"),
+            batcher.submit("c", "long"),
+            batcher.submit("d", "short"),
+        )
+
+    results = asyncio.run(scenario())
+
+    assert results == ["short:a", "short:b", "long:c", "short:d"]
+    assert sorted(calls) == [("long", ["c"]), ("short", ["a", "b", "d"])]
+    stats = batcher.stats()
+    assert stats["batches_total"] == 2
+    assert stats["batch_size_histogram"] == {1: 1, 3: 1}
+
+
+def test_full_batch_flushes_without_waiting():
+    calls = []
+    batcher = SummaryBatcher(runner=_recording_runner(calls), max_batch_size=2, max_wait_ms=10_000)
+
+    async def scenario():
+        return await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(t, "medium") for t in "wxyz")),
+            timeout=2,
+        )
+
+    assert asyncio.run(scenario()) == ["medium:w", "medium:x", "medium:y", "medium:z"]
+    assert [len(texts) for _, texts in calls] == [2, 2]
+
+
+def test_batch_failure_propagates_to_every_caller():
+    async def failing_runner(texts, preset):
+        raise RuntimeError("model exploded")
+
+    batcher = SummaryBatcher(runner=failing_runner, max_batch_size=4, max_wait_ms=5)
+
+    async def scenario():
+        return await asyncio.gather(
+            batcher.submit("a", "short"),
+            batcher.submit("b", "short"),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, RuntimeError) for r in results)
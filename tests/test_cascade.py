@@ -0,0 +1,114 @@
+"""Tests for model cascade routing and the model pool (`services.cascade`)."""
+
+import importlib
+from io import BytesIO
+
+import pytest
+from fastapi.testclient import TestClient
+
+from services import cascade
+
+
+CASCADE = "distil presets=short; distil max_tokens=50; large presets=long,chunk"
+
+
+def test_rules_route_by_preset_and_size(monkeypatch):
+    monkeypatch.setenv("SUMMARIZER_CASCADE", CASCADE)
+    short_note, report = "word " * 20, "word " * 400
+
+    assert cascade.select_model(report, "short", "default") == "distil"
+    assert cascade.select_model(short_note, "medium", "default") == "distil"
+    assert cascade.select_model(report, "long", "default") == "large"
+    assert cascade.select_model(report, "medium", "default") == "default"
+    assert cascade.configured_models("default") == ["default", "distil", "large"]
+    assert cascade.signature("default").startswith("cascade:")
+
+    with pytest.raises(ValueError):
+        cascade.parse_cascade("distil max_tokens=many")
+    monkeypatch.setenv("SUMMARIZER_CASCADE", "distil bogus=1")
+    assert cascade.routes() == [] and cascade.signature("default") == "default"
+
+
+def test_pool_loads_lazily_and_evicts_least_recently_used():
+    loaded = []
+    sizes = {"a": 40, "b": 40, "c": 60}
+
+    def loader(name):
+        loaded.append(name)
+        return name
+
+    pool = cascade.ModelPool(loader, max_bytes=100, measure=lambda p: sizes[p])
+    assert loaded == []
+    pool.get("a"), pool.get("b"), pool.get("a")
+    assert loaded == ["a", "b"]
+
+    # "c" doesn't fit next to both: "b" (least recently used) goes
+    pool.get("c")
+    assert pool.loaded() == ["a", "c"]
+    # Reloading "b" evicts "a" up front, using the size measured before
+    pool.get("b")
+    assert pool.loaded() == ["c", "b"]
+    stats = pool.stats()
+    assert stats["bytes"] == 100 and stats["loads_total"] == 4 and stats["evictions_total"] == 2
+
+
+def test_batch_is_split_per_routed_model(monkeypatch):
+    summarizer = importlib.import_module("services.summarizer")
+    monkeypatch.setenv("SUMMARIZER_CASCADE", "distil max_tokens=50")
+    calls = []
+
+    def fake_get_summarizer(name=None):
+        def pipeline(texts, **kwargs):
+            calls.append((name, list(texts)))
+            return [{"summary_text": f"{name}:{len(t)}"} for t in texts]
+
+        return pipeline
+
+    monkeypatch.setattr(summarizer, "_get_summarizer", fake_get_summarizer)
+    small, big = "tiny note.", "x" * 1000
+    result = summarizer.generate_summaries([small, big, small], "medium")
+
+    assert calls == [("distil", [small, small]), (summarizer.model_name(), [big])]
+    assert result == [f"distil:{len(small)}", f"{summarizer.model_name()}:1000", f"distil:{len(small)}"]
+
+
+def test_long_text_is_chunked_with_the_routed_models_tokenizer(monkeypatch):
+    summarizer = importlib.import_module("services.summarizer")
+    monkeypatch.setenv("SUMMARIZER_CASCADE", CASCADE)
+    tokenizers = []
+
+    class Tokenizer:
+        def __init__(self, name):
+            self.name = name
+
+        def encode(self, text, add_special_tokens=False):
+            tokenizers.append(self.name)
+            return text.split()
+
+    class Pipeline:
+        def __init__(self, name):
+            self.tokenizer = Tokenizer(name)
+
+    monkeypatch.setattr(summarizer, "_get_summarizer", lambda name=None: Pipeline(name))
+    monkeypatch.setattr(summarizer, "_reduce", lambda text, count, budget: count(text) and "reduced.")
+    monkeypatch.setattr(summarizer, "_summarize_precompressed", lambda text, summary_type: text)
+
+    assert summarizer.summarize_long("word " * 400, "medium") == "reduced."
+    assert set(tokenizers) == {"large"}
+
+
+def test_routing_decisions_are_exported(sqlite_app, monkeypatch):
+    monkeypatch.setenv("SUMMARIZER_CASCADE", "distil presets=short")
+    summarizer = importlib.import_module("services.summarizer")
+    # Routes are counted where the model runs, so only the pipeline is faked
+    monkeypatch.setattr(
+        summarizer, "_get_summarizer", lambda name=None: lambda text, **kwargs: [{"summary_text": f"{name} summary"}]
+    )
+
+    with TestClient(sqlite_app.app) as client:
+        files = {"file": ("note.txt", BytesIO(b"A short note."), "text/plain")}
+        resp = client.post("/documents/upload/", files=files, data={"length": "short"})
+        assert resp.status_code == 201
+        assert resp.json()["summary"] == "distil summary"
+        body = client.get("/metrics").text
+    assert 'summarizer_model_routes_total{model="distil",preset="short"} 1' in body
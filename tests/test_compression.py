@@ -0,0 +1,54 @@
+"""Tests for compressed `Document.content` storage."""
+
+import importlib
+
+from sqlalchemy import text
+
+
+SAMPLE = "The quarterly report shows revenue growth across all regions. " * 20
+
+
+def test_roundtrip_with_trained_dictionary(tmp_path, monkeypatch):
+    compression = importlib.import_module("services.compression")
+    monkeypatch.setenv("CONTENT_DICT_DIR", str(tmp_path))
+
+    corpus = [f"Report {i}: the quarterly report shows revenue growth across all regions." for i in range(10)]
+    dict_id = compression.save_dictionary(compression.train_dictionary(corpus))
+    monkeypatch.setenv("CONTENT_DICT_ID", f"{dict_id:08x}")
+
+    stored = compression.compress(SAMPLE)
+    assert compression.describe(stored) == ("zlib", dict_id)
+    assert len(stored) < len(SAMPLE) // 4
+    assert compression.decompress(stored) == SAMPLE
+
+    # Plain values (legacy rows, or too short to compress) are read back as is
+    assert compression.compress("Hi") == b"Hi"
+    assert compression.decompress("legacy text") == "legacy text"
+    assert compression.decompress("naïve".encode("utf-8")) == "naïve"
+
+
+def test_document_content_is_stored_compressed(sqlite_app):
+    document = importlib.import_module("models.document").Document
+    sqlite_app.Base.metadata.create_all(bind=sqlite_app.engine)
+
+    with sqlite_app.SessionLocal() as db:
+        doc = document(filename="a.txt", content=SAMPLE)
+        db.add(doc)
+        db.commit()
+        doc_id = doc.id
+        # A row written before compression was enabled
+        db.execute(
+            text(
+                "INSERT INTO documents (filename, content, summary_attempts, uploaded_at) "
+                "VALUES ('old.txt', 'legacy text', 0, CURRENT_TIMESTAMP)"
+            )
+        )
+        db.commit()
+
+    with sqlite_app.engine.connect() as conn:
+        raw = conn.execute(text("SELECT content FROM documents WHERE id = :id"), {"id": doc_id}).scalar()
+    assert isinstance(raw, bytes) and len(raw) < len(SAMPLE) // 4
+
+    with sqlite_app.SessionLocal() as db:
+        contents = {d.filename: d.content for d in db.query(document)}
+    assert contents == {"a.txt": SAMPLE, "old.txt": "legacy text"}
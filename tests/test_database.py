@@ -0,0 +1,69 @@
+"""Tests for connection pool configuration and checkout metrics in `database`."""
+
+import importlib
+
+import pytest
+from sqlalchemy import create_engine, exc, inspect, text
+
+
+def test_pool_settings_come_from_env_and_timeouts_are_counted(sqlite_app, tmp_path, monkeypatch):
+    database = importlib.import_module("database")
+    metrics = importlib.import_module("services.metrics")
+    monkeypatch.setenv("DB_POOL_SIZE", "1")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "0")
+    monkeypatch.setenv("DB_POOL_TIMEOUT", "0")
+
+    metrics.instrument_db_pools()
+    url = f"sqlite:///{(tmp_path / 'pool.db').as_posix()}"
+    options = database.pool_options(url)
+    assert options["pool_size"] == 1 and options["pool_recycle"] == 1800
+    assert "poolclass" not in database.pool_options("sqlite://")
+
+    engine = create_engine(url, **options)
+    with engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+    engine.dispose()
+
+    text = metrics.REGISTRY.render()
+    assert 'db_pool_timeouts_total{engine="sync"} 1' in text
+    assert 'db_pool_checkout_seconds_count{engine="sync"}' in text
+    assert 'db_pool_checked_out{engine="sync"} 0' in text
+
+
+def test_async_url_swaps_in_async_driver(sqlite_app, monkeypatch):
+    database = importlib.import_module("database")
+    monkeypatch.delenv("ASYNC_DATABASE_URL", raising=False)
+    assert (
+        database.async_database_url("mysql+pymysql://u:p@db:3306/app?charset=utf8mb4")
+        == "mysql+aiomysql://u:p@db:3306/app?charset=utf8mb4"
+    )
+    assert database.async_database_url("sqlite:///./test.db") == "sqlite+aiosqlite:///./test.db"
+    monkeypatch.setenv("ASYNC_DATABASE_URL", "mysql+asyncmy://u@db/app")
+    assert database.async_database_url("mysql+pymysql://u@db/app") == "mysql+asyncmy://u@db/app"
+
+
+def test_schema_upgrade_adds_columns_and_indexes_to_an_old_database(sqlite_app, tmp_path):
+    migrations = importlib.import_module("models.migrations")
+    engine = create_engine(f"sqlite:///{(tmp_path / 'old.db').as_posix()}")
+    with engine.begin() as conn:
+        # `documents` as created before content hashing, retries and keyset listing
+        conn.execute(
+            text(
+                "CREATE TABLE documents (id INTEGER PRIMARY KEY, filename VARCHAR(255) NOT NULL, "
+                "content TEXT NOT NULL, summary TEXT, uploaded_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL)"
+            )
+        )
+        conn.execute(text("INSERT INTO documents (filename, content) VALUES ('a.txt', 'Old text.')"))
+
+    applied = migrations.upgrade_schema(engine)
+
+    assert any("summary_attempts" in statement for statement in applied)
+    columns = {c["name"] for c in inspect(engine).get_columns("documents")}
+    assert {"content_hash", "summary_length", "summary_attempts", "summary_next_attempt_at"} <= columns
+    assert "ix_documents_uploaded_at_id" in {i["name"] for i in inspect(engine).get_indexes("documents")}
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT summary_attempts FROM documents")).scalar() == 0
+        assert migrations.pending_changes(conn) == []
+    assert migrations.upgrade_schema(engine) == []
+    engine.dispose()
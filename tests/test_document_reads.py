@@ -0,0 +1,75 @@
+"""Tests for the document read endpoints (keyset pagination, projection, ETags)."""
+
+import importlib
+from io import BytesIO
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+
+def _upload(client, name: str, text: bytes) -> int:
+    files = {"file": (name, BytesIO(text), "text/plain")}
+    resp = client.post("/documents/upload/", files=files, data={"length": "short,long"})
+    assert resp.status_code == 201
+    return resp.json()["id"]
+
+
+def test_list_pages_through_documents_without_loading_content(sqlite_app, monkeypatch):
+    docs_mod = importlib.import_module("routers.documents")
+    monkeypatch.setattr(docs_mod, "summarize_presets", lambda text, presets: {p: f"{p}:{text}" for p in presets})
+
+    statements = []
+    event.listen(sqlite_app.engine, "before_cursor_execute", lambda conn, cur, sql, *a: statements.append(sql))
+
+    with TestClient(sqlite_app.app) as client:
+        ids = [_upload(client, f"{i}.txt", f"Document number {i}.".encode()) for i in range(5)]
+
+        statements.clear()
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            page = client.get("/documents/", params=params).json()
+            seen += [item["id"] for item in page["items"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert seen == ids[::-1]
+        assert set(page["items"][0]) == {"id", "filename", "summary_length", "uploaded_at"}
+        assert statements and not any("documents.content" in sql for sql in statements)
+
+        page = client.get("/documents/", params={"limit": 1, "fields": "content,summaries"}).json()
+        assert page["items"][0] == {
+            "id": ids[-1],
+            "content": "Document number 4.",
+            "summaries": {"short": "short:Document number 4.", "long": "long:Document number 4."},
+        }
+
+        assert client.get("/documents/", params={"cursor": "bogus"}).status_code == 400
+        assert client.get("/documents/", params={"fields": "secret"}).status_code == 400
+
+
+def test_get_document_supports_conditional_requests(sqlite_app, monkeypatch):
+    docs_mod = importlib.import_module("routers.documents")
+    monkeypatch.setattr(docs_mod, "summarize_presets", lambda text, presets: {p: p for p in presets})
+
+    with TestClient(sqlite_app.app) as client:
+        doc_id = _upload(client, "a.txt", b"Quarterly results were strong.")
+
+        resp = client.get(f"/documents/{doc_id}")
+        assert resp.status_code == 200
+        assert resp.json()["summary"] == "short"
+        assert "content" not in resp.json()
+        etag = resp.headers["etag"]
+
+        assert client.get(f"/documents/{doc_id}", headers={"If-None-Match": etag}).status_code == 304
+
+        # A changed summary changes the ETag
+        document = importlib.import_module("models.document").Document
+        with sqlite_app.SessionLocal() as db:
+            db.get(document, doc_id).summary = "revised"
+            db.commit()
+        resp = client.get(f"/documents/{doc_id}", headers={"If-None-Match": etag})
+        assert resp.status_code == 200
+        assert resp.json()["summary"] == "revised"
+
+        assert client.get("/documents/999999").status_code == 404
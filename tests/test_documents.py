@@ -1,49 +1,30 @@
 """Pytest suite for document upload endpoints.
 
-These tests use a temporary SQLite database (set via `DATABASE_URL`) and
-monkeypatch the extraction/summarization functions to avoid heavy model
-dependencies. Tests cover valid uploads (PDF, DOCX, TXT), invalid files,
+These tests use a temporary SQLite database (the `sqlite_app` fixture in
+`conftest.py`) and monkeypatch the extraction/summarization functions to
+avoid heavy model dependencies. Tests cover valid uploads (PDF, DOCX, TXT), invalid files,
 empty uploads, and summary length options.
 """
 
+import hashlib
 import importlib
-import sys
-from pathlib import Path
+import threading
+import time
+from datetime import timedelta
 from io import BytesIO
 
 import pytest
 from fastapi.testclient import TestClient
 
 
-def _import_app_with_sqlite(tmp_path):
-    """Ensure environment uses a temporary SQLite DB and import a fresh `main` app."""
-    # Use a file-based SQLite DB in the temporary path so SQLAlchemy can create tables
-    db_path = tmp_path / "test.db"
-    sqlite_url = f"sqlite:///{db_path.as_posix()}"
-
-    # Ensure fresh import: remove modules that may cache DB/routers
-    for name in ["main", "database", "routers.documents", "models.document", "models", "services.summarizer"]:
-        if name in sys.modules:
-            del sys.modules[name]
-
-    # Set env var before importing (database.py reads env on import)
-    import os
-
-    os.environ["DATABASE_URL"] = sqlite_url
-
-    # Import main (will import database and create app)
-    main = importlib.import_module("main")
-    return main
-
-
 @pytest.fixture
-def client(tmp_path, monkeypatch):
+def client(sqlite_app, monkeypatch):
     """Create TestClient with patched extraction and summarizer functions.
 
     - Patches `routers.documents` to provide deterministic extraction and
       summarization results so tests are reliable and fast.
     """
-    main = _import_app_with_sqlite(tmp_path)
+    main = sqlite_app
 
     # Import the router module to patch functions
     docs_mod = importlib.import_module("routers.documents")
@@ -114,3 +95,219 @@ def test_summary_length_options(client, length):
     assert resp.status_code == 201
     body = resp.json()
     assert body["summary"].startswith(f"{length}_summary_for:")
+
+
+def test_health_check_responsive_while_summarizing(client, monkeypatch):
+    docs_mod = importlib.import_module("routers.documents")
+    started = threading.Event()
+
+    def slow_summarize(text: str, length: str = "medium") -> str:
+        started.set()
+        time.sleep(1.0)
+        return "slow summary"
+
+    monkeypatch.setattr(docs_mod, "summarize_text", slow_summarize)
+
+    result = {}
+
+    def upload():
+        files = {"file": ("slow.txt", BytesIO(b"Text that takes a while to summarize."), "text/plain")}
+        result["resp"] = client.post("/documents/upload/", files=files)
+
+    worker = threading.Thread(target=upload)
+    worker.start()
+    assert started.wait(timeout=5)
+
+    start = time.perf_counter()
+    health = client.get("/")
+    elapsed = time.perf_counter() - start
+    worker.join(timeout=5)
+
+    assert health.status_code == 200
+    assert elapsed < 0.5
+    assert result["resp"].status_code == 201
+    assert result["resp"].json()["summary"] == "slow summary"
+
+
+def test_identical_upload_uses_summary_cache(client, monkeypatch):
+    docs_mod = importlib.import_module("routers.documents")
+    calls = []
+
+    def counting_summarize(text: str, length: str = "medium") -> str:
+        calls.append((text, length))
+        return f"{length}_summary_{len(calls)}"
+
+    monkeypatch.setattr(docs_mod, "summarize_text", counting_summarize)
+
+    def upload(length):
+        files = {"file": ("syllabus.txt", BytesIO(b"Week 1: introduction to algorithms."), "text/plain")}
+        return client.post("/documents/upload/", files=files, data={"length": length})
+
+    first, second = upload("short"), upload("short")
+    assert first.json()["summary"] == second.json()["summary"] == "short_summary_1"
+    assert len(calls) == 1
+
+    # A different preset is a different cache key
+    assert upload("long").json()["summary"] == "long_summary_2"
+
+    stats = client.get("/documents/summary-cache/stats").json()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+
+    # Switching model invalidates previously cached summaries
+    monkeypatch.setenv("SUMMARIZER_MODEL", "sshleifer/distilbart-cnn-12-6")
+    assert upload("short").json()["summary"] == "short_summary_3"
+
+
+def _wait_for_job(client, status_url, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        body = client.get(status_url).json()
+        if body["status"] in {"done", "failed"}:
+            return body
+        time.sleep(0.05)
+    raise AssertionError(f"job did not finish: {body}")
+
+
+def test_async_upload_returns_job_and_completes(client):
+    files = {"file": ("lecture.txt", BytesIO(b"Async lecture notes."), "text/plain")}
+    resp = client.post("/documents/upload/", files=files, data={"length": "long", "mode": "async"})
+    assert resp.status_code == 202
+    body = resp.json()
+    assert body["status"] == "queued"
+
+    job = _wait_for_job(client, body["status_url"])
+    assert job["status"] == "done"
+    assert job["document_id"] is not None
+    assert job["summary"].startswith("long_summary_for:Async lecture notes.")
+
+
+def test_async_upload_reports_failure_and_unknown_jobs(client, monkeypatch):
+    docs_mod = importlib.import_module("routers.documents")
+    monkeypatch.setattr(docs_mod, "extract_text_from_pdf", lambda data: "")
+
+    files = {"file": ("blank.pdf", BytesIO(b"%PDF-1.4"), "application/pdf")}
+    resp = client.post("/documents/upload/", files=files, data={"mode": "async"})
+    assert resp.status_code == 202
+    job = _wait_for_job(client, resp.json()["status_url"])
+    assert job["status"] == "failed"
+    assert "No extractable text" in job["message"]
+
+    assert client.get("/documents/jobs/doesnotexist").status_code == 404
+    files = {"file": ("image.jpg", BytesIO(b"\xff\xd8"), "image/jpeg")}
+    assert client.post("/documents/upload/", files=files, data={"mode": "async"}).status_code == 415
+
+
+def test_abandoned_running_jobs_are_requeued(sqlite_app, monkeypatch):
+    jobs = importlib.import_module("services.jobs")
+    job_mod = importlib.import_module("models.job")
+    sqlite_app.Base.metadata.create_all(bind=sqlite_app.engine)
+    monkeypatch.setenv("JOB_STALE_AFTER", "60")
+    monkeypatch.setenv("JOB_MAX_ATTEMPTS", "2")
+
+    with sqlite_app.SessionLocal() as db:
+        crashed = jobs.enqueue(db, "a.txt", "/tmp/a.txt", "short", 1)
+        exhausted = jobs.enqueue(db, "b.txt", "/tmp/b.txt", "short", 1)
+        recent = jobs.enqueue(db, "c.txt", "/tmp/c.txt", "short", 1)
+        long_ago = jobs._now() - timedelta(minutes=5)
+        for job, attempts, started in ((crashed, 1, long_ago), (exhausted, 2, long_ago), (recent, 1, jobs._now())):
+            job.status, job.attempts, job.started_at = job_mod.JOB_RUNNING, attempts, started
+        db.commit()
+
+        # The crashed job is requeued and claimed again; the one still within the timeout is left alone
+        claimed = jobs.claim_next(db)
+        assert (claimed.id, claimed.attempts) == (crashed.id, 2)
+        assert jobs.claim_next(db) is None
+
+        db.expire_all()
+        assert db.get(job_mod.SummaryJob, exhausted.id).status == job_mod.JOB_FAILED
+        assert db.get(job_mod.SummaryJob, recent.id).status == job_mod.JOB_RUNNING
+
+        # A graceful stop hands in-flight jobs back to the queue
+        assert jobs.requeue(db, [recent.id]) == 1
+        assert jobs.claim_next(db).id == recent.id
+
+
+def test_blobs_in_use_survive_release_and_gc(sqlite_app):
+    store = importlib.import_module("services.storage").get_store()
+    sqlite_app.Base.metadata.create_all(bind=sqlite_app.engine)
+
+    def put(data: bytes) -> str:
+        key = hashlib.sha256(data).hexdigest()
+        path = store.temp_path()
+        with open(path, "wb") as f:
+            f.write(data)
+        store.ingest(path, key)
+        return key
+
+    with sqlite_app.SessionLocal() as db:
+        # An upload still being processed: a concurrent failed upload or GC must not delete it
+        in_flight = put(b"in flight")
+        lease = store.lease(db, in_flight)
+        assert not store.release(db, in_flight)
+        assert store.collect_garbage(db, grace=0) == 0
+        # Released blobs are kept for the grace period
+        assert not store.release(db, in_flight, lease) and store.exists(in_flight)
+        assert store.release(db, in_flight, grace=0) and not store.exists(in_flight)
+        # Leasing it again re-registers the blob for a new upload
+        store.lease(db, in_flight)
+        assert db.get(importlib.import_module("models.blob").StoredBlob, in_flight) is not None
+
+        # Fresh unreferenced blobs are only collected after the grace period
+        orphan = put(b"orphan")
+        assert store.collect_garbage(db) == 0
+        assert store.collect_garbage(db, grace=0) == 1 and not store.exists(orphan)
+
+        # Pinned (migrated legacy) blobs are kept; expired leases don't count
+        legacy, stale = put(b"legacy"), put(b"stale")
+        store.lease(db, legacy, "migrate", seconds=0)
+        store.lease(db, stale, seconds=1)
+        time.sleep(1.1)
+        assert store.collect_garbage(db, grace=0) == 1
+        assert store.exists(legacy) and not store.exists(stale)
+
+
+def test_oversized_upload_rejected(client, monkeypatch):
+    monkeypatch.setenv("MAX_UPLOAD_BYTES", "1024")
+    # Rejected from Content-Length before the body is read
+    files = {"file": ("huge.txt", BytesIO(b"a" * (200 * 1024)), "text/plain")}
+    assert client.post("/documents/upload/", files=files).status_code == 413
+
+    # Within the multipart allowance, so caught while streaming to disk
+    files = {"file": ("big.txt", BytesIO(b"a" * 4096), "text/plain")}
+    assert client.post("/documents/upload/", files=files).status_code == 413
+
+
+def test_identical_files_are_stored_once_and_not_reextracted(client, monkeypatch, tmp_path):
+    docs_mod = importlib.import_module("routers.documents")
+    extractions = []
+
+    def counting_extract(source):
+        extractions.append(source)
+        return "Extracted PDF text."
+
+    monkeypatch.setattr(docs_mod, "extract_text_from_pdf", counting_extract)
+
+    for name in ("paper.pdf", "paper-copy.pdf"):
+        files = {"file": (name, BytesIO(b"%PDF-1.4 identical bytes"), "application/pdf")}
+        resp = client.post("/documents/upload/", files=files)
+        assert resp.status_code == 201
+
+    assert len(extractions) == 1
+
+    def stored_blobs():
+        root = tmp_path / "uploads"
+        return [p for p in root.rglob("*") if p.is_file() and p.relative_to(root).parts[0] != "tmp"]
+
+    assert len(stored_blobs()) == 1
+
+    # A failed upload releases its blob: it is collected once the grace period is over
+    monkeypatch.setattr(docs_mod, "extract_text_from_pdf", lambda source: "")
+    files = {"file": ("blank.pdf", BytesIO(b"%PDF-1.4 no text here"), "application/pdf")}
+    assert client.post("/documents/upload/", files=files).status_code == 422
+    assert len(stored_blobs()) == 2
+    storage = importlib.import_module("services.storage")
+    with importlib.import_module("database").SessionLocal() as db:
+        assert storage.get_store().collect_garbage(db) == 0
+        assert storage.get_store().collect_garbage(db, grace=0) == 1
+    assert len(stored_blobs()) == 1
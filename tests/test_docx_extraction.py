@@ -0,0 +1,43 @@
+"""Tests for the streaming DOCX extractor (`services.docx_extraction`).
+
+Fixtures are built with python-docx; the module is skipped without it.
+"""
+
+from io import BytesIO
+
+import pytest
+
+docx = pytest.importorskip("docx")
+
+from services.docx_extraction import iter_docx_text  # noqa: E402
+
+
+def _make_docx() -> bytes:
+    document = docx.Document()
+    document.add_paragraph("Introduction")
+    table = document.add_table(rows=2, cols=2)
+    table.cell(0, 0).text = "Week"
+    table.cell(0, 1).text = "Topic"
+    table.cell(1, 0).text = "1"
+    table.cell(1, 1).text = "Sorting\nand searching"
+    document.add_paragraph("Conclusion\twith tab")
+    buffer = BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def test_paragraphs_and_table_cells_are_yielded_in_order():
+    segments = [s for s in iter_docx_text(_make_docx()) if s]
+    assert segments == ["Introduction", "Week", "Topic", "1", "Sorting\nand searching", "Conclusion\twith tab"]
+
+
+def test_matches_python_docx_paragraph_text():
+    data = _make_docx()
+    expected = [p.text for p in docx.Document(BytesIO(data)).paragraphs]
+    text = "\n".join(iter_docx_text(data))
+    assert all(p in text for p in expected if p)
+
+
+def test_rejects_non_docx():
+    with pytest.raises(ValueError):
+        list(iter_docx_text(b"plain bytes"))
@@ -0,0 +1,96 @@
+"""Tests for extractive pre-compression (`services.extractive`)."""
+
+import importlib
+
+import pytest
+
+from services import extractive
+from services.chunking import estimate_tokens
+
+
+# Sentences about batteries share vocabulary; the two off-topic ones don't
+SENTENCES = [
+    "The new battery material stores more lithium than graphite.",
+    "My neighbour painted the fence a bright shade of green yesterday.",
+    "Battery cells made with the material keep their lithium capacity after many charging cycles.",
+    "Engineers will test whether the battery material can be produced at scale.",
+    "The football match was postponed because of heavy rain.",
+    "Cheaper lithium battery cells could double the range of electric cars.",
+]
+TEXT = " ".join(SENTENCES)
+
+
+@pytest.mark.parametrize("method", extractive.METHODS)
+def test_selection_keeps_salient_sentences_in_order_within_budget(method):
+    budget = estimate_tokens(TEXT) // 2
+    selected = extractive.select_sentences(TEXT, budget, method)
+
+    assert estimate_tokens(selected) <= budget
+    kept = [s for s in SENTENCES if s in selected]
+    assert " ".join(kept) == selected
+    assert SENTENCES[0] in kept and SENTENCES[2] in kept
+
+    scores = extractive.textrank_scores(SENTENCES) if method == extractive.TEXTRANK else extractive.centroid_scores(SENTENCES)
+    # The off-topic sentences rank last
+    assert set(scores.argsort()[:2]) == {1, 4}
+
+
+def test_text_within_budget_is_unchanged():
+    assert extractive.select_sentences(TEXT, estimate_tokens(TEXT)) == TEXT
+    assert extractive.select_sentences("x" * 400, 10) == "x" * 400
+    scores = extractive.textrank_scores(SENTENCES)
+    assert scores.shape == (len(SENTENCES),) and abs(scores.sum() - 1) < 1e-6
+
+
+def test_summarizer_precompresses_user_presets_only(monkeypatch):
+    summarizer = importlib.import_module("services.summarizer")
+    seen = []
+
+    class FakePipeline:
+        def __call__(self, inputs, **kwargs):
+            seen.append(inputs)
+            return [{"summary_text": "summary"} for _ in (inputs if isinstance(inputs, list) else [inputs])]
+
+    pipeline = FakePipeline()
+    monkeypatch.setattr(summarizer, "_get_summarizer", lambda name=None: pipeline)
+    monkeypatch.setenv("EXTRACTIVE_PRECOMPRESS", "1")
+    # Budget of 60 x 0.5 rounds up to the 1.0 minimum ratio: 60 tokens
+    monkeypatch.setenv("EXTRACTIVE_BUDGET_RATIO", "0.5")
+    long_text = " ".join([TEXT] * 5)
+
+    summarizer.generate_summary(long_text, "short")
+    summarizer.generate_summaries([long_text], summarizer.CHUNK_PRESET)
+    assert estimate_tokens(seen[0]) <= 60
+    assert seen[1] == [long_text]
+
+    monkeypatch.setenv("EXTRACTIVE_PRECOMPRESS", "0")
+    summarizer.generate_summary(long_text, "short")
+    assert seen[2] == long_text
+
+
+def test_long_documents_are_precompressed_once(monkeypatch):
+    summarizer = importlib.import_module("services.summarizer")
+    summarizer._CHUNK_CACHE.clear()
+    compressed = []
+
+    def counting_precompress(text, summary_type):
+        if summary_type != summarizer.CHUNK_PRESET:
+            compressed.append(summary_type)
+        return text
+
+    monkeypatch.setattr(summarizer, "_precompress", counting_precompress)
+    monkeypatch.setattr(summarizer, "_token_counter", lambda *args: lambda text: len(text.split()))
+
+    class FakePipeline:
+        def __call__(self, inputs, **kwargs):
+            # Chunks arrive in batches (lists), the final pass as one string
+            if isinstance(inputs, list):
+                return [{"summary_text": "Partial."} for _ in inputs]
+            return [{"summary_text": "Final."}]
+
+    pipeline = FakePipeline()
+    monkeypatch.setattr(summarizer, "_get_summarizer", lambda name=None: pipeline)
+    monkeypatch.setenv("LONG_DOC_WINDOW_TOKENS", "60")
+
+    assert summarizer.summarize_text(" ".join([TEXT] * 5), "short") == "Final."
+    assert compressed == ["short"]
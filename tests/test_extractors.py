@@ -0,0 +1,85 @@
+"""Tests for the extractor registry (`services.extractors`)."""
+
+import importlib
+
+import pytest
+
+
+@pytest.fixture
+def extractors():
+    return importlib.import_module("services.extractors")
+
+
+def _write(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_magic_bytes_win_over_the_filename(extractors, tmp_path):
+    pdf = _write(tmp_path, "scan.jpg", b"%PDF-1.4 not really")
+    assert extractors.sniff_mime(pdf) == extractors.PDF
+
+    # Suffix decides when there are no magic bytes; unknown suffixes are rejected
+    assert extractors.sniff_mime(_write(tmp_path, "notes.TXT", b"hello")) == extractors.TEXT
+    assert extractors.sniff_mime(_write(tmp_path, "sheet.xls", b"fake xls")) is None
+    assert extractors.sniff_mime(_write(tmp_path, "photo.jpg", b"\xff\xd8\xff")) is None
+
+    # No suffix at all: accepted as text only if it looks like UTF-8
+    assert extractors.sniff_mime(_write(tmp_path, "README", "café menu".encode())) == extractors.TEXT
+    assert extractors.sniff_mime(_write(tmp_path, "blob", b"\x00\x01\x02")) is None
+
+
+def test_text_mentioning_the_pdf_marker_stays_text(extractors, tmp_path):
+    notes = b"Export notes\nThe printer writes a %PDF-1.7 header first.\n"
+    path = _write(tmp_path, "notes.txt", notes)
+    assert extractors.sniff_mime(path, "notes.txt") == extractors.TEXT
+    assert "%PDF-1.7" in extractors.extract_text(path)
+
+    # A real header may follow a BOM or leading whitespace
+    assert extractors.sniff_mime(_write(tmp_path, "a.bin", b"\xef\xbb\xbf\n %PDF-1.4")) == extractors.PDF
+
+
+def test_text_segments_carry_paragraph_offsets(extractors, tmp_path):
+    path = _write(tmp_path, "notes.txt", b"\n\nFirst paragraph\nstill first.\n\n\nSecond one.\n")
+
+    segments = list(extractors.iter_segments(path))
+    text = extractors.extract_text(path)
+
+    assert [s.paragraph for s in segments] == [0, 1]
+    assert text == "First paragraph\nstill first.\n\nSecond one."
+    for segment in segments:
+        assert text[segment.offset : segment.offset + len(segment.text)] == segment.text
+
+
+def test_latin1_text_is_decoded(extractors, tmp_path):
+    path = _write(tmp_path, "legacy.txt", "naïve café".encode("latin-1"))
+    assert extractors.extract_text(path) == "naïve café"
+
+    # The encoding is decided over the whole file, not just its first block
+    late = _write(tmp_path, "late.txt", "café ".encode("latin-1").join([b"a" * 70000, b""]))
+    assert extractors.extract_text(late).endswith("café")
+
+
+def test_pdf_segments_are_pages(extractors, tmp_path, monkeypatch):
+    fitz = pytest.importorskip("fitz")
+    monkeypatch.setenv("PDF_PAGE_WORKERS", "0")
+    doc = fitz.open()
+    for text in ["Page one", "", "Page three"]:
+        page = doc.new_page()
+        if text:
+            page.insert_text((72, 72), text)
+    path = str(tmp_path / "doc.bin")
+    doc.save(path)
+    doc.close()
+
+    segments = list(extractors.iter_segments(path))
+
+    assert [(s.page, s.text) for s in segments] == [(0, "Page one"), (2, "Page three")]
+
+
+def test_failures_and_unsupported_files(extractors, tmp_path):
+    with pytest.raises(RuntimeError, match="DOCX extraction failed"):
+        extractors.extract_text(_write(tmp_path, "broken.docx", b"PK fake docx content"))
+    with pytest.raises(ValueError):
+        extractors.extract_text(_write(tmp_path, "sheet.xls", b"fake xls"))
@@ -0,0 +1,65 @@
+"""Tests for backend selection (`services.inference_backends`) and the
+ROUGE helpers used to check quantized backends against the baseline."""
+
+import importlib
+import importlib.util
+import os
+
+import pytest
+
+
+@pytest.fixture
+def backends():
+    return importlib.import_module("services.inference_backends")
+
+
+def test_backend_name_from_env(backends, monkeypatch):
+    monkeypatch.delenv("SUMMARIZER_BACKEND", raising=False)
+    assert backends.backend_name() == backends.TORCH
+    monkeypatch.setenv("SUMMARIZER_BACKEND", " Torch-INT8 ")
+    assert backends.backend_name() == backends.TORCH_INT8
+    monkeypatch.setenv("SUMMARIZER_BACKEND", "tensorrt")
+    assert backends.backend_name() == backends.TORCH
+
+
+def test_onnx_exports_are_kept_per_model(backends, monkeypatch, tmp_path):
+    monkeypatch.delenv("ONNX_MODEL_DIR", raising=False)
+    assert backends.export_dir("facebook/bart-large-cnn") is None
+    monkeypatch.setenv("ONNX_MODEL_DIR", str(tmp_path))
+    assert backends.export_dir("facebook/bart-large-cnn") == str(tmp_path / "facebook--bart-large-cnn")
+    assert backends.export_dir("sshleifer/distilbart-cnn-6-6") != backends.export_dir("facebook/bart-large-cnn")
+    assert os.path.dirname(backends.export_dir("../models/bart")) == str(tmp_path)
+
+
+def test_backend_is_part_of_the_cache_signature(backends, monkeypatch):
+    summarizer = importlib.import_module("services.summarizer")
+    monkeypatch.delenv("SUMMARIZER_CASCADE", raising=False)
+    monkeypatch.setenv("SUMMARIZER_MODEL", "some/model")
+    monkeypatch.setenv("SUMMARIZER_BACKEND", backends.TORCH)
+    assert summarizer.model_signature() == "some/model"
+    monkeypatch.setenv("SUMMARIZER_BACKEND", backends.TORCH_INT8)
+    assert summarizer.model_signature() == "some/model+torch-int8"
+    monkeypatch.setenv("SUMMARIZER_BACKEND", backends.ONNX)
+    assert summarizer.model_signature() == "some/model+onnx"
+
+
+def test_unknown_backend_is_rejected(backends):
+    with pytest.raises(ValueError):
+        backends.build_pipeline("some/model", "tensorrt")
+
+
+@pytest.mark.skipif(importlib.util.find_spec("optimum") is not None, reason="optimum is installed")
+def test_onnx_without_optimum_explains_how_to_install(backends):
+    with pytest.raises(RuntimeError, match="optimum"):
+        backends.build_pipeline("some/model", backends.ONNX)
+
+
+def test_rouge_scores():
+    from services.evaluation import rouge_l, rouge_n
+
+    reference = "The council voted to commission a cost study."
+    assert rouge_l(reference, reference) == pytest.approx(1.0)
+    assert rouge_l(reference, "Unrelated words entirely.") == 0.0
+    close = rouge_l(reference, "The council voted to order a cost study.")
+    assert 0.7 < close < 1.0
+    assert rouge_n(reference, "council voted", 2) > 0
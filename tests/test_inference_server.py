@@ -0,0 +1,113 @@
+"""Tests for the shared inference server (`services.inference_server`).
+
+The server runs on a background event loop in this process with the model
+replaced by a fake, and is exercised through a real Unix socket.
+"""
+
+import asyncio
+import importlib
+import json
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    summarizer = importlib.import_module("services.summarizer")
+    inference_server = importlib.import_module("services.inference_server")
+    batches = []
+
+    def fake_generate_summaries(texts, summary_type="medium"):
+        batches.append(list(texts))
+        return [f"{summary_type}:{t[:10]}" for t in texts]
+
+    monkeypatch.setattr(summarizer, "load_model", lambda: None)
+    monkeypatch.setattr(summarizer, "generate_summaries", fake_generate_summaries)
+
+    path = str(tmp_path / "s.sock")
+    srv = inference_server.InferenceServer(path, max_batch_size=4, max_wait_ms=50)
+    loop = asyncio.new_event_loop()
+    task = loop.create_task(srv.serve_forever())
+    thread = threading.Thread(target=lambda: loop.run_until_complete(asyncio.wait([task])), daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 5
+    while not os.path.exists(path) and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    # The server flags its own process as serving; clients in this test must not be local
+    monkeypatch.setattr(inference_server, "_SERVING", False)
+    yield inference_server, path, batches
+
+    loop.call_soon_threadsafe(task.cancel)
+    thread.join(timeout=5)
+    loop.close()
+
+
+def test_requests_from_several_clients_share_a_batch(server):
+    inference_server, path, batches = server
+    client = inference_server.InferenceClient(path, timeout=5)
+
+    results = [None] * 4
+
+    def call(i):
+        results[i] = client.summaries([f"document number {i}"], "short")[0]
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == ["short:document n"] * 4
+    assert max(len(b) for b in batches) > 1
+    assert client.ping()["requests_total"] >= 4
+
+
+def test_summarizer_delegates_to_the_server(server, monkeypatch):
+    _, path, batches = server
+    summarizer = importlib.import_module("services.summarizer")
+    monkeypatch.setenv("SUMMARIZER_SOCKET", path)
+    monkeypatch.setattr(summarizer, "_get_summarizer", lambda: pytest.fail("model loaded in the client"))
+
+    assert summarizer.summarize_text("Hello there from a worker.", "long") == "long:Hello ther"
+    assert batches == [["Hello there from a worker."]]
+
+
+def test_long_text_is_precompressed_on_the_server(server, monkeypatch):
+    inference_server, path, _ = server
+    summarizer = importlib.import_module("services.summarizer")
+    monkeypatch.setenv("LONG_DOC_WINDOW_TOKENS", "40")
+    monkeypatch.setattr(summarizer, "_precompress", lambda text, summary_type: "The salient sentence.")
+    monkeypatch.setattr(summarizer, "summarize_long", lambda *args, **kwargs: pytest.fail("map-reduce after pre-compression"))
+    monkeypatch.setattr(
+        summarizer, "_get_summarizer", lambda name=None: lambda text, **kwargs: [{"summary_text": f"summary of {text}"}]
+    )
+
+    client = inference_server.InferenceClient(path, timeout=5)
+    assert client.summarize("A sentence that keeps going. " * 50, "short") == "summary of The salient sentence."
+
+
+def test_malformed_requests_get_an_error_frame(server):
+    inference_server, path, _ = server
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(5)
+        sock.connect(path)
+        body = b"{not json"
+        sock.sendall(inference_server._HEADER.pack(len(body)) + body)
+        (size,) = inference_server._HEADER.unpack(inference_server._recv_exactly(sock, inference_server._HEADER.size))
+        response = json.loads(inference_server._recv_exactly(sock, size))
+    assert response["ok"] is False and "Malformed request" in response["error"]
+    # The server keeps serving
+    assert inference_server.InferenceClient(path, timeout=5).ping()["ok"]
+
+
+def test_errors_are_raised_as_runtime_errors(server, tmp_path):
+    inference_server, path, _ = server
+    with pytest.raises(RuntimeError, match="Unknown op"):
+        inference_server.InferenceClient(path, timeout=5).call("explode")
+    with pytest.raises(RuntimeError, match="unavailable"):
+        inference_server.InferenceClient(str(tmp_path / "missing.sock"), timeout=1).ping()
@@ -0,0 +1,85 @@
+"""Tests for sentence-aligned chunking and map-reduce summarization.
+
+Token counts use a whitespace word counter and the model calls in
+`services.summarizer` are monkeypatched, so no model is loaded.
+"""
+
+import importlib
+
+import pytest
+
+from services.chunking import chunk_text, split_sentences
+
+
+def _words(text: str) -> int:
+    return len(text.split())
+
+
+def test_chunks_respect_budget_and_sentence_boundaries():
+    text = "One two three. Four five six seven. Eight nine. Ten eleven twelve thirteen."
+    chunks = chunk_text(text, max_tokens=6, count_tokens=_words)
+
+    assert chunks == ["One two three.", "Four five six seven. Eight nine.", "Ten eleven twelve thirteen."]
+    assert all(_words(c) <= 6 for c in chunks)
+    # No text is dropped
+    assert " ".join(chunks).split() == text.split()
+
+
+def test_oversized_sentence_is_split_on_words():
+    sentence = " ".join(f"w{i}" for i in range(25)) + "."
+    chunks = chunk_text(sentence, max_tokens=10, count_tokens=_words)
+    assert [len(c.split()) for c in chunks] == [10, 10, 5]
+    assert split_sentences("A.  B!\n\nC") == ["A.", "B!", "C"]
+
+
+@pytest.fixture
+def summarizer(monkeypatch):
+    mod = importlib.import_module("services.summarizer")
+    mod._CHUNK_CACHE.clear()
+    monkeypatch.setenv("LONG_DOC_WINDOW_TOKENS", "40")
+    monkeypatch.setenv("LONG_DOC_BATCH_SIZE", "2")
+
+    calls = {"batches": [], "final": []}
+
+    def fake_generate_summaries(texts, summary_type="medium"):
+        calls["batches"].append((summary_type, list(texts)))
+        return [f"partial{len(t.split())}." for t in texts]
+
+    def fake_final_summary(text, summary_type="medium"):
+        calls["final"].append((summary_type, text))
+        return f"{summary_type}:{text}"
+
+    monkeypatch.setattr(mod, "generate_summaries", fake_generate_summaries)
+    monkeypatch.setattr(mod, "_summarize_precompressed", fake_final_summary)
+    return mod, calls
+
+
+def test_long_text_is_mapped_then_reduced(summarizer):
+    mod, calls = summarizer
+    text = " ".join(f"Sentence number {i} has a few words." for i in range(20))
+
+    result = mod.summarize_long(text, "short", count_tokens=_words)
+
+    chunk_texts = [t for _, batch in calls["batches"] for t in batch]
+    assert all(preset == mod.CHUNK_PRESET for preset, _ in calls["batches"])
+    assert all(len(batch) <= 2 for _, batch in calls["batches"])
+    assert " ".join(chunk_texts).split() == text.split()
+    assert calls["final"] == [("short", result.split(":", 1)[1])]
+
+
+def test_chunk_summaries_are_reused_across_presets(summarizer):
+    mod, calls = summarizer
+    text = " ".join(f"Sentence number {i} has a few words." for i in range(20))
+
+    mod.summarize_long(text, "short", count_tokens=_words)
+    first_batches = len(calls["batches"])
+    mod.summarize_long(text, "long", count_tokens=_words)
+
+    assert len(calls["batches"]) == first_batches
+    assert [preset for preset, _ in calls["final"]] == ["short", "long"]
+
+
+def test_short_text_skips_chunking(summarizer):
+    mod, calls = summarizer
+    assert mod.summarize_long("Just a short note.", "medium", count_tokens=_words) == "medium:Just a short note."
+    assert calls["batches"] == []
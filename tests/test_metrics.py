@@ -0,0 +1,84 @@
+"""Tests for stage timings, `Server-Timing`, `/metrics` and the request profiler."""
+
+import importlib
+import os
+from io import BytesIO
+
+from fastapi.testclient import TestClient
+
+
+def _upload(client, headers=None):
+    files = {"file": ("notes.txt", BytesIO(b"Some notes worth summarizing."), "text/plain")}
+    return client.post("/documents/upload/", files=files, headers=headers or {})
+
+
+def test_histogram_renders_cumulative_buckets():
+    metrics = importlib.import_module("services.metrics")
+    registry = metrics.Registry()
+    hist = registry.register(metrics.Histogram("demo_seconds", "Demo.", ("stage",), buckets=(0.1, 1.0)))
+    for value in (0.05, 0.5, 2.0):
+        hist.observe(value, stage="x")
+
+    text = registry.render()
+    assert "# TYPE demo_seconds histogram" in text
+    assert 'demo_seconds_bucket{stage="x",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{stage="x",le="1"} 2' in text
+    assert 'demo_seconds_bucket{stage="x",le="+Inf"} 3' in text
+    assert 'demo_seconds_count{stage="x"} 3' in text
+
+
+def test_counters_drained_in_a_worker_merge_into_the_registry():
+    metrics = importlib.import_module("services.metrics")
+    worker, api = metrics.Registry(), metrics.Registry()
+    for registry in (worker, api):
+        registry.register(metrics.Counter("demo_total", "Demo.", ("model",)))
+    worker._metrics["demo_total"].inc(model="a")
+    worker._metrics["demo_total"].inc(2, model="b")
+
+    api.merge_counters(worker.drain_counters())
+    api.merge_counters(worker.drain_counters())  # nothing new since the last drain
+
+    text = api.render()
+    assert 'demo_total{model="a"} 1' in text
+    assert 'demo_total{model="b"} 2' in text
+    assert "demo_total{" not in worker.render()
+
+
+def test_upload_reports_stage_timings_and_metrics(sqlite_app, monkeypatch):
+    docs_mod = importlib.import_module("routers.documents")
+    monkeypatch.setattr(docs_mod, "summarize_text", lambda text, length="medium": "short summary")
+
+    with TestClient(sqlite_app.app) as client:
+        resp = _upload(client)
+        assert resp.status_code == 201
+        timing = resp.headers["Server-Timing"]
+        stages = [part.split(";")[0] for part in timing.split(", ")]
+        for name in ("read", "save", "extract", "cache", "queue", "generate", "persist", "total"):
+            assert name in stages
+
+        metrics = client.get("/metrics")
+        assert metrics.status_code == 200
+        assert metrics.headers["content-type"].startswith("text/plain")
+        body = metrics.text
+        assert 'upload_stage_seconds_count{stage="generate"} 1' in body
+        assert 'http_request_duration_seconds_count{method="POST",handler="upload_document",status="201"} 1' in body
+        assert 'summary_tokens_count{direction="in"} 1' in body
+        assert "admission_wait_seconds_count 1" in body
+        assert 'summary_cache_lookups_total{result="miss"} 1' in body
+
+
+def test_profile_header_writes_collapsed_stacks(sqlite_app, monkeypatch, tmp_path):
+    monkeypatch.setenv("PROFILER_TOKEN", "secret")
+    monkeypatch.setenv("PROFILE_DIR", str(tmp_path / "profiles"))
+    docs_mod = importlib.import_module("routers.documents")
+    monkeypatch.setattr(docs_mod, "summarize_text", lambda text, length="medium": "short summary")
+
+    with TestClient(sqlite_app.app) as client:
+        assert "X-Profile-File" not in _upload(client, {"X-Profile": "wrong"}).headers
+        resp = _upload(client, {"X-Profile": "secret"})
+
+    path = resp.headers["X-Profile-File"]
+    assert os.path.dirname(path) == str(tmp_path / "profiles")
+    with open(path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
@@ -0,0 +1,71 @@
+"""Tests for near-duplicate detection of uploads (MinHash + LSH)."""
+
+import importlib
+import random
+from io import BytesIO
+
+from fastapi.testclient import TestClient
+
+
+def _notes(seed: int, words: int = 600) -> str:
+    rng = random.Random(seed)
+    vocabulary = [f"term{i}" for i in range(2000)]
+    return " ".join(rng.choice(vocabulary) for _ in range(words))
+
+
+NOTES = _notes(1)
+
+
+def _upload(client, name: str, text: str, length: str = "short") -> dict:
+    files = {"file": (name, BytesIO(text.encode("utf-8")), "text/plain")}
+    resp = client.post("/documents/upload/", files=files, data={"length": length})
+    assert resp.status_code == 201
+    return resp.json()
+
+
+def test_signature_estimates_jaccard_similarity(sqlite_app):
+    near_duplicates = importlib.import_module("services.near_duplicates")
+    original = near_duplicates.minhash("Lecture 3 (exported 2023)\n" + NOTES + "\nPage 1 of 4")
+    reexport = near_duplicates.minhash("Week three notes, revised\n" + NOTES + "\nConfidential")
+    other = near_duplicates.minhash(_notes(2))
+
+    assert original.similarity(reexport) > 0.9
+    assert original.similarity(other) < 0.1
+    assert sum(a == b for a, b in zip(original.buckets(), reexport.buckets())) > 0
+    assert not set(original.buckets()) & set(other.buckets())
+    assert near_duplicates.minhash("?!") is None
+
+
+def test_reexported_upload_reuses_summary(sqlite_app, monkeypatch):
+    docs_mod = importlib.import_module("routers.documents")
+    calls = []
+
+    def fake_summarize(text, length="medium"):
+        calls.append(length)
+        return f"Summary {len(calls)} ({length})"
+
+    monkeypatch.setattr(docs_mod, "summarize_text", fake_summarize)
+    with TestClient(sqlite_app.app) as client:
+        first = _upload(client, "notes.txt", "Lecture 3 (exported 2023)\n" + NOTES + "\nPage 1 of 4")
+        assert "near_duplicate" not in first
+
+        second = _upload(client, "notes-v2.txt", "Week three notes, revised\n" + NOTES + "\nConfidential", length="short,medium")
+        # `short` is copied from the earlier document; only `medium` runs the model
+        assert second["near_duplicate"]["id"] == first["id"]
+        assert second["near_duplicate"]["similarity"] > 0.9
+        assert second["near_duplicate"]["reused"] == ["short"]
+        assert second["summaries"] == {"short": first["summary"], "medium": "Summary 2 (medium)"}
+        assert calls == ["short", "medium"]
+
+        assert "near_duplicate" not in _upload(client, "other.txt", _notes(2))
+
+        # Flag mode reports the match but still summarizes
+        monkeypatch.setenv("NEAR_DUP_MODE", "flag")
+        third = _upload(client, "notes-v3.txt", NOTES)
+        assert third["near_duplicate"]["reused"] == []
+        assert third["summary"] == f"Summary {len(calls)} (short)"
+
+    signatures = importlib.import_module("models.near_duplicate").DocumentSignature
+    with sqlite_app.SessionLocal() as db:
+        recorded = {row.document_id: row.duplicate_of for row in db.query(signatures)}
+    assert recorded[second["id"]] == first["id"] and recorded[third["id"]] in {first["id"], second["id"]}
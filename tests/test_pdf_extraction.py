@@ -0,0 +1,103 @@
+"""Tests for per-page PDF extraction (`services.pdf_extraction`).
+
+PDFs are generated on the fly with PyMuPDF; the module is skipped when
+PyMuPDF or pdfplumber isn't installed.
+"""
+
+import importlib
+
+import pytest
+
+fitz = pytest.importorskip("fitz")
+pytest.importorskip("pdfplumber")
+
+
+@pytest.fixture
+def pdf_extraction():
+    # Import per test: other suites reload project modules, and worker
+    # processes can only unpickle functions of the module in sys.modules
+    return importlib.import_module("services.pdf_extraction")
+
+
+def _make_pdf(path, texts):
+    doc = fitz.open()
+    for text in texts:
+        page = doc.new_page()
+        if text:
+            page.insert_text((72, 72), text)
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+def test_fast_engine_with_per_page_fallback(pdf_extraction, tmp_path, monkeypatch):
+    path = _make_pdf(tmp_path / "doc.pdf", ["First page", "Second page", "Third page"])
+    monkeypatch.setenv("PDF_PAGE_WORKERS", "0")
+
+    # Simulate the fast engine missing the text layer on page 1 only
+    fast = pdf_extraction._ENGINES[pdf_extraction.PYMUPDF]
+
+    def flaky_fast(source, indexes):
+        return [("", secs) if i == 1 else (text, secs) for i, (text, secs) in zip(indexes, fast(source, indexes))]
+
+    monkeypatch.setitem(pdf_extraction._ENGINES, pdf_extraction.PYMUPDF, flaky_fast)
+
+    pages = list(pdf_extraction.iter_pdf_pages(path))
+
+    assert [p.engine for p in pages] == ["pymupdf", "pdfplumber", "pymupdf"]
+    assert "Second page" in pages[1].text
+
+
+def test_large_documents_are_split_across_page_pool(pdf_extraction, tmp_path, monkeypatch):
+    texts = [f"Page number {i}" for i in range(6)]
+    path = _make_pdf(tmp_path / "big.pdf", texts)
+    monkeypatch.setenv("PDF_PAGE_WORKERS", "2")
+    monkeypatch.setenv("PDF_PARALLEL_MIN_PAGES", "4")
+    try:
+        pages = list(pdf_extraction.iter_pdf_pages(path))
+    finally:
+        pdf_extraction.shutdown()
+
+    assert [p.index for p in pages] == list(range(6))
+    assert [p.text.strip() for p in pages] == texts
+
+
+def test_page_pool_is_off_by_default_in_cpu_workers(pdf_extraction, monkeypatch):
+    monkeypatch.delenv("PDF_PAGE_WORKERS", raising=False)
+    assert pdf_extraction.page_workers() == 4
+    monkeypatch.setenv("INTELLI_CPU_WORKER", "1")
+    assert pdf_extraction.page_workers() == 0
+    monkeypatch.setenv("PDF_PAGE_WORKERS", "2")
+    assert pdf_extraction.page_workers() == 2
+
+
+def test_unreadable_pdf_raises(pdf_extraction):
+    with pytest.raises(Exception):
+        list(pdf_extraction.iter_pdf_pages(b"not a pdf at all"))
+
+
+def test_uploads_fan_page_ranges_out_over_the_cpu_pool(sqlite_app, tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    docs_mod = importlib.import_module("routers.documents")
+    texts = [f"Page number {i}" for i in range(6)]
+    path = _make_pdf(tmp_path / "big.pdf", texts)
+    monkeypatch.setenv("PDF_PAGE_WORKERS", "3")
+    monkeypatch.setenv("PDF_PARALLEL_MIN_PAGES", "4")
+
+    ranges, summarized = [], []
+    extract_range = docs_mod._pdf_range_text
+
+    def recording_range(path, start, stop, primary, fallback):
+        ranges.append((start, stop))
+        return extract_range(path, start, stop, primary, fallback)
+
+    monkeypatch.setattr(docs_mod, "_pdf_range_text", recording_range)
+    monkeypatch.setattr(docs_mod, "summarize_text", lambda text, length="medium": summarized.append(text) or "Summary.")
+
+    with TestClient(sqlite_app.app) as client, open(path, "rb") as f:
+        resp = client.post("/documents/upload/", files={"file": ("big.pdf", f, "application/pdf")})
+
+    assert resp.status_code == 201
+    assert sorted(ranges) == [(0, 2), (2, 4), (4, 6)]
+    assert summarized == ["\n".join(texts)]
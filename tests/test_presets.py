@@ -0,0 +1,64 @@
+"""Tests for summarizing several length presets in one request."""
+
+import importlib
+from io import BytesIO
+
+from fastapi.testclient import TestClient
+
+
+def test_presets_share_reduction_and_encoder_pass(monkeypatch):
+    summarizer = importlib.import_module("services.summarizer")
+    monkeypatch.setenv("LONG_DOC_WINDOW_TOKENS", "40")
+    calls = {"reduce": 0, "shared": []}
+
+    def fake_reduce(text, count, budget):
+        calls["reduce"] += 1
+        return "reduced text."
+
+    def fake_shared(pipeline, text, presets):
+        calls["shared"].append((text, list(presets)))
+        return [f"{p}:{text}" for p in presets]
+
+    monkeypatch.setattr(summarizer, "_reduce", fake_reduce)
+    monkeypatch.setattr(summarizer, "_generate_shared", fake_shared)
+    monkeypatch.setattr(summarizer, "_token_counter", lambda model: len)
+    monkeypatch.setattr(summarizer, "_get_summarizer", lambda name=None: object())
+
+    long_text = "A sentence that keeps going. " * 50
+    result = summarizer.summarize_presets(long_text, ["long", "short", "long"])
+
+    assert result == {"long": "long:reduced text.", "short": "short:reduced text."}
+    assert calls == {"reduce": 1, "shared": [("reduced text.", ["long", "short"])]}
+
+
+def test_upload_with_several_presets_stores_one_row_each(sqlite_app, monkeypatch):
+    docs_mod = importlib.import_module("routers.documents")
+    calls = []
+
+    def fake_presets(text, presets):
+        calls.append(list(presets))
+        return {p: f"{p} summary" for p in presets}
+
+    monkeypatch.setattr(docs_mod, "summarize_text", lambda text, length="medium": f"{length} summary")
+    monkeypatch.setattr(docs_mod, "summarize_presets", fake_presets)
+
+    with TestClient(sqlite_app.app) as client:
+        # Cache "short" first: only the other two presets are generated together
+        files = {"file": ("a.txt", BytesIO(b"Quarterly results were strong."), "text/plain")}
+        assert client.post("/documents/upload/", files=files, data={"length": "short"}).status_code == 201
+
+        files = {"file": ("b.txt", BytesIO(b"Quarterly results were strong."), "text/plain")}
+        resp = client.post("/documents/upload/", files=files, data={"length": "long,short,medium"})
+        assert resp.status_code == 201
+        body = resp.json()
+        assert body["summary"] == "long summary"
+        assert body["summaries"] == {"long": "long summary", "short": "short summary", "medium": "medium summary"}
+        assert calls == [["long", "medium"]]
+
+        bad = client.post("/documents/upload/", files=files, data={"length": "short,tiny"})
+        assert bad.status_code == 400
+
+    summary_model = importlib.import_module("models.summary").Summary
+    with sqlite_app.SessionLocal() as db:
+        rows = db.query(summary_model.preset).filter(summary_model.document_id == body["id"]).all()
+    assert sorted(r.preset for r in rows) == ["long", "medium", "short"]
@@ -0,0 +1,97 @@
+"""Tests for full-text search over documents (SQLite FTS5 in tests)."""
+
+import importlib
+from io import BytesIO
+
+from fastapi.testclient import TestClient
+
+
+def _upload(client, name: str, text: str) -> int:
+    files = {"file": (name, BytesIO(text.encode("utf-8")), "text/plain")}
+    resp = client.post("/documents/upload/", files=files, data={"length": "short"})
+    assert resp.status_code == 201
+    return resp.json()["id"]
+
+
+def test_search_ranks_highlights_and_paginates(sqlite_app, monkeypatch):
+    docs_mod = importlib.import_module("routers.documents")
+    monkeypatch.setattr(docs_mod, "summarize_text", lambda text, length="medium": "Summary: " + text[:40])
+
+    with TestClient(sqlite_app.app) as client:
+        photo = _upload(client, "photosynthesis.txt", "Photosynthesis converts light into chemical energy in plants.")
+        mention = _upload(client, "biology.txt", "Cells divide. Some plants rely on photosynthesis for energy.")
+        _upload(client, "history.txt", "The treaty was signed after years of negotiation.")
+
+        resp = client.get("/documents/search", params={"q": "photosynthesis"})
+        assert resp.status_code == 200
+        body = resp.json()
+        assert body["total"] == 2
+        # The filename match ranks first
+        assert [item["id"] for item in body["items"]] == [photo, mention]
+        assert "<mark>Photosynthesis</mark>" in body["items"][0]["snippet"]
+
+        # All words must match; `*` matches a prefix; operators are taken literally
+        assert client.get("/documents/search", params={"q": "plants treaty"}).json()["total"] == 0
+        assert client.get("/documents/search", params={"q": "negoti*"}).json()["total"] == 1
+        assert client.get("/documents/search", params={"q": 'energy OR "'}).json()["total"] == 0
+
+        first = client.get("/documents/search", params={"q": "energy", "limit": 1}).json()
+        assert first["next_offset"] == 1
+        second = client.get("/documents/search", params={"q": "energy", "limit": 1, "offset": 1}).json()
+        assert second["next_offset"] is None
+        assert {first["items"][0]["id"], second["items"][0]["id"]} == {photo, mention}
+
+        assert client.get("/documents/search", params={"q": "!!"}).status_code == 400
+
+
+def test_sweeper_refreshes_indexed_summary(sqlite_app, monkeypatch):
+    docs_mod = importlib.import_module("routers.documents")
+    summarizer = importlib.import_module("services.summarizer")
+    sweeper_mod = importlib.import_module("services.sweeper")
+
+    def failing(text, length="medium"):
+        raise RuntimeError("model down")
+
+    monkeypatch.setattr(docs_mod, "summarize_text", failing)
+    with TestClient(sqlite_app.app) as client:
+        doc_id = _upload(client, "notes.txt", "Lecture notes about glaciers.")
+        assert client.get("/documents/search", params={"q": "moraine"}).json()["total"] == 0
+
+        recovered = lambda texts, summary_type: ["Glaciers leave moraine."] * len(texts)  # noqa: E731
+        monkeypatch.setattr(summarizer, "generate_summaries", recovered)
+        with sqlite_app.SessionLocal() as db:
+            sweeper_mod.Sweeper(base_delay=0).sweep_once(db)
+
+        hits = client.get("/documents/search", params={"q": "moraine"}).json()["items"]
+        assert [hit["id"] for hit in hits] == [doc_id]
+        assert "<mark>moraine</mark>" in hits[0]["summary_snippet"]
+
+
+def test_python_snippets_highlight_matches(sqlite_app):
+    search = importlib.import_module("services.search")
+    text = " ".join(f"w{i}" for i in range(100)) + " Glacial moraine deposits"
+    snippet = search.make_snippet(text, ["glac*", "moraine"], words=8)
+    assert snippet.startswith("…") and "<mark>Glacial</mark> <mark>moraine</mark>" in snippet
+    assert search.MysqlFulltextIndex.match_expression(["an", "glac*", "moraine"]) == "+glac* +moraine"
+
+
+def test_sqlite_index_keeps_no_copy_of_the_text(sqlite_app, monkeypatch):
+    docs_mod = importlib.import_module("routers.documents")
+    search = importlib.import_module("services.search")
+    text = importlib.import_module("sqlalchemy").text
+    monkeypatch.setattr(docs_mod, "summarize_text", lambda text, length="medium": "About glaciers.")
+
+    with TestClient(sqlite_app.app) as client:
+        doc_id = _upload(client, "notes.txt", "Lecture notes about glaciers and moraine.")
+    with sqlite_app.engine.begin() as conn:
+        # Contentless: the index answers queries but returns no stored values
+        assert conn.execute(text("SELECT content FROM document_search WHERE rowid = :id"), {"id": doc_id}).scalar() is None
+        # Creating the schema again keeps the existing index
+        search.get_search_index("sqlite").create_schema(conn)
+        assert conn.execute(text("SELECT count(*) FROM document_search")).scalar() == 1
+
+    with sqlite_app.SessionLocal() as db:
+        assert search.rebuild(db) == 1
+        page = search.search(db, ["moraine"], 10, 0)
+    assert [hit.id for hit in page.hits] == [doc_id]
+    assert "<mark>moraine</mark>" in page.hits[0].snippet
@@ -0,0 +1,97 @@
+"""Tests for the Server-Sent Events upload endpoint."""
+
+import asyncio
+import importlib
+import json
+from io import BytesIO
+
+from fastapi.testclient import TestClient
+
+
+def _events(body: str):
+    events = []
+    for message in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in message.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_stream_reports_progress_and_tokens_then_stores_document(sqlite_app, monkeypatch):
+    streaming_mod = importlib.import_module("services.streaming")
+
+    def fake_stream(text, summary_type="medium", progress=None):
+        progress({"stage": "chunks", "level": 1, "done": 1, "total": 1})
+        yield "Results were"
+        yield " strong."
+
+    monkeypatch.setattr(streaming_mod, "stream_summary", fake_stream)
+
+    with TestClient(sqlite_app.app) as client:
+        files = {"file": ("a.txt", BytesIO(b"Quarterly results were strong."), "text/plain")}
+        resp = client.post("/documents/upload/stream", files=files, data={"length": "short"})
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/event-stream")
+        events = _events(resp.text)
+
+        names = [name for name, _ in events]
+        assert names == ["progress", "progress", "progress", "progress", "token", "token", "done"]
+        assert [data["stage"] for name, data in events if name == "progress"] == [
+            "saved",
+            "extracted",
+            "summarizing",
+            "chunks",
+        ]
+        done = events[-1][1]
+        assert done["summary"] == "Results were strong."
+
+        # The same text is served from the summary cache as a single token
+        files = {"file": ("b.txt", BytesIO(b"Quarterly results were strong."), "text/plain")}
+        cached = _events(client.post("/documents/upload/stream", files=files, data={"length": "short"}).text)
+        assert ("token", {"text": "Results were strong."}) in cached
+
+        bad = client.post("/documents/upload/stream", files=files, data={"length": "short,long"})
+        assert bad.status_code == 400
+
+    document = importlib.import_module("models.document").Document
+    with sqlite_app.SessionLocal() as db:
+        assert db.get(document, done["id"]).summary == "Results were strong."
+
+
+def test_stream_reports_unsupported_file_as_error_event(sqlite_app):
+    with TestClient(sqlite_app.app) as client:
+        files = {"file": ("a.bin", BytesIO(b"\x00\x01\x02"), "application/octet-stream")}
+        events = _events(client.post("/documents/upload/stream", files=files).text)
+    assert events[-1] == ("error", {"status": 415, "detail": "Unsupported file type"})
+
+
+def _count_forever(emit, start):
+    n = start
+    while True:
+        emit(n)
+        n += 1
+
+
+def _count_to(emit, stop):
+    for n in range(stop):
+        emit(n)
+
+
+def test_worker_stream_finishes_without_the_reader_and_stops_on_close(sqlite_app):
+    streaming = importlib.import_module("services.streaming")
+
+    async def scenario():
+        finished = asyncio.Event()
+        # Generation ends (and gives its slot back) before the reader has read anything
+        stream = streaming.WorkerStream(_count_to, 3, on_done=finished.set)
+        await asyncio.wait_for(finished.wait(), timeout=5)
+        assert [item async for item in stream] == [0, 1, 2]
+
+        # A reader that goes away stops an endless producer
+        stopped = asyncio.Event()
+        stream = streaming.WorkerStream(_count_forever, 10, on_done=stopped.set)
+        items = stream.__aiter__()
+        assert [await items.__anext__(), await items.__anext__()] == [10, 11]
+        await items.aclose()
+        await asyncio.wait_for(stopped.wait(), timeout=5)
+
+    asyncio.run(scenario())
@@ -0,0 +1,108 @@
+"""Tests for the NULL-summary re-summarization sweeper (`services.sweeper`).
+
+Documents are inserted directly into a temporary SQLite database and the
+summarizer functions are monkeypatched, so no model is loaded.
+"""
+
+import importlib
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+
+@pytest.fixture
+def env(sqlite_app, monkeypatch):
+    database = importlib.import_module("database")
+    database.Base.metadata.create_all(bind=database.engine)
+    summarizer = importlib.import_module("services.summarizer")
+    sweeper_mod = importlib.import_module("services.sweeper")
+    Document = importlib.import_module("models.document").Document
+
+    calls = {"batches": [], "single": []}
+
+    def fake_generate_summaries(texts, summary_type="medium"):
+        calls["batches"].append((summary_type, list(texts)))
+        if any("poison" in t for t in texts):
+            raise RuntimeError("batch failed")
+        return [f"{summary_type}:{t}" for t in texts]
+
+    def fake_summarize_text(text, length="medium"):
+        calls["single"].append(text)
+        if "poison" in text:
+            raise RuntimeError("still broken")
+        return f"{length}:{text}"
+
+    monkeypatch.setattr(summarizer, "generate_summaries", fake_generate_summaries)
+    monkeypatch.setattr(summarizer, "summarize_text", fake_summarize_text)
+
+    db = database.SessionLocal()
+    yield db, sweeper_mod, Document, calls
+    db.close()
+
+
+def _add(db, Document, text, length="medium", attempts=1):
+    doc = Document(filename="f.txt", content=text, summary=None, summary_length=length, summary_attempts=attempts)
+    db.add(doc)
+    db.commit()
+    return doc.id
+
+
+def test_sweeper_batches_by_preset_and_fills_summaries(env):
+    db, sweeper_mod, Document, calls = env
+    ids = [_add(db, Document, "alpha"), _add(db, Document, "beta"), _add(db, Document, "gamma", length="short")]
+
+    result = sweeper_mod.Sweeper(batch_size=10).sweep_all(db)
+
+    assert result.succeeded == 3 and result.failed == 0
+    assert sorted(calls["batches"]) == [("medium", ["alpha", "beta"]), ("short", ["gamma"])]
+    assert [db.get(Document, i).summary for i in ids] == ["medium:alpha", "medium:beta", "short:gamma"]
+
+
+def test_failures_are_isolated_and_backed_off(env):
+    db, sweeper_mod, Document, calls = env
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    good, bad = _add(db, Document, "fine text"), _add(db, Document, "poison pill")
+
+    sweeper = sweeper_mod.Sweeper(batch_size=10, base_delay=60, clock=lambda: now)
+    result = sweeper.sweep_once(db)
+
+    assert result.succeeded == 1 and result.failed == 1
+    assert db.get(Document, good).summary == "medium:fine text"
+    failed = db.get(Document, bad)
+    assert failed.summary is None
+    assert failed.summary_attempts == 2
+    assert "still broken" in failed.summary_error
+
+    # Not due again until the backoff (60s * 2**1) has elapsed
+    assert sweeper.find_pending(db) == []
+    sweeper.clock = lambda: now + timedelta(seconds=121)
+    assert [d.id for d in sweeper.find_pending(db)] == [bad]
+
+    # Rows that exhausted their attempts are left alone
+    assert sweeper_mod.Sweeper(max_attempts=2, clock=sweeper.clock).find_pending(db) == []
+
+
+def test_every_missing_preset_is_retried(env):
+    db, sweeper_mod, Document, calls = env
+    Summary = importlib.import_module("models.summary").Summary
+    # "short" was cached at upload time, "long" failed
+    partial = Document(
+        filename="f.txt", content="partial", summary="short:partial", summary_length="short,long", summary_attempts=1,
+        summary_error="model down",
+    )
+    db.add(partial)
+    db.flush()
+    db.add(Summary(document_id=partial.id, preset="short", summary="short:partial"))
+    db.commit()
+    missing = _add(db, Document, "nothing yet", length="long,short")
+
+    result = sweeper_mod.Sweeper(batch_size=10).sweep_all(db)
+
+    assert result.succeeded == 2 and result.failed == 0
+    assert sorted(calls["batches"]) == [("long", ["partial", "nothing yet"]), ("short", ["nothing yet"])]
+    presets = lambda doc_id: {s.preset: s.summary for s in db.query(Summary).filter_by(document_id=doc_id)}  # noqa: E731
+    assert presets(partial.id) == {"short": "short:partial", "long": "long:partial"}
+    assert presets(missing) == {"long": "long:nothing yet", "short": "short:nothing yet"}
+    assert db.get(Document, missing).summary == "long:nothing yet"
+    assert db.get(Document, partial.id).summary_error is None
+    assert sweeper_mod.Sweeper().find_pending(db) == []
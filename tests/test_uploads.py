@@ -0,0 +1,34 @@
+"""Tests for streaming upload ingestion (`services.uploads`)."""
+
+import asyncio
+import hashlib
+from io import BytesIO
+
+import pytest
+from fastapi import UploadFile
+
+from services.uploads import UploadTooLarge, stream_to_disk
+
+
+def test_stream_to_disk_hashes_and_writes_in_chunks(tmp_path, monkeypatch):
+    monkeypatch.setenv("UPLOAD_CHUNK_BYTES", "4096")
+    payload = b"0123456789" * 2000
+    dest = tmp_path / "out.bin"
+
+    stored = asyncio.run(stream_to_disk(UploadFile(BytesIO(payload), filename="a.txt"), str(dest)))
+
+    assert stored.size == len(payload)
+    assert stored.sha256 == hashlib.sha256(payload).hexdigest()
+    assert dest.read_bytes() == payload
+    assert [p.name for p in tmp_path.iterdir()] == ["out.bin"]
+
+
+def test_stream_to_disk_enforces_limit_mid_stream(tmp_path, monkeypatch):
+    monkeypatch.setenv("UPLOAD_CHUNK_BYTES", "4096")
+    dest = tmp_path / "big.bin"
+
+    with pytest.raises(UploadTooLarge):
+        asyncio.run(stream_to_disk(UploadFile(BytesIO(b"x" * 20000), filename="big.txt"), str(dest), max_bytes=10000))
+
+    # Neither the final file nor the partial temp file is left behind
+    assert list(tmp_path.iterdir()) == []
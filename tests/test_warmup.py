@@ -0,0 +1,78 @@
+"""Tests for startup warm-up and the `/ready` probe (`services.warmup`)."""
+
+import importlib
+import os
+import subprocess
+import sys
+import time
+
+from fastapi.testclient import TestClient
+
+
+def _wait_for_ready(client, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        resp = client.get("/ready")
+        if resp.status_code == 200 or time.monotonic() > deadline:
+            return resp
+        time.sleep(0.02)
+
+
+def test_ready_only_after_warmup(sqlite_app, monkeypatch):
+    warmup = importlib.import_module("services.warmup")
+    monkeypatch.setenv("WARMUP_ON_START", "1")
+    started, release = [], []
+
+    def fake_warm_up():
+        started.append(True)
+        while not release:
+            time.sleep(0.01)
+        return {"load": 0.5, "short": 0.1}
+
+    monkeypatch.setattr(warmup, "warm_up", fake_warm_up)
+
+    with TestClient(sqlite_app.app) as client:
+        while not started:
+            time.sleep(0.01)
+        # Liveness answers immediately; readiness waits for the model
+        assert client.get("/").status_code == 200
+        resp = client.get("/ready")
+        assert resp.status_code == 503
+        assert resp.json()["status"] == "warming"
+
+        release.append(True)
+        resp = _wait_for_ready(client)
+        assert resp.status_code == 200
+        assert resp.json()["workers"] == [{"load": 0.5, "short": 0.1}]
+
+
+def test_failed_warmup_is_not_ready(sqlite_app, monkeypatch):
+    warmup = importlib.import_module("services.warmup")
+    monkeypatch.setenv("WARMUP_ON_START", "1")
+    monkeypatch.setattr(warmup.get_readiness(), "attempts", 1)
+
+    def broken_warm_up():
+        raise RuntimeError("model download failed")
+
+    monkeypatch.setattr(warmup, "warm_up", broken_warm_up)
+
+    with TestClient(sqlite_app.app) as client:
+        resp = _wait_for_ready(client, timeout=0.5)
+        assert resp.status_code == 503
+        assert "model download failed" in resp.json()["error"]
+
+
+def test_ready_immediately_when_warmup_disabled(sqlite_app):
+    with TestClient(sqlite_app.app) as client:
+        assert _wait_for_ready(client).status_code == 200
+
+
+def test_importing_the_app_does_not_import_transformers(tmp_path):
+    # Fresh interpreter: other tests may already have imported transformers
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{(tmp_path / 'test.db').as_posix()}", UPLOAD_DIR=str(tmp_path / "uploads"))
+    out = subprocess.run(
+        [sys.executable, "-c", "import sys, main; print('transformers' in sys.modules)"],
+        cwd=root, env=env, capture_output=True, text=True, check=True,
+    )
+    assert out.stdout.strip() == "False"